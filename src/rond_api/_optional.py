@@ -0,0 +1,23 @@
+"""可选依赖的按需导入。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# numpy 为可选加速依赖（fast 附加项），导入耗时约百毫秒，首次需要向量化计算时才加载。
+_PENDING: Any = object()
+_numpy: Any = _PENDING
+
+
+def load_numpy() -> Any:
+    """按需导入 numpy 并缓存结果；未安装时返回 None。"""
+
+    global _numpy
+    if _numpy is _PENDING:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - numpy 为可选加速依赖
+            _numpy = None
+        else:
+            _numpy = numpy
+    return _numpy
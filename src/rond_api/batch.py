@@ -0,0 +1,223 @@
+"""批量查询：一个进程内复用会话执行多条查询并按输入顺序输出 NDJSON。"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from rond_api.config import ConfigError
+from rond_api.db.sqlite_client import DatabaseReadError
+from rond_api.defaults import BATCH_DEFAULT_JOBS
+from rond_api.formatters.report_json import (
+    gap_report_to_dict,
+    ranking_to_dict,
+    search_result_to_dict,
+    stats_table_to_dict,
+)
+from rond_api.formatters.timeline_json import events_to_dicts, timeline_to_dict, trip_to_dict
+from rond_api.services.timeline_service import parse_date_range
+from rond_api.session import RondSession
+
+# 每个工作线程最多预读的查询数，避免一次读入整个输入。
+BATCH_PREFETCH_PER_JOB = 4
+
+_COMMAND_FIELDS: dict[str, frozenset[str]] = {
+    "timeline": frozenset({"date", "zone_mode", "weather", "expand_stays"}),
+    "range": frozenset({"from", "to", "zone_mode", "weather", "expand_stays"}),
+    "gaps": frozenset({"from", "to", "min_minutes"}),
+    "stats": frozenset({"from", "to", "group_by", "period"}),
+    "top": frozenset({"from", "to", "dimension", "metric", "limit", "sql"}),
+    "search": frozenset({"query", "limit"}),
+    "trip": frozenset({"trip_id", "zone_mode"}),
+}
+BATCH_COMMANDS = tuple(_COMMAND_FIELDS)
+_INT_FIELDS = frozenset({"limit", "min_minutes", "trip_id"})
+_BOOL_FIELDS = frozenset({"weather", "expand_stays", "sql"})
+
+
+@dataclass(frozen=True, slots=True)
+class BatchQuery:
+    """一条已解析的批量查询：行号、命令与参数。"""
+
+    line: int
+    command: str
+    params: Mapping[str, Any]
+
+
+def parse_batch_line(line_number: int, text: str) -> BatchQuery | None:
+    """解析一行输入：日期表达式或 JSON 查询；空行与 # 注释返回 None。"""
+
+    stripped = text.strip()
+    if not stripped or stripped.startswith("#"):
+        return None
+    if not stripped.startswith("{"):
+        return BatchQuery(line=line_number, command="timeline", params={"date": stripped})
+
+    try:
+        payload = json.loads(stripped)
+    except ValueError as exc:
+        raise ValueError(f"Invalid JSON query: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("JSON query must be an object.")
+    params = dict(payload)
+    command = params.pop("command", "timeline")
+    fields = _COMMAND_FIELDS.get(command) if isinstance(command, str) else None
+    if fields is None:
+        raise ValueError(f"Invalid command: {command!r}. Use one of: {', '.join(BATCH_COMMANDS)}.")
+    unknown = sorted(set(params) - fields)
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {command}: {', '.join(unknown)}.")
+    for name, value in params.items():
+        _check_field_type(name, value)
+    return BatchQuery(line=line_number, command=command, params=params)
+
+
+def _check_field_type(name: str, value: Any) -> None:
+    """JSON 字段类型校验：开关为 bool，数量与 id 为 int，其余为字符串。"""
+
+    if name in _BOOL_FIELDS:
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be bool.")
+    elif name in _INT_FIELDS:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{name} must be int.")
+    elif not isinstance(value, str):
+        raise ValueError(f"{name} must be str.")
+
+
+def run_batch(
+    session: RondSession,
+    lines: Iterable[str],
+    jobs: int = BATCH_DEFAULT_JOBS,
+) -> Iterator[dict[str, Any]]:
+    """逐行执行查询并按输入顺序产出结果字典；单行失败只影响该行。
+
+    jobs 大于 1 时在线程池中执行，会话应以 pool_size=jobs 创建：时间线服务带缓存且非线程安全，
+    依赖它的查询串行执行，统计与 SQL 下推排行可并行；最多预读 jobs * BATCH_PREFETCH_PER_JOB 行。
+    """
+
+    if jobs < 1:
+        raise ValueError("jobs must be >= 1.")
+    runner = _BatchRunner(session)
+    if jobs == 1:
+        for line_number, text in enumerate(lines, start=1):
+            outcome = runner.prepare(line_number, text)
+            if outcome is not None:
+                yield outcome()
+        return
+
+    pending: deque[Future[dict[str, Any]]] = deque()
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="rond-batch") as executor:
+        for line_number, text in enumerate(lines, start=1):
+            outcome = runner.prepare(line_number, text)
+            if outcome is None:
+                continue
+            pending.append(executor.submit(outcome))
+            while len(pending) >= jobs * BATCH_PREFETCH_PER_JOB:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _BatchRunner:
+    """把输入行转为可在任意线程执行的查询任务。"""
+
+    def __init__(self, session: RondSession) -> None:
+        self._session = session
+        self._lock = threading.Lock()
+
+    def prepare(self, line_number: int, text: str) -> Callable[[], dict[str, Any]] | None:
+        """解析一行；解析失败时任务直接返回错误结果，空行与注释返回 None。"""
+
+        try:
+            query = parse_batch_line(line_number, text)
+        except ValueError as exc:
+            error = {"line": line_number, "error": str(exc)}
+            return lambda: error
+        if query is None:
+            return None
+        return lambda: self._execute(query)
+
+    def _execute(self, query: BatchQuery) -> dict[str, Any]:
+        try:
+            if _is_concurrent(query):
+                result = self._build(query)
+            else:
+                with self._lock:
+                    result = self._build(query)
+        except (ConfigError, DatabaseReadError, ValueError, TypeError) as exc:
+            return {"line": query.line, "command": query.command, "error": str(exc)}
+        return {"line": query.line, "command": query.command, "result": result}
+
+    def _build(self, query: BatchQuery) -> dict[str, Any]:
+        session = self._session
+        params = query.params
+        command = query.command
+        if command == "timeline":
+            return timeline_to_dict(
+                session.timeline(
+                    params.get("date", "today"),
+                    zone_mode=params.get("zone_mode", "fixed"),
+                    weather=params.get("weather", False),
+                    expand_stays=params.get("expand_stays", False),
+                )
+            )
+        if command == "search":
+            return search_result_to_dict(session.search(_require(params, "query"), limit=params.get("limit", 20)))
+        if command == "trip":
+            trip = session.trip(_require(params, "trip_id"), zone_mode=params.get("zone_mode", "fixed"))
+            return trip_to_dict(trip)
+
+        start_expr = params.get("from", "today")
+        start_date, end_date = parse_date_range(start_expr, params.get("to") or start_expr, session.config.timezone)
+        if command == "range":
+            zone_mode = params.get("zone_mode", "fixed")
+            events = session.timeline_range(
+                start_date,
+                end_date,
+                zone_mode=zone_mode,
+                weather=params.get("weather", False),
+                expand_stays=params.get("expand_stays", False),
+            )
+            return {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "timezone": session.config.timezone_name,
+                "zone_mode": zone_mode,
+                "events": events_to_dicts(events),
+            }
+        if command == "gaps":
+            return gap_report_to_dict(session.gaps(start_date, end_date, min_minutes=params.get("min_minutes", 30)))
+        if command == "stats":
+            table = session.stats(
+                start_date,
+                end_date,
+                group_by=params.get("group_by", "category"),
+                period=params.get("period", "total"),
+            )
+            return stats_table_to_dict(table)
+        result = session.top(
+            start_date,
+            end_date,
+            dimension=params.get("dimension", "place"),
+            metric=params.get("metric", "dwell"),
+            limit=params.get("limit", 10),
+            push_down=params.get("sql", False),
+        )
+        return ranking_to_dict(result)
+
+
+def _is_concurrent(query: BatchQuery) -> bool:
+    """只读统计仓储的查询不经过带缓存的时间线服务，可并行。"""
+
+    return query.command == "stats" or (query.command == "top" and query.params.get("sql") is True)
+
+
+def _require(params: Mapping[str, Any], name: str) -> Any:
+    if name not in params:
+        raise ValueError(f"Missing field: {name}.")
+    return params[name]
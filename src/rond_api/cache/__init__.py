@@ -0,0 +1,6 @@
+"""Sidecar caches."""
+
+from rond_api.cache.resolution_cache import LocationResolutionCache
+from rond_api.cache.search_index import SearchIndex
+
+__all__ = ["LocationResolutionCache", "SearchIndex"]
@@ -0,0 +1,153 @@
+"""未知地点解析结果的持久缓存。"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+CACHE_FORMAT_VERSION = 1
+COORDINATE_PRECISION = 6
+MISSING = object()
+
+
+class LocationResolutionCache:
+    """按（取整经纬度, 半径）缓存最近地点选择结果，LRU 淘汰并写入边车 JSON 文件。
+
+    缓存与 ZLOCATION/ZACTIVITY 指纹绑定，指纹变化（地点或活动被修改）时整体失效。
+    服务端与批量查询会在多个线程中使用同一实例，读写与落盘都在锁内进行。
+    """
+
+    def __init__(self, path: Path | str, max_entries: int = 4_096) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0.")
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self._fingerprint: str | None = None
+        self._entries: OrderedDict[str, dict[str, Any] | None] = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def validate(self, fingerprint: str) -> None:
+        """指纹变化时清空缓存。"""
+
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return
+            self._entries.clear()
+            self._fingerprint = fingerprint
+            self._dirty = True
+
+    def get(self, latitude: float, longitude: float, radius_m: float) -> Any:
+        """命中返回地点字典或 None（半径内无地点），未命中返回 MISSING。"""
+
+        key = _cache_key(latitude, longitude, radius_m)
+        with self._lock:
+            if key not in self._entries:
+                return MISSING
+            self._entries.move_to_end(key)
+            value = self._entries[key]
+        return dict(value) if value is not None else None
+
+    def put(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        location: dict[str, object] | None,
+    ) -> None:
+        """写入解析结果，只保留时间线需要的字段。"""
+
+        key = _cache_key(latitude, longitude, radius_m)
+        value: dict[str, Any] | None = None
+        if location is not None:
+            value = {
+                "location_id": location.get("location_id"),
+                "location_name": location.get("location_name"),
+                "location_type": location.get("location_type"),
+                "poi_category": location.get("poi_category"),
+                "home_visit_count": 1 if int(location.get("home_visit_count") or 0) > 0 else 0,
+            }
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def shrink(self, max_entries: int) -> None:
+        """按 LRU 淘汰到最多 max_entries 条（仅内存，下次保存时写回）。"""
+
+        with self._lock:
+            if len(self._entries) <= max_entries:
+                return
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        """有变更时原子写回边车文件；临时文件名每次唯一，并发写入互不覆盖。"""
+
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(
+                {
+                    "version": CACHE_FORMAT_VERSION,
+                    "fingerprint": self._fingerprint,
+                    "entries": list(self._entries.items()),
+                },
+                ensure_ascii=False,
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.path.parent,
+                prefix=f"{self.path.name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as handle:
+                handle.write(payload)
+            try:
+                os.replace(handle.name, self.path)
+            except OSError:
+                os.unlink(handle.name)
+                raise
+            self._dirty = False
+
+    def _load(self) -> None:
+        """读取边车文件，损坏或版本不符时视为空缓存。"""
+
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(payload, dict) or payload.get("version") != CACHE_FORMAT_VERSION:
+            return
+
+        fingerprint = payload.get("fingerprint")
+        self._fingerprint = fingerprint if isinstance(fingerprint, str) else None
+        for item in payload.get("entries") or []:
+            if not isinstance(item, list) or len(item) != 2:
+                continue
+            key, value = item
+            if isinstance(key, str) and (value is None or isinstance(value, dict)):
+                self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _cache_key(latitude: float, longitude: float, radius_m: float) -> str:
+    return (
+        f"{round(latitude, COORDINATE_PRECISION)}|"
+        f"{round(longitude, COORDINATE_PRECISION)}|{round(radius_m, 1)}"
+    )
@@ -0,0 +1,189 @@
+"""全文检索边车索引（SQLite FTS5）。"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable
+
+from rond_api.db.sqlite_client import DatabaseReadError
+
+SEARCH_INDEX_FORMAT_VERSION = "1"
+# rowid = source_id * 4 + 类型编码，按来源主键直接定位文档。
+KIND_CODES = {"location": 0, "visit": 1, "movement": 2, "journal": 3}
+# trigram 分词按任意 3 字符子串匹配，适合无空格分词的中文；更短的词走 LIKE 扫描边车表。
+TRIGRAM_MIN_LENGTH = 3
+
+
+class SearchIndex:
+    """边车 FTS5 索引：文档表 + 元数据表（格式版本、存储 UUID、历史游标）。
+
+    path 为 None 时使用内存库，仅在当前进程内有效。
+    """
+
+    def __init__(self, path: Path | str | None) -> None:
+        self.path = Path(path).expanduser() if path is not None else None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path) if self.path is not None else ":memory:")
+        self._connection.row_factory = sqlite3.Row
+        try:
+            self._ensure_schema()
+        except sqlite3.OperationalError as exc:
+            self._connection.close()
+            raise DatabaseReadError(f"SQLite FTS5 search index is unavailable: {exc}") from exc
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get_meta(self, key: str) -> str | None:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?;", (key,)).fetchone()
+        return str(row["value"]) if row is not None else None
+
+    def set_meta(self, values: dict[str, str]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?);",
+                list(values.items()),
+            )
+
+    def clear(self) -> None:
+        """清空文档与同步状态，保留格式版本与分词器。"""
+
+        with self._connection:
+            self._connection.execute("DELETE FROM documents;")
+            self._connection.execute("DELETE FROM meta WHERE key NOT IN ('format_version', 'tokenizer');")
+
+    def replace_documents(
+        self,
+        kind: str,
+        source_ids: Iterable[int],
+        documents: Iterable[dict[str, Any]],
+    ) -> None:
+        """删除给定来源的旧文档并写入新文档（已删除的来源只删不写）。"""
+
+        code = KIND_CODES[kind]
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM documents WHERE rowid = ?;",
+                [(int(source_id) * 4 + code,) for source_id in source_ids],
+            )
+            self._insert(kind, documents)
+
+    def add_documents(self, kind: str, documents: Iterable[dict[str, Any]]) -> None:
+        """批量写入文档（全量重建用）。"""
+
+        with self._connection:
+            self._insert(kind, documents)
+
+    def search(self, query: str, limit: int) -> list[dict[str, Any]]:
+        """检索并按相关度排序；含过短词时退化为 LIKE 子串匹配、按日期倒序。"""
+
+        terms = query.split()
+        if not terms:
+            return []
+        use_match = self._tokenizer() != "trigram" or all(len(term) >= TRIGRAM_MIN_LENGTH for term in terms)
+        if use_match:
+            sql = """
+            SELECT
+                kind,
+                source_id,
+                title,
+                date_core,
+                CASE
+                    WHEN body = '' THEN highlight(documents, 0, '[', ']')
+                    ELSE snippet(documents, 1, '[', ']', '…', 16)
+                END AS snippet,
+                bm25(documents, 4.0, 1.0) AS score
+            FROM documents
+            WHERE documents MATCH :match
+            ORDER BY score ASC, date_core DESC
+            LIMIT :limit;
+            """
+            params: dict[str, Any] = {"match": _match_expression(terms), "limit": limit}
+        else:
+            conditions = []
+            params = {"limit": limit}
+            for index, term in enumerate(terms):
+                params[f"term_{index}"] = f"%{_escape_like(term)}%"
+                conditions.append(
+                    f"(title LIKE :term_{index} ESCAPE '\\' OR body LIKE :term_{index} ESCAPE '\\')"
+                )
+            sql = f"""
+            SELECT
+                kind, source_id, title, date_core,
+                COALESCE(NULLIF(substr(body, 1, 48), ''), title) AS snippet,
+                NULL AS score
+            FROM documents
+            WHERE {" AND ".join(conditions)}
+            ORDER BY date_core DESC
+            LIMIT :limit;
+            """
+        return [dict(row) for row in self._connection.execute(sql, params).fetchall()]
+
+    def _insert(self, kind: str, documents: Iterable[dict[str, Any]]) -> None:
+        code = KIND_CODES[kind]
+        self._connection.executemany(
+            """
+            INSERT OR REPLACE INTO documents (rowid, title, body, kind, source_id, date_core)
+            VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            [
+                (
+                    int(document["source_id"]) * 4 + code,
+                    str(document.get("title") or ""),
+                    str(document.get("body") or ""),
+                    kind,
+                    int(document["source_id"]),
+                    document.get("date_core"),
+                )
+                for document in documents
+            ],
+        )
+
+    def _tokenizer(self) -> str:
+        return self.get_meta("tokenizer") or "unicode61"
+
+    def _ensure_schema(self) -> None:
+        """建表；旧格式或缺失表时重建，trigram 不可用时退回 unicode61。"""
+
+        connection = self._connection
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);")
+        has_documents = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'documents';"
+        ).fetchone() is not None
+        if has_documents and self.get_meta("format_version") == SEARCH_INDEX_FORMAT_VERSION:
+            return
+
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS documents;")
+            tokenizer = "trigram"
+            try:
+                connection.execute(_create_documents_sql(tokenizer))
+            except sqlite3.OperationalError:
+                tokenizer = "unicode61"
+                connection.execute(_create_documents_sql(tokenizer))
+            connection.execute("DELETE FROM meta;")
+            connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?);",
+                [("format_version", SEARCH_INDEX_FORMAT_VERSION), ("tokenizer", tokenizer)],
+            )
+
+
+def _create_documents_sql(tokenizer: str) -> str:
+    return f"""
+    CREATE VIRTUAL TABLE documents USING fts5(
+        title, body, kind UNINDEXED, source_id UNINDEXED, date_core UNINDEXED,
+        tokenize = '{tokenizer}'
+    );
+    """
+
+
+def _match_expression(terms: list[str]) -> str:
+    """每个词按短语引用，多个词之间为 AND。"""
+
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -5,14 +5,22 @@ from __future__ import annotations
 import argparse
 import os
 import sys
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
-from rond_api.config import ConfigError
-from rond_api.db.sqlite_client import DatabaseReadError
-from rond_api.domain.timeline_types import OutputMode, TimelineResult
-from rond_api.formatters.timeline_json import render_timeline_json
-from rond_api.formatters.timeline_pretty import DurationUnitStyle, render_timeline_pretty
-from rond_api.services.timeline_service import get_timeline
+from rond_api.defaults import (
+    BATCH_DEFAULT_JOBS,
+    SERVE_DEFAULT_HOST,
+    SERVE_DEFAULT_PORT,
+    SERVE_DEFAULT_WORKERS,
+    TENANT_DEFAULT_MAX_OPEN,
+    WATCH_DEFAULT_INTERVAL_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from rond_api.domain.timeline_types import OutputMode, TimelineResult
+    from rond_api.formatters.timeline_pretty import DurationUnitStyle
+
+# 子命令、服务与格式化模块在各自的 _run_* 中按需导入，--help 与 JSON 输出不加载用不到的模块。
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -40,6 +48,33 @@ def build_parser() -> argparse.ArgumentParser:
         default="pretty",
         help="Output format.",
     )
+    timeline_parser.add_argument(
+        "--zone-mode",
+        choices=["fixed", "event", "traveller"],
+        default="fixed",
+        help="Timezone handling: fixed query zone | event recorded zone | traveller local day.",
+    )
+    timeline_parser.add_argument(
+        "--weather",
+        action="store_true",
+        help="Attach hourly weather summaries to visits.",
+    )
+    timeline_parser.add_argument(
+        "--expand-stays",
+        action="store_true",
+        help="Expand nested child visits and stay segments under each visit.",
+    )
+    timeline_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and print only events added or changed when the database changes.",
+    )
+    timeline_parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_DEFAULT_INTERVAL_SECONDS,
+        help="Seconds between change checks in --watch mode.",
+    )
     timeline_parser.add_argument(
         "--no-emoji",
         action="store_true",
@@ -74,9 +109,210 @@ def build_parser() -> argparse.ArgumentParser:
     )
     timeline_parser.set_defaults(tree_mode=None)
 
+    gaps_parser = subparsers.add_parser(
+        "gaps",
+        help="Find untracked periods in a date range.",
+    )
+    _add_range_arguments(gaps_parser)
+    gaps_parser.add_argument(
+        "--min-minutes",
+        type=int,
+        default=30,
+        help="Only report gaps at least this long.",
+    )
+
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Aggregate dwell and transport time in a date range.",
+    )
+    _add_range_arguments(stats_parser)
+    stats_parser.add_argument(
+        "--group-by",
+        choices=["category", "location", "transport", "weekday", "hour"],
+        default="category",
+        help="Grouping dimension.",
+    )
+    stats_parser.add_argument(
+        "--period",
+        choices=["total", "day", "week"],
+        default="total",
+        help="Bucket totals per day or week.",
+    )
+
+    top_parser = subparsers.add_parser(
+        "top",
+        help="Rank places, categories, routes or transports in a date range.",
+    )
+    _add_range_arguments(top_parser)
+    top_parser.add_argument(
+        "--by",
+        dest="dimension",
+        choices=["place", "category", "route", "transport"],
+        default="place",
+        help="Ranking dimension.",
+    )
+    top_parser.add_argument(
+        "--metric",
+        choices=["dwell", "count"],
+        default="dwell",
+        help="Rank by total time or by number of events.",
+    )
+    top_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of entries to show.",
+    )
+    top_parser.add_argument(
+        "--sql",
+        action="store_true",
+        help="Aggregate in SQL (faster; skips nearby-location fallback for unknown places).",
+    )
+
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Full-text search over place names, notes, remarks and journal.",
+    )
+    search_parser.add_argument("query", help="Search text; multiple words must all match.")
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of hits.",
+    )
+    search_parser.add_argument(
+        "--db-path",
+        help="Path to Rond sqlite database file.",
+    )
+    search_parser.add_argument(
+        "--output",
+        choices=["pretty", "json"],
+        default="pretty",
+        help="Output format.",
+    )
+    search_parser.add_argument(
+        "--no-emoji",
+        action="store_true",
+        help="Disable emoji in pretty output.",
+    )
+
+    trip_parser = subparsers.add_parser(
+        "trip",
+        help="Get a trip timeline split into days with summaries.",
+    )
+    trip_parser.add_argument("trip_id", type=int, help="Trip primary key (ZTRIP.Z_PK).")
+    trip_parser.add_argument(
+        "--db-path",
+        help="Path to Rond sqlite database file.",
+    )
+    trip_parser.add_argument(
+        "--output",
+        choices=["pretty", "json"],
+        default="pretty",
+        help="Output format.",
+    )
+    trip_parser.add_argument(
+        "--zone-mode",
+        choices=["fixed", "event", "traveller"],
+        default="fixed",
+        help="Timezone handling: fixed trip zone | event recorded zone | traveller local day.",
+    )
+    trip_parser.add_argument(
+        "--no-emoji",
+        action="store_true",
+        help="Disable emoji in pretty output.",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve timeline, range and stats as a local HTTP JSON API.",
+    )
+    serve_parser.add_argument(
+        "--db-path",
+        help="Path to Rond sqlite database file.",
+    )
+    serve_parser.add_argument(
+        "--host",
+        default=SERVE_DEFAULT_HOST,
+        help="Bind address.",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=SERVE_DEFAULT_PORT,
+        help="Bind port (0 picks a free port).",
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=SERVE_DEFAULT_WORKERS,
+        help="Worker threads for blocking SQLite reads.",
+    )
+    serve_parser.add_argument(
+        "--tenants",
+        help="JSON file mapping tenant ids to db_path/timezone; serves /tenants/<id>/... routes instead of --db-path.",
+    )
+    serve_parser.add_argument(
+        "--max-open-tenants",
+        type=int,
+        default=TENANT_DEFAULT_MAX_OPEN,
+        help="Tenants kept open before least recently used ones are closed.",
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run many queries in one process and print NDJSON results in input order.",
+    )
+    batch_parser.add_argument(
+        "--input",
+        default="-",
+        help="File with one date expression or JSON query per line ('-' reads stdin).",
+    )
+    batch_parser.add_argument(
+        "--db-path",
+        help="Path to Rond sqlite database file.",
+    )
+    batch_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=BATCH_DEFAULT_JOBS,
+        help="Worker threads; timeline-based queries still run one at a time.",
+    )
+
     return parser
 
 
+def _add_range_arguments(parser: argparse.ArgumentParser) -> None:
+    """添加区间查询通用参数。"""
+
+    parser.add_argument(
+        "--from",
+        dest="from_date",
+        default="today",
+        help="Start date expression: today | yesterday | YYYY-MM-DD",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_date",
+        help="End date expression (inclusive). Defaults to --from.",
+    )
+    parser.add_argument(
+        "--db-path",
+        help="Path to Rond sqlite database file.",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["pretty", "json"],
+        default="pretty",
+        help="Output format.",
+    )
+    parser.add_argument(
+        "--no-emoji",
+        action="store_true",
+        help="Disable emoji in pretty output.",
+    )
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     """CLI 主入口。"""
 
@@ -85,6 +321,20 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     if args.command == "timeline":
         return _run_timeline(args)
+    if args.command == "gaps":
+        return _run_gaps(args)
+    if args.command == "stats":
+        return _run_stats(args)
+    if args.command == "top":
+        return _run_top(args)
+    if args.command == "search":
+        return _run_search(args)
+    if args.command == "trip":
+        return _run_trip(args)
+    if args.command == "serve":
+        return _run_serve(args)
+    if args.command == "batch":
+        return _run_batch(args)
 
     parser.print_help()
     return 1
@@ -93,6 +343,12 @@ def main(argv: Sequence[str] | None = None) -> int:
 def _run_timeline(args: argparse.Namespace) -> int:
     output = args.output
     assert output in {"pretty", "json", "both"}
+    if args.watch:
+        return _run_timeline_watch(args)
+
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.services.timeline_service import get_timeline
 
     try:
         timeline = get_timeline(
@@ -100,6 +356,9 @@ def _run_timeline(args: argparse.Namespace) -> int:
             db_path=args.db_path,
             output=output,
             emoji=not args.no_emoji,
+            zone_mode=args.zone_mode,
+            weather=args.weather,
+            expand_stays=args.expand_stays,
         )
     except (ConfigError, DatabaseReadError, ValueError) as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -120,6 +379,253 @@ def _run_timeline(args: argparse.Namespace) -> int:
     return 0
 
 
+def _run_timeline_watch(args: argparse.Namespace) -> int:
+    import json
+
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.domain.timeline_types import TimelineResult
+    from rond_api.formatters.timeline_json import timeline_update_to_dict
+    from rond_api.formatters.timeline_pretty import write_timeline_pretty
+    from rond_api.services.watch_service import watch_timeline
+
+    complex_mode = _resolve_complex_mode(args.complex_mode)
+    tree_mode = _resolve_tree_mode(args.tree_mode)
+    duration_unit_style = _resolve_duration_unit_style()
+    try:
+        for update in watch_timeline(
+            date_expr=args.date,
+            db_path=args.db_path,
+            zone_mode=args.zone_mode,
+            interval_seconds=args.interval,
+            weather=args.weather,
+            expand_stays=args.expand_stays,
+        ):
+            # 与单次查询一致：both 先输出可读增量，再输出同一次更新的 JSON 行。
+            if args.output in ("pretty", "both"):
+                delta = TimelineResult(
+                    query_date=update.timeline.query_date,
+                    timezone=update.timeline.timezone,
+                    events=update.changed,
+                    zone_mode=update.timeline.zone_mode,
+                )
+                write_timeline_pretty(
+                    delta,
+                    sys.stdout,
+                    emoji=not args.no_emoji,
+                    complex_mode=complex_mode,
+                    tree=tree_mode,
+                    duration_unit_style=duration_unit_style,
+                )
+                if update.removed:
+                    print(f"已移除 {len(update.removed)} 个事件")
+                print(flush=True)
+            if args.output in ("json", "both"):
+                print(json.dumps(timeline_update_to_dict(update), ensure_ascii=False), flush=True)
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    return 0
+
+
+def _run_gaps(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.formatters.report_json import gap_report_to_dict, render_report_json
+    from rond_api.formatters.report_pretty import render_gap_report_pretty
+    from rond_api.services.gap_service import find_gaps
+
+    try:
+        report = find_gaps(
+            start=args.from_date,
+            end=args.to_date or args.from_date,
+            min_minutes=args.min_minutes,
+            db_path=args.db_path,
+        )
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.output == "json":
+        print(render_report_json(gap_report_to_dict(report)))
+    else:
+        print(
+            render_gap_report_pretty(
+                report,
+                emoji=not args.no_emoji,
+                duration_unit_style=_resolve_duration_unit_style(),
+            )
+        )
+    return 0
+
+
+def _run_stats(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.formatters.report_json import render_report_json, stats_table_to_dict
+    from rond_api.formatters.report_pretty import render_stats_pretty
+    from rond_api.services.stats_service import get_stats
+
+    try:
+        table = get_stats(
+            start=args.from_date,
+            end=args.to_date or args.from_date,
+            group_by=args.group_by,
+            period=args.period,
+            db_path=args.db_path,
+        )
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.output == "json":
+        print(render_report_json(stats_table_to_dict(table)))
+    else:
+        print(render_stats_pretty(table, emoji=not args.no_emoji))
+    return 0
+
+
+def _run_top(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.formatters.report_json import ranking_to_dict, render_report_json
+    from rond_api.formatters.report_pretty import render_ranking_pretty
+    from rond_api.services.ranking_service import get_top
+
+    try:
+        result = get_top(
+            start=args.from_date,
+            end=args.to_date or args.from_date,
+            dimension=args.dimension,
+            metric=args.metric,
+            limit=args.limit,
+            push_down=args.sql,
+            db_path=args.db_path,
+        )
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.output == "json":
+        print(render_report_json(ranking_to_dict(result)))
+    else:
+        print(render_ranking_pretty(result, emoji=not args.no_emoji))
+    return 0
+
+
+def _run_search(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.formatters.report_json import render_report_json, search_result_to_dict
+    from rond_api.formatters.report_pretty import render_search_pretty
+    from rond_api.services.search_service import search
+
+    try:
+        result = search(query=args.query, limit=args.limit, db_path=args.db_path)
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.output == "json":
+        print(render_report_json(search_result_to_dict(result)))
+    else:
+        print(render_search_pretty(result, emoji=not args.no_emoji))
+    return 0
+
+
+def _run_trip(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.formatters.timeline_json import render_trip_json
+    from rond_api.formatters.timeline_pretty import write_trip_pretty
+    from rond_api.services.trip_service import get_trip_timeline
+
+    try:
+        trip = get_trip_timeline(trip_id=args.trip_id, db_path=args.db_path, zone_mode=args.zone_mode)
+    except (ConfigError, DatabaseReadError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.output == "json":
+        print(render_trip_json(trip))
+    else:
+        write_trip_pretty(
+            trip,
+            sys.stdout,
+            emoji=not args.no_emoji,
+            complex_mode=_resolve_complex_mode(None),
+            tree=_resolve_tree_mode(None),
+            duration_unit_style=_resolve_duration_unit_style(),
+        )
+    return 0
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    from rond_api.config import ConfigError
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.server import RondHTTPServer, serve
+    from rond_api.tenants import TenantRegistry
+
+    def announce(server: RondHTTPServer) -> None:
+        print(f"Serving on http://{server.host}:{server.port}", file=sys.stderr, flush=True)
+
+    try:
+        registry = None
+        if args.tenants:
+            registry = TenantRegistry.from_file(
+                args.tenants,
+                max_open=args.max_open_tenants,
+                pool_size=args.workers,
+            )
+        serve(
+            db_path=args.db_path,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            ready=announce,
+            registry=registry,
+        )
+    except (ConfigError, DatabaseReadError, ValueError, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    return 0
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    import contextlib
+    import json
+
+    from rond_api.batch import run_batch
+    from rond_api.config import ConfigError, load_app_config
+    from rond_api.db.sqlite_client import DatabaseReadError
+    from rond_api.session import RondSession
+
+    failures = 0
+    try:
+        if args.jobs < 1:
+            raise ValueError("jobs must be >= 1.")
+        config = load_app_config(db_path=args.db_path)
+        with contextlib.ExitStack() as stack:
+            if args.input == "-":
+                lines = sys.stdin
+            else:
+                lines = stack.enter_context(open(args.input, encoding="utf-8"))
+            session = stack.enter_context(RondSession(config=config, pool_size=args.jobs if args.jobs > 1 else 0))
+            for outcome in run_batch(session, lines, jobs=args.jobs):
+                failures += "error" in outcome
+                print(json.dumps(outcome, ensure_ascii=False), flush=True)
+    except (ConfigError, DatabaseReadError, ValueError, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failures else 0
+
+
 def _render_output(
     timeline: TimelineResult,
     output: OutputMode,
@@ -129,18 +635,21 @@ def _render_output(
     duration_unit_style: DurationUnitStyle,
 ) -> None:
     if output in ("pretty", "both"):
-        print(
-            render_timeline_pretty(
-                timeline,
-                emoji=emoji,
-                complex_mode=complex_mode,
-                tree=tree_mode,
-                duration_unit_style=duration_unit_style,
-            )
+        from rond_api.formatters.timeline_pretty import write_timeline_pretty
+
+        write_timeline_pretty(
+            timeline,
+            sys.stdout,
+            emoji=emoji,
+            complex_mode=complex_mode,
+            tree=tree_mode,
+            duration_unit_style=duration_unit_style,
         )
     if output == "both":
         print()
     if output in ("json", "both"):
+        from rond_api.formatters.timeline_json import render_timeline_json
+
         print(render_timeline_json(timeline))
 
 
@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
 from dataclasses import dataclass
 from datetime import datetime, tzinfo
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from dotenv import load_dotenv
 
 
+ZONE_CACHE_SIZE = 64
+
+
 class ConfigError(ValueError):
     """配置相关错误。"""
 
@@ -22,6 +27,7 @@ class AppConfig:
     db_path: Path
     timezone: tzinfo
     timezone_name: str
+    cache_dir: Path | None = None
 
 
 def load_app_config(
@@ -37,9 +43,30 @@ def load_app_config(
         db_path=resolved_db_path,
         timezone=resolved_timezone,
         timezone_name=resolved_timezone_name,
+        cache_dir=resolve_cache_dir(),
     )
 
 
+def resolve_cache_dir() -> Path | None:
+    """解析边车缓存目录（ROND_CACHE_DIR），未设置时不启用持久缓存。"""
+
+    raw_path = os.getenv("ROND_CACHE_DIR")
+    if raw_path is None or not raw_path.strip():
+        return None
+    return _normalize_path(raw_path.strip())
+
+
+def db_cache_path(cache_dir: Path, db_path: Path, filename: str) -> Path:
+    """缓存目录下某个数据库专属的边车文件。
+
+    文件名附加数据库绝对路径的摘要，多个数据库（租户或切换 ROND_DB_PATH）共用目录时互不干扰。
+    """
+
+    digest = hashlib.sha256(str(db_path.expanduser().resolve()).encode("utf-8")).hexdigest()[:16]
+    stem, dot, suffix = filename.rpartition(".")
+    return cache_dir / (f"{stem}-{digest}.{suffix}" if dot else f"{filename}-{digest}")
+
+
 def resolve_db_path(db_path: str | None = None) -> Path:
     """解析数据库路径。"""
 
@@ -102,7 +129,8 @@ def resolve_timezone(timezone_name: str | None = None) -> tuple[tzinfo, str]:
             raise ConfigError(f"Unknown timezone: {timezone_name}") from exc
         return zone, timezone_name
 
-    local_timezone = datetime.now().astimezone().tzinfo
+    local_now = datetime.now().astimezone()
+    local_timezone = local_now.tzinfo
     if local_timezone is None:
         raise ConfigError("Unable to determine system timezone.")
 
@@ -110,8 +138,22 @@ def resolve_timezone(timezone_name: str | None = None) -> tuple[tzinfo, str]:
     if isinstance(zone_key, str) and zone_key:
         return local_timezone, zone_key
 
-    zone_name = datetime.now().astimezone().tzname() or "local"
-    return local_timezone, zone_name
+    return local_timezone, local_now.tzname() or "local"
+
+
+@lru_cache(maxsize=ZONE_CACHE_SIZE)
+def get_cached_zone(zone_name: str | None) -> tzinfo | None:
+    """按时区标识获取共享的 ZoneInfo，无法识别时返回 None。"""
+
+    if not zone_name:
+        return None
+    normalized = zone_name.strip()
+    if not normalized:
+        return None
+    try:
+        return ZoneInfo(normalized)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
 
 
 def _normalize_path(raw_path: str) -> Path:
@@ -1,5 +1,6 @@
 """Database helpers."""
 
+from rond_api.db.change_watcher import DatabaseChangeWatcher
 from rond_api.db.sqlite_client import DatabaseReadError, SQLiteReadClient
 
-__all__ = ["DatabaseReadError", "SQLiteReadClient"]
+__all__ = ["DatabaseChangeWatcher", "DatabaseReadError", "SQLiteReadClient"]
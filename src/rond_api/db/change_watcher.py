@@ -0,0 +1,77 @@
+"""数据库变更检测。"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import quote
+
+from rond_api.db.sqlite_client import DatabaseReadError
+
+ChangeToken = tuple[int, tuple[int, int] | None, tuple[int, int] | None]
+
+
+class DatabaseChangeWatcher:
+    """持有一个只读连接，用 PRAGMA data_version 与 WAL/主文件的大小、修改时间判断数据库是否变化。
+
+    data_version 只在其他连接提交后变化，检查本身不读取任何表，开销可忽略；连接加锁后可跨线程使用与关闭。
+    """
+
+    def __init__(self, db_path: Path | str) -> None:
+        self.db_path = Path(db_path).expanduser().resolve()
+        self._wal_path = self.db_path.with_name(f"{self.db_path.name}-wal")
+        self._connection: sqlite3.Connection | None = None
+        self._last_token: ChangeToken | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> DatabaseChangeWatcher:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭持有的连接。"""
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def has_changed(self) -> bool:
+        """与上次检查相比数据库是否变化；首次调用只记录基线并返回 False。"""
+
+        token = self.current_token()
+        previous, self._last_token = self._last_token, token
+        return previous is not None and token != previous
+
+    def current_token(self) -> ChangeToken:
+        """当前变更令牌：data_version 与 WAL/主文件签名，任一提交都会改变它。"""
+
+        try:
+            with self._lock:
+                row = self._connect().execute("PRAGMA data_version;").fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseReadError(f"SQLite change check failed: {exc}") from exc
+        return int(row[0]), _file_signature(self._wal_path), _file_signature(self.db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            uri = f"file:{quote(str(self.db_path), safe='/')}?mode=ro"
+            try:
+                self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            except sqlite3.Error as exc:
+                raise DatabaseReadError(f"SQLite change check failed: {exc}") from exc
+        return self._connection
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    """文件大小与纳秒修改时间，不存在时返回 None。"""
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from typing import Any, Callable, Mapping, Sequence
 from urllib.parse import quote
 
 
@@ -16,19 +18,43 @@ class DatabaseReadError(RuntimeError):
 
 @dataclass(slots=True)
 class SQLiteReadClient:
-    """带锁重试的 SQLite 只读客户端。"""
+    """带锁重试的 SQLite 只读客户端。
+
+    pool_size 为 0 时每次查询新建并关闭连接；大于 0 时启用线程安全的连接池，最多同时持有
+    pool_size 个只读连接（即并发上限），超出的线程按到达顺序排队。遇到写入方持锁而重试时，
+    连接先归还再重新排队，等待中的读取不会因重试线程插队而饿死。
+    """
 
     db_path: Path | str
     busy_timeout_ms: int = 3_000
     max_retries: int = 3
     retry_backoff_seconds: float = 0.05
+    pool_size: int = 0
+    pool_timeout_seconds: float = 30.0
     _db_uri: str = field(init=False, repr=False)
+    _pool: _ConnectionPool | None = field(init=False, repr=False, default=None)
 
     def __post_init__(self) -> None:
+        if self.pool_size < 0:
+            raise ValueError("pool_size must be >= 0.")
         resolved_path = Path(self.db_path).expanduser().resolve()
         self.db_path = resolved_path
         encoded_path = quote(str(resolved_path), safe="/")
         self._db_uri = f"file:{encoded_path}?mode=ro"
+        if self.pool_size > 0:
+            self._pool = _ConnectionPool(self._connect, self.pool_size)
+
+    def __enter__(self) -> SQLiteReadClient:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭连接池中的连接；借出中的连接在归还时关闭。"""
+
+        if self._pool is not None:
+            self._pool.close()
 
     def execute_query(
         self,
@@ -64,14 +90,38 @@ class SQLiteReadClient:
     ) -> list[sqlite3.Row]:
         """执行单次查询。"""
 
-        with sqlite3.connect(self._db_uri, uri=True) as connection:
+        if self._pool is None:
+            connection = self._connect()
+            try:
+                return _fetch_all(connection, sql, params)
+            finally:
+                connection.close()
+
+        connection = self._pool.checkout(self.pool_timeout_seconds)
+        broken = False
+        try:
+            return _fetch_all(connection, sql, params)
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.Error:
+            # 非操作类错误（如接口/损坏错误）后不再复用该连接。
+            broken = True
+            raise
+        finally:
+            self._pool.checkin(connection, broken=broken)
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开只读连接；连接池中的连接同一时刻只被一个线程使用。"""
+
+        connection = sqlite3.connect(self._db_uri, uri=True, check_same_thread=False)
+        try:
             connection.row_factory = sqlite3.Row
             connection.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms};")
             connection.execute("PRAGMA query_only = ON;")
-            cursor = connection.execute(sql, params)
-            rows = cursor.fetchall()
-            cursor.close()
-            return rows
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
 
     @staticmethod
     def _is_retryable(exc: sqlite3.OperationalError) -> bool:
@@ -79,3 +129,105 @@ class SQLiteReadClient:
 
         message = str(exc).lower()
         return "locked" in message or "busy" in message
+
+
+class _PoolWaiter:
+    """排队中的借用请求，由归还方直接移交连接。"""
+
+    __slots__ = ("event", "connection", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.connection: sqlite3.Connection | None = None
+        self.error: BaseException | None = None
+
+
+class _ConnectionPool:
+    """固定上限的只读连接池，借用请求严格按到达顺序（FIFO）移交。"""
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int) -> None:
+        self._factory = factory
+        self._size = size
+        self._lock = threading.Lock()
+        self._idle: list[sqlite3.Connection] = []
+        self._waiters: deque[_PoolWaiter] = deque()
+        self._created = 0
+        self._closed = False
+
+    def checkout(self, timeout: float) -> sqlite3.Connection:
+        """借出连接；已有排队者时新请求排到队尾，不插队。"""
+
+        with self._lock:
+            if self._closed:
+                raise DatabaseReadError("SQLite client is closed.")
+            if not self._waiters:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self._size:
+                    connection = self._factory()
+                    self._created += 1
+                    return connection
+            waiter = _PoolWaiter()
+            self._waiters.append(waiter)
+
+        if not waiter.event.wait(timeout):
+            with self._lock:
+                if not waiter.event.is_set():
+                    self._waiters.remove(waiter)
+                    raise DatabaseReadError(f"Timed out after {timeout}s waiting for a pooled SQLite connection.")
+        if waiter.error is not None:
+            raise DatabaseReadError(f"SQLite connection failed: {waiter.error}") from waiter.error
+        if waiter.connection is None:
+            raise DatabaseReadError("SQLite client is closed.")
+        return waiter.connection
+
+    def checkin(self, connection: sqlite3.Connection, broken: bool = False) -> None:
+        """归还连接：优先直接移交给队首等待者。"""
+
+        with self._lock:
+            if self._closed or broken:
+                connection.close()
+                self._created -= 1
+                if self._closed or not self._waiters:
+                    return
+                # 替换损坏的连接给队首等待者。
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.connection = self._factory()
+                    self._created += 1
+                except sqlite3.Error as exc:
+                    waiter.error = exc
+                waiter.event.set()
+                return
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.connection = connection
+                waiter.event.set()
+                return
+            self._idle.append(connection)
+
+    def close(self) -> None:
+        """关闭空闲连接并唤醒全部等待者。"""
+
+        with self._lock:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._created -= len(self._idle)
+            self._idle.clear()
+            while self._waiters:
+                self._waiters.popleft().event.set()
+
+
+def _fetch_all(
+    connection: sqlite3.Connection,
+    sql: str,
+    params: Sequence[Any] | Mapping[str, Any],
+) -> list[sqlite3.Row]:
+    """执行查询并读取全部结果，不开启事务，每条语句读取最新快照。"""
+
+    cursor = connection.execute(sql, params)
+    try:
+        return cursor.fetchall()
+    finally:
+        cursor.close()
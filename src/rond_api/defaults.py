@@ -0,0 +1,11 @@
+"""命令行参数与各服务共用的默认值。
+
+本模块不导入任何其他模块，CLI 构建参数解析器时只需加载它，子命令的实现按需导入。
+"""
+
+WATCH_DEFAULT_INTERVAL_SECONDS = 60.0
+SERVE_DEFAULT_HOST = "127.0.0.1"
+SERVE_DEFAULT_PORT = 8765
+SERVE_DEFAULT_WORKERS = 4
+TENANT_DEFAULT_MAX_OPEN = 8
+BATCH_DEFAULT_JOBS = 1
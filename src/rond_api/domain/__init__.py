@@ -1,10 +1,27 @@
 """Domain types."""
 
+from rond_api.domain.locate_types import LocateResult
 from rond_api.domain.timeline_types import (
     MovementEvent,
+    NestedStop,
     TimelineEvent,
     TimelineResult,
+    TimelineUpdate,
     VisitEvent,
+    VisitWeather,
 )
+from rond_api.domain.trip_types import TripDay, TripSummary, TripTimeline
 
-__all__ = ["MovementEvent", "TimelineEvent", "TimelineResult", "VisitEvent"]
+__all__ = [
+    "LocateResult",
+    "MovementEvent",
+    "NestedStop",
+    "TimelineEvent",
+    "TimelineResult",
+    "TimelineUpdate",
+    "TripDay",
+    "TripSummary",
+    "TripTimeline",
+    "VisitEvent",
+    "VisitWeather",
+]
@@ -0,0 +1,52 @@
+"""空档与重叠检测领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from rond_api.domain.timeline_types import TimelineEvent
+
+
+@dataclass(frozen=True, slots=True)
+class GapPeriod:
+    """既无到访也无交通的时段。"""
+
+    start_at: datetime
+    end_at: datetime
+    before: TimelineEvent | None
+    after: TimelineEvent | None
+
+    @property
+    def minutes(self) -> int:
+        return int(max((self.end_at - self.start_at).total_seconds(), 0) // 60)
+
+
+@dataclass(frozen=True, slots=True)
+class OverlapPeriod:
+    """两个事件互相重叠的时段。"""
+
+    start_at: datetime
+    end_at: datetime
+    first: TimelineEvent
+    second: TimelineEvent
+
+    @property
+    def minutes(self) -> int:
+        return int(max((self.end_at - self.start_at).total_seconds(), 0) // 60)
+
+
+@dataclass(slots=True)
+class GapReport:
+    """区间内的空档与重叠报告。"""
+
+    start_date: date
+    end_date: date
+    timezone: str
+    min_minutes: int
+    gaps: list[GapPeriod]
+    overlaps: list[OverlapPeriod]
+
+    @property
+    def total_gap_minutes(self) -> int:
+        return sum(gap.minutes for gap in self.gaps)
@@ -0,0 +1,17 @@
+"""地点历史领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from rond_api.domain.timeline_types import VisitEvent
+
+
+@dataclass(slots=True)
+class LocationHistoryPage:
+    """某地点到访历史的一页（按到达时间倒序）。"""
+
+    location_id: int
+    timezone: str
+    events: list[VisitEvent]
+    next_cursor: str | None
@@ -0,0 +1,22 @@
+"""时间点定位领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal
+
+from rond_api.domain.timeline_types import TimelineEvent
+
+LocateKind = Literal["visit", "movement", "gap"]
+
+
+@dataclass(frozen=True, slots=True)
+class LocateResult:
+    """单个时间点所处的到访、交通或空档。"""
+
+    at: datetime
+    kind: LocateKind
+    event: TimelineEvent | None = None
+    gap_start_at: datetime | None = None
+    gap_end_at: datetime | None = None
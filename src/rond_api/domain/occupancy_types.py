@@ -0,0 +1,20 @@
+"""时段占用领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(slots=True)
+class OccupancyMatrix:
+    """按分类的（日 × 时段）占用分钟矩阵。"""
+
+    days: list[date]
+    timezone: str
+    bin_minutes: int
+    categories: dict[str, list[list[float]]]
+
+    @property
+    def bins_per_day(self) -> int:
+        return (24 * 60) // self.bin_minutes
@@ -0,0 +1,20 @@
+"""地点画像领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class LocationProfile:
+    """单个地点的到访汇总。"""
+
+    location_id: int
+    home_visit_count: int
+    visit_count: int
+    last_arrival_core: float | None
+    total_dwell_seconds: float
+
+    @property
+    def total_dwell_minutes(self) -> float:
+        return self.total_dwell_seconds / 60
@@ -0,0 +1,35 @@
+"""排行领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from rond_api.domain.stats_types import StatsKind
+
+
+@dataclass(frozen=True, slots=True)
+class RankingEntry:
+    """排行中的单项。"""
+
+    key: str
+    kind: StatsKind
+    total_minutes: float
+    event_count: int
+
+    @property
+    def total_hours(self) -> float:
+        return self.total_minutes / 60
+
+
+@dataclass(slots=True)
+class RankingResult:
+    """排行结果。"""
+
+    start_date: date
+    end_date: date
+    timezone: str
+    dimension: str
+    metric: str
+    source: str
+    entries: list[RankingEntry]
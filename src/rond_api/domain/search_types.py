@@ -0,0 +1,27 @@
+"""全文检索领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """单条检索命中，timeline_date 为可跳转的时间线日期。"""
+
+    kind: str
+    source_id: int
+    title: str
+    snippet: str
+    timeline_date: date | None
+    score: float | None
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """检索结果。"""
+
+    query: str
+    timezone: str
+    hits: list[SearchHit]
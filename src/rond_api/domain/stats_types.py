@@ -0,0 +1,47 @@
+"""统计领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal
+
+StatsKind = Literal["visit", "movement"]
+
+
+@dataclass(frozen=True, slots=True)
+class StatsRow:
+    """单个周期内某一分组的时长汇总。"""
+
+    period: str
+    key: str
+    kind: StatsKind
+    total_minutes: float
+    event_count: int
+    share: float
+    # 交通行按起终点直线距离折算的里程；到访行或缺坐标时为 None。
+    distance_km: float | None = None
+    # 计入里程的交通时长；缺坐标的交通段不计入，避免拉低平均速度。
+    distance_minutes: float | None = None
+
+    @property
+    def total_hours(self) -> float:
+        return self.total_minutes / 60
+
+    @property
+    def average_speed_kmh(self) -> float | None:
+        if self.distance_km is None or self.distance_minutes is None or self.distance_minutes <= 0:
+            return None
+        return round(self.distance_km / (self.distance_minutes / 60), 1)
+
+
+@dataclass(slots=True)
+class StatsTable:
+    """统计结果表。"""
+
+    start_date: date
+    end_date: date
+    timezone: str
+    group_by: str
+    period: str
+    rows: list[StatsRow]
@@ -6,7 +6,12 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Literal
 
+# Core Data 时间戳以 2001-01-01T00:00:00Z 为纪元，加上该偏移即为 Unix 秒；SQL 与 Python 转换共用。
+CORE_DATA_UNIX_EPOCH_OFFSET = 978307200
+
 OutputMode = Literal["pretty", "json", "both"]
+# fixed: 全部事件使用查询时区；event: 事件按记录时区显示；traveller: 同时按当地日期归属。
+ZoneMode = Literal["fixed", "event", "traveller"]
 TransportMode = Literal[
     "unknown",
     "walk",
@@ -16,6 +21,34 @@ TransportMode = Literal[
     "bike",
     "flight",
 ]
+# visit: ZPARENT 指向父到访的子到访；segment: ZSTAYSEGMENT 停留子段。
+NestedStopKind = Literal["visit", "segment"]
+
+
+@dataclass(frozen=True, slots=True)
+class NestedStop:
+    """到访内的子到访或停留子段。"""
+
+    kind: NestedStopKind
+    source_id: int
+    location_name: str
+    start_at: datetime
+    end_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class VisitWeather:
+    """到访时段的小时天气汇总（温度为摄氏度）。"""
+
+    hours: int
+    temperature_min_c: float | None
+    temperature_max_c: float | None
+    apparent_avg_c: float | None
+    humidity_avg: float | None
+    precipitation_mm: float
+    precipitation_chance_max: float | None
+    condition: str | None
+    symbol_name: str | None
 
 
 @dataclass(frozen=True, slots=True)
@@ -32,7 +65,10 @@ class VisitEvent:
     departure_at: datetime
     is_cross_day: bool
     is_ongoing: bool = False
+    timezone_name: str | None = None
     event_type: Literal["visit"] = "visit"
+    weather: VisitWeather | None = None
+    children: tuple[NestedStop, ...] = ()
 
     @property
     def start_at(self) -> datetime:
@@ -55,7 +91,21 @@ class MovementEvent:
     duration_minutes: int
     from_location_name: str | None
     to_location_name: str | None
+    timezone_name: str | None = None
     event_type: Literal["movement"] = "movement"
+    # 起终点到访坐标间的球面直线距离，任一端缺坐标时为 None。
+    distance_m: float | None = None
+
+    @property
+    def distance_km(self) -> float | None:
+        return round(self.distance_m / 1000, 3) if self.distance_m is not None else None
+
+    @property
+    def average_speed_kmh(self) -> float | None:
+        seconds = (self.end_at - self.start_at).total_seconds()
+        if self.distance_m is None or seconds <= 0:
+            return None
+        return round(self.distance_m / 1000 / (seconds / 3600), 1)
 
 
 TimelineEvent = VisitEvent | MovementEvent
@@ -68,3 +118,18 @@ class TimelineResult:
     query_date: date
     timezone: str
     events: list[TimelineEvent]
+    zone_mode: ZoneMode = "fixed"
+
+
+# 事件标识：（事件类型, 主键），停留中事件的主键为原始到访主键的相反数。
+EventKey = tuple[str, int]
+
+
+@dataclass(slots=True)
+class TimelineUpdate:
+    """监视模式的一次输出：自上次输出以来新增或变化的事件，以及被移除的事件。"""
+
+    timeline: TimelineResult
+    changed: list[TimelineEvent]
+    removed: list[EventKey]
+    rebuilt: bool
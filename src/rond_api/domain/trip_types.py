@@ -0,0 +1,44 @@
+"""行程领域类型。"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from rond_api.domain.timeline_types import TimelineEvent, ZoneMode
+
+
+@dataclass(frozen=True, slots=True)
+class TripSummary:
+    """行程（或其中一天）的汇总：时长裁剪到所属窗口内。"""
+
+    dwell_minutes: float
+    transport_minutes: float
+    visit_count: int
+    movement_count: int
+    places: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class TripDay:
+    """行程中的单日分段，跨天事件出现在每个重叠的日期中。"""
+
+    day: date
+    events: tuple[TimelineEvent, ...]
+    summary: TripSummary
+
+
+@dataclass(slots=True)
+class TripTimeline:
+    """行程时间线：按本地日期分段并附整体汇总。"""
+
+    trip_id: int
+    title: str | None
+    note: str | None
+    timezone: str
+    zone_mode: ZoneMode
+    start_at: datetime
+    end_at: datetime
+    is_ended: bool
+    days: list[TripDay]
+    summary: TripSummary
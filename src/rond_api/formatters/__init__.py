@@ -1,6 +1,62 @@
 """Timeline formatters."""
 
-from rond_api.formatters.timeline_json import render_timeline_json, timeline_to_dict
-from rond_api.formatters.timeline_pretty import render_timeline_pretty
+from __future__ import annotations
 
-__all__ = ["render_timeline_json", "render_timeline_pretty", "timeline_to_dict"]
+from importlib import import_module
+from typing import Any
+
+# 格式化模块按需导入：只输出 JSON 时不加载文本渲染模块。
+_EXPORTS = {
+    "gap_report_to_dict": "rond_api.formatters.report_json",
+    "ranking_to_dict": "rond_api.formatters.report_json",
+    "render_gap_report_pretty": "rond_api.formatters.report_pretty",
+    "render_ranking_pretty": "rond_api.formatters.report_pretty",
+    "render_report_json": "rond_api.formatters.report_json",
+    "render_search_pretty": "rond_api.formatters.report_pretty",
+    "render_stats_pretty": "rond_api.formatters.report_pretty",
+    "render_timeline_json": "rond_api.formatters.timeline_json",
+    "render_timeline_pretty": "rond_api.formatters.timeline_pretty",
+    "render_trip_json": "rond_api.formatters.timeline_json",
+    "render_trip_pretty": "rond_api.formatters.timeline_pretty",
+    "search_result_to_dict": "rond_api.formatters.report_json",
+    "stats_table_to_dict": "rond_api.formatters.report_json",
+    "timeline_to_dict": "rond_api.formatters.timeline_json",
+    "timeline_update_to_dict": "rond_api.formatters.timeline_json",
+    "trip_to_dict": "rond_api.formatters.timeline_json",
+    "write_timeline_pretty": "rond_api.formatters.timeline_pretty",
+    "write_trip_pretty": "rond_api.formatters.timeline_pretty",
+}
+
+__all__ = [
+    "gap_report_to_dict",
+    "ranking_to_dict",
+    "render_gap_report_pretty",
+    "render_ranking_pretty",
+    "render_report_json",
+    "render_search_pretty",
+    "render_stats_pretty",
+    "render_timeline_json",
+    "render_timeline_pretty",
+    "render_trip_json",
+    "render_trip_pretty",
+    "search_result_to_dict",
+    "stats_table_to_dict",
+    "timeline_to_dict",
+    "timeline_update_to_dict",
+    "trip_to_dict",
+    "write_timeline_pretty",
+    "write_trip_pretty",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
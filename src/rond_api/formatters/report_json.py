@@ -0,0 +1,134 @@
+"""分析报告 JSON 格式化。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from rond_api.domain.gap_types import GapReport
+from rond_api.domain.ranking_types import RankingResult
+from rond_api.domain.search_types import SearchResult
+from rond_api.domain.stats_types import StatsTable
+from rond_api.domain.timeline_types import TimelineEvent, VisitEvent
+
+
+def gap_report_to_dict(report: GapReport) -> dict[str, Any]:
+    """空档报告转字典。"""
+
+    return {
+        "start_date": report.start_date.isoformat(),
+        "end_date": report.end_date.isoformat(),
+        "timezone": report.timezone,
+        "min_minutes": report.min_minutes,
+        "total_gap_minutes": report.total_gap_minutes,
+        "gaps": [
+            {
+                "start_at": gap.start_at.isoformat(),
+                "end_at": gap.end_at.isoformat(),
+                "minutes": gap.minutes,
+                "before": _event_ref(gap.before),
+                "after": _event_ref(gap.after),
+            }
+            for gap in report.gaps
+        ],
+        "overlaps": [
+            {
+                "start_at": overlap.start_at.isoformat(),
+                "end_at": overlap.end_at.isoformat(),
+                "minutes": overlap.minutes,
+                "first": _event_ref(overlap.first),
+                "second": _event_ref(overlap.second),
+            }
+            for overlap in report.overlaps
+        ],
+    }
+
+
+def stats_table_to_dict(table: StatsTable) -> dict[str, Any]:
+    """统计表转字典。"""
+
+    return {
+        "start_date": table.start_date.isoformat(),
+        "end_date": table.end_date.isoformat(),
+        "timezone": table.timezone,
+        "group_by": table.group_by,
+        "period": table.period,
+        "rows": [
+            {
+                "period": row.period,
+                "key": row.key,
+                "kind": row.kind,
+                "total_minutes": row.total_minutes,
+                "event_count": row.event_count,
+                "share": row.share,
+                "distance_km": row.distance_km,
+                "average_speed_kmh": row.average_speed_kmh,
+            }
+            for row in table.rows
+        ],
+    }
+
+
+def ranking_to_dict(result: RankingResult) -> dict[str, Any]:
+    """排行结果转字典。"""
+
+    return {
+        "start_date": result.start_date.isoformat(),
+        "end_date": result.end_date.isoformat(),
+        "timezone": result.timezone,
+        "dimension": result.dimension,
+        "metric": result.metric,
+        "source": result.source,
+        "entries": [
+            {
+                "rank": rank,
+                "key": entry.key,
+                "kind": entry.kind,
+                "total_minutes": entry.total_minutes,
+                "event_count": entry.event_count,
+            }
+            for rank, entry in enumerate(result.entries, start=1)
+        ],
+    }
+
+
+def search_result_to_dict(result: SearchResult) -> dict[str, Any]:
+    """检索结果转字典。"""
+
+    return {
+        "query": result.query,
+        "timezone": result.timezone,
+        "hits": [
+            {
+                "kind": hit.kind,
+                "source_id": hit.source_id,
+                "title": hit.title,
+                "snippet": hit.snippet,
+                "timeline_date": hit.timeline_date.isoformat() if hit.timeline_date else None,
+                "score": hit.score,
+            }
+            for hit in result.hits
+        ],
+    }
+
+
+def render_report_json(payload: dict[str, Any]) -> str:
+    """渲染 JSON 文本。"""
+
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def _event_ref(event: TimelineEvent | None) -> dict[str, Any] | None:
+    if event is None:
+        return None
+    if isinstance(event, VisitEvent):
+        return {
+            "event_type": "visit",
+            "visit_id": event.visit_id,
+            "location_name": event.location_name,
+        }
+    return {
+        "event_type": "movement",
+        "movement_id": event.movement_id,
+        "transport_name": event.transport_name,
+    }
@@ -0,0 +1,146 @@
+"""分析报告可读格式化。"""
+
+from __future__ import annotations
+
+from rond_api.domain.gap_types import GapReport
+from rond_api.domain.ranking_types import RankingResult
+from rond_api.domain.search_types import SearchResult
+from rond_api.domain.stats_types import StatsTable
+from rond_api.domain.timeline_types import TimelineEvent, VisitEvent
+from rond_api.formatters.timeline_pretty import (
+    DurationUnitStyle,
+    display_width,
+    format_duration,
+)
+
+KIND_LABELS = {"visit": "到访", "movement": "交通"}
+DIMENSION_LABELS = {"place": "地点", "category": "分类", "route": "路线", "transport": "交通方式"}
+METRIC_LABELS = {"dwell": "时长", "count": "次数"}
+SEARCH_KIND_LABELS = {"location": "地点", "visit": "到访", "movement": "交通", "journal": "日记"}
+
+
+def render_gap_report_pretty(
+    report: GapReport,
+    emoji: bool = True,
+    duration_unit_style: DurationUnitStyle = "compact",
+) -> str:
+    """渲染空档报告。"""
+
+    range_text = f"{report.start_date.isoformat()} ~ {report.end_date.isoformat()}"
+    if emoji:
+        header = f"🕳️ 空档 {range_text} ({report.timezone}) ≥ {report.min_minutes}m"
+    else:
+        header = f"Gaps {range_text} ({report.timezone}) >= {report.min_minutes}m"
+    lines = [header, "─" * 72]
+
+    if not report.gaps:
+        lines.append("无空档")
+    for gap in report.gaps:
+        duration_text = format_duration(gap.start_at, gap.end_at, style=duration_unit_style)
+        lines.append(
+            f"{gap.start_at:%Y-%m-%d %H:%M} -> {gap.end_at:%Y-%m-%d %H:%M} ({duration_text})"
+        )
+        lines.append(f"   前后: {_event_label(gap.before)} -> {_event_label(gap.after)}")
+
+    if report.overlaps:
+        lines.append("")
+        lines.append("⚠️ 重叠" if emoji else "Overlaps")
+        for overlap in report.overlaps:
+            duration_text = format_duration(
+                overlap.start_at,
+                overlap.end_at,
+                style=duration_unit_style,
+            )
+            lines.append(
+                f"{overlap.start_at:%Y-%m-%d %H:%M} -> {overlap.end_at:%Y-%m-%d %H:%M} "
+                f"({duration_text}) {_event_label(overlap.first)} / {_event_label(overlap.second)}"
+            )
+
+    lines.append("")
+    lines.append(f"合计: {len(report.gaps)} 段空档，{report.total_gap_minutes} 分钟")
+    return "\n".join(lines)
+
+
+def render_stats_pretty(table: StatsTable, emoji: bool = True) -> str:
+    """渲染统计表。"""
+
+    range_text = f"{table.start_date.isoformat()} ~ {table.end_date.isoformat()}"
+    if emoji:
+        header = f"📊 统计 {range_text} ({table.timezone}) {table.group_by}/{table.period}"
+    else:
+        header = f"Stats {range_text} ({table.timezone}) {table.group_by}/{table.period}"
+    lines = [header, "─" * 72]
+    if not table.rows:
+        lines.append("无数据")
+        return "\n".join(lines)
+
+    key_width = max(display_width(row.key) for row in table.rows)
+    current_section: tuple[str, str] | None = None
+    for row in table.rows:
+        section = (row.period, row.kind)
+        if section != current_section:
+            if current_section is not None:
+                lines.append("")
+            period_text = "" if row.period == "total" else f"{row.period} "
+            lines.append(f"{period_text}{KIND_LABELS.get(row.kind, row.kind)}")
+            current_section = section
+        padding = " " * (key_width - display_width(row.key))
+        line = f"   {row.key}{padding}  {row.total_hours:8.2f}h  {row.share * 100:5.1f}%  ({row.event_count})"
+        if row.distance_km is not None:
+            line = f"{line}  {row.distance_km:.1f}km"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def render_ranking_pretty(result: RankingResult, emoji: bool = True) -> str:
+    """渲染排行。"""
+
+    range_text = f"{result.start_date.isoformat()} ~ {result.end_date.isoformat()}"
+    dimension = DIMENSION_LABELS.get(result.dimension, result.dimension)
+    metric = METRIC_LABELS.get(result.metric, result.metric)
+    if emoji:
+        header = f"🏆 {dimension}排行 {range_text} ({result.timezone}) 按{metric}"
+    else:
+        header = f"Top {result.dimension} {range_text} ({result.timezone}) by {result.metric}"
+    lines = [header, "─" * 72]
+    if not result.entries:
+        lines.append("无数据")
+        return "\n".join(lines)
+
+    rank_width = len(str(len(result.entries)))
+    key_width = max(display_width(entry.key) for entry in result.entries)
+    for rank, entry in enumerate(result.entries, start=1):
+        padding = " " * (key_width - display_width(entry.key))
+        lines.append(
+            f"{rank:>{rank_width}}. {entry.key}{padding}  {entry.total_hours:8.2f}h  ({entry.event_count})"
+        )
+    return "\n".join(lines)
+
+
+def render_search_pretty(result: SearchResult, emoji: bool = True) -> str:
+    """渲染检索结果。"""
+
+    if emoji:
+        header = f"🔎 检索 “{result.query}” ({result.timezone})"
+    else:
+        header = f"Search '{result.query}' ({result.timezone})"
+    lines = [header, "─" * 72]
+    if not result.hits:
+        lines.append("无匹配")
+        return "\n".join(lines)
+
+    for hit in result.hits:
+        date_text = hit.timeline_date.isoformat() if hit.timeline_date else "----------"
+        kind = SEARCH_KIND_LABELS.get(hit.kind, hit.kind)
+        lines.append(f"{date_text}  {kind}  {hit.title}")
+        if hit.snippet and hit.snippet != hit.title:
+            lines.append(f"            {hit.snippet}")
+    return "\n".join(lines)
+
+
+def _event_label(event: TimelineEvent | None) -> str:
+    if event is None:
+        return "无"
+    if isinstance(event, VisitEvent):
+        return event.location_name
+    return event.transport_name
@@ -3,35 +3,95 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from typing import Any, Iterable
 
-from rond_api.domain.timeline_types import MovementEvent, TimelineResult, VisitEvent
+from rond_api.domain.timeline_types import (
+    MovementEvent,
+    NestedStop,
+    TimelineEvent,
+    TimelineResult,
+    TimelineUpdate,
+    VisitEvent,
+    VisitWeather,
+)
+from rond_api.domain.trip_types import TripSummary, TripTimeline
 
 
 def timeline_to_dict(timeline: TimelineResult) -> dict[str, Any]:
     """时间线结果转字典。"""
 
-    events: list[dict[str, Any]] = []
-    for event in timeline.events:
+    return {
+        "query_date": timeline.query_date.isoformat(),
+        "timezone": timeline.timezone,
+        "zone_mode": timeline.zone_mode,
+        "events": events_to_dicts(timeline.events),
+    }
+
+
+def timeline_update_to_dict(update: TimelineUpdate) -> dict[str, Any]:
+    """监视模式更新转字典（只含新增/变化/移除的事件）。"""
+
+    return {
+        "query_date": update.timeline.query_date.isoformat(),
+        "timezone": update.timeline.timezone,
+        "rebuilt": update.rebuilt,
+        "changed": events_to_dicts(update.changed),
+        "removed": [{"event_type": event_type, "id": event_id} for event_type, event_id in update.removed],
+    }
+
+
+def trip_to_dict(trip: TripTimeline) -> dict[str, Any]:
+    """行程时间线转字典。"""
+
+    return {
+        "trip_id": trip.trip_id,
+        "title": trip.title,
+        "note": trip.note,
+        "timezone": trip.timezone,
+        "zone_mode": trip.zone_mode,
+        "start_at": trip.start_at.isoformat(),
+        "end_at": trip.end_at.isoformat(),
+        "is_ended": trip.is_ended,
+        "summary": _trip_summary_to_dict(trip.summary),
+        "days": [
+            {
+                "date": day.day.isoformat(),
+                "summary": _trip_summary_to_dict(day.summary),
+                "events": events_to_dicts(day.events),
+            }
+            for day in trip.days
+        ],
+    }
+
+
+def events_to_dicts(events: Iterable[TimelineEvent]) -> list[dict[str, Any]]:
+    """时间线事件转字典列表。"""
+
+    payloads: list[dict[str, Any]] = []
+    for event in events:
         if isinstance(event, VisitEvent):
-            events.append(
-                {
-                    "event_type": "visit",
-                    "visit_id": event.visit_id,
-                    "location_name": event.location_name,
-                    "category_name": event.category_name,
-                    "poi_category": event.poi_category,
-                    "tags": event.tags,
-                    "arrival_at": event.arrival_at.isoformat(),
-                    "departure_at": event.departure_at.isoformat(),
-                    "is_cross_day": event.is_cross_day,
-                    "is_ongoing": event.is_ongoing,
-                }
-            )
+            visit_payload: dict[str, Any] = {
+                "event_type": "visit",
+                "visit_id": event.visit_id,
+                "location_name": event.location_name,
+                "category_name": event.category_name,
+                "poi_category": event.poi_category,
+                "tags": event.tags,
+                "arrival_at": event.arrival_at.isoformat(),
+                "departure_at": event.departure_at.isoformat(),
+                "is_cross_day": event.is_cross_day,
+                "is_ongoing": event.is_ongoing,
+                "timezone": event.timezone_name,
+            }
+            if event.weather is not None:
+                visit_payload["weather"] = _weather_to_dict(event.weather)
+            if event.children:
+                visit_payload["children"] = [_nested_stop_to_dict(child) for child in event.children]
+            payloads.append(visit_payload)
             continue
 
         if isinstance(event, MovementEvent):
-            events.append(
+            payloads.append(
                 {
                     "event_type": "movement",
                     "movement_id": event.movement_id,
@@ -42,13 +102,52 @@ def timeline_to_dict(timeline: TimelineResult) -> dict[str, Any]:
                     "duration_minutes": event.duration_minutes,
                     "from_location_name": event.from_location_name,
                     "to_location_name": event.to_location_name,
+                    "timezone": event.timezone_name,
+                    "distance_km": event.distance_km,
+                    "average_speed_kmh": event.average_speed_kmh,
                 }
             )
 
+    return payloads
+
+
+def _weather_to_dict(weather: VisitWeather) -> dict[str, Any]:
+    """到访天气汇总转字典。"""
+
     return {
-        "query_date": timeline.query_date.isoformat(),
-        "timezone": timeline.timezone,
-        "events": events,
+        "hours": weather.hours,
+        "temperature_min_c": weather.temperature_min_c,
+        "temperature_max_c": weather.temperature_max_c,
+        "apparent_avg_c": weather.apparent_avg_c,
+        "humidity_avg": weather.humidity_avg,
+        "precipitation_mm": weather.precipitation_mm,
+        "precipitation_chance_max": weather.precipitation_chance_max,
+        "condition": weather.condition,
+        "symbol_name": weather.symbol_name,
+    }
+
+
+def _nested_stop_to_dict(stop: NestedStop) -> dict[str, Any]:
+    """嵌套子到访/停留子段转字典。"""
+
+    return {
+        "kind": stop.kind,
+        "source_id": stop.source_id,
+        "location_name": stop.location_name,
+        "start_at": stop.start_at.isoformat(),
+        "end_at": stop.end_at.isoformat(),
+    }
+
+
+def _trip_summary_to_dict(summary: TripSummary) -> dict[str, Any]:
+    """行程汇总转字典。"""
+
+    return {
+        "dwell_minutes": summary.dwell_minutes,
+        "transport_minutes": summary.transport_minutes,
+        "visit_count": summary.visit_count,
+        "movement_count": summary.movement_count,
+        "places": list(summary.places),
     }
 
 
@@ -57,3 +156,9 @@ def render_timeline_json(timeline: TimelineResult) -> str:
 
     payload = timeline_to_dict(timeline)
     return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def render_trip_json(trip: TripTimeline) -> str:
+    """渲染行程 JSON 文本。"""
+
+    return json.dumps(trip_to_dict(trip), ensure_ascii=False, indent=2)
@@ -4,9 +4,18 @@ from __future__ import annotations
 
 import unicodedata
 from datetime import date, datetime, time, timedelta
-from typing import Literal
-
-from rond_api.domain.timeline_types import MovementEvent, TimelineResult, VisitEvent
+from functools import lru_cache
+from typing import Iterable, Iterator, Literal, TextIO
+
+from rond_api.domain.timeline_types import (
+    MovementEvent,
+    NestedStop,
+    TimelineResult,
+    VisitEvent,
+    VisitWeather,
+)
+from rond_api.domain.trip_types import TripSummary, TripTimeline
+from rond_api.keyword_rules import KeywordRules
 
 EMOJI_BY_TRANSPORT_MODE = {
     "unknown": "🛣️",
@@ -94,8 +103,54 @@ KEYWORD_EMOJI_RULES: list[tuple[tuple[str, ...], str]] = [
     (("机厅", "电玩", "游戏"), "🎮"),
     (("办公室", "公司", "写字楼"), "🏢"),
 ]
+WEATHER_CONDITION_LABELS = {
+    "clear": "晴",
+    "mostlyClear": "晴",
+    "partlyCloudy": "多云",
+    "mostlyCloudy": "多云",
+    "cloudy": "阴",
+    "drizzle": "小雨",
+    "rain": "雨",
+    "heavyRain": "大雨",
+    "thunderstorms": "雷雨",
+    "snow": "雪",
+    "sleet": "雨夹雪",
+    "foggy": "雾",
+    "haze": "霾",
+    "windy": "大风",
+}
+# SF Symbols 名称前缀 → Emoji，按顺序匹配（更具体的前缀在前）。
+WEATHER_SYMBOL_EMOJI_RULES: list[tuple[str, str]] = [
+    ("cloud.bolt", "⛈️"),
+    ("cloud.snow", "🌨️"),
+    ("cloud.rain", "🌧️"),
+    ("cloud.drizzle", "🌦️"),
+    ("cloud.fog", "🌫️"),
+    ("cloud.sun", "⛅"),
+    ("cloud.moon", "☁️"),
+    ("cloud", "☁️"),
+    ("sun", "☀️"),
+    ("moon", "🌙"),
+    ("wind", "💨"),
+]
+# 交通名称关键词 → Emoji，按顺序优先。
+TRANSPORT_EMOJI_RULES: list[tuple[tuple[str, ...], str]] = [
+    (("地铁", "电车", "高铁", "火车", "轻轨", "有轨", "公交"), "🚇"),
+    (("步行",), "🚶"),
+    (("跑",), "🏃"),
+    (("骑", "单车", "自行车", "电瓶"), "🚴"),
+    (("飞", "航班", "飞机"), "✈️"),
+    (("车", "驾", "打车"), "🚗"),
+]
 DurationUnitStyle = Literal["compact", "cn", "en"]
 FOLLOWUP_INDENT = "   "
+# 地点、分类名等重复出现的非 ASCII 文本的显示宽度缓存。
+DISPLAY_WIDTH_CACHE_SIZE = 4096
+# 分类 Emoji 按（分类, 地点名, 类型, POI）缓存；交通方式只有几种，按名称缓存。
+CATEGORY_EMOJI_CACHE_SIZE = 4096
+TRANSPORT_EMOJI_CACHE_SIZE = 256
+_KEYWORD_EMOJI_MATCHER = KeywordRules(KEYWORD_EMOJI_RULES)
+_TRANSPORT_EMOJI_MATCHER = KeywordRules(TRANSPORT_EMOJI_RULES)
 
 
 def render_timeline_pretty(
@@ -107,74 +162,228 @@ def render_timeline_pretty(
 ) -> str:
     """渲染可读时间线。"""
 
-    lines: list[str] = []
+    return "\n".join(
+        iter_timeline_pretty_lines(
+            timeline,
+            emoji=emoji,
+            complex_mode=complex_mode,
+            duration_unit_style=duration_unit_style,
+            tree=tree,
+        )
+    )
+
+
+def write_timeline_pretty(
+    timeline: TimelineResult,
+    file: TextIO,
+    emoji: bool = True,
+    complex_mode: bool = False,
+    duration_unit_style: DurationUnitStyle = "compact",
+    tree: bool = False,
+) -> None:
+    """边生成边写出可读时间线，末尾带换行。"""
+
+    _write_lines(
+        file,
+        iter_timeline_pretty_lines(
+            timeline,
+            emoji=emoji,
+            complex_mode=complex_mode,
+            duration_unit_style=duration_unit_style,
+            tree=tree,
+        ),
+    )
+
+
+def iter_timeline_pretty_lines(
+    timeline: TimelineResult,
+    emoji: bool = True,
+    complex_mode: bool = False,
+    duration_unit_style: DurationUnitStyle = "compact",
+    tree: bool = False,
+) -> Iterator[str]:
+    """逐行产出可读时间线（不含换行符）。
+
+    事件块边生成边输出：树形模式只缓冲一个块以判断是否为最后一块，普通模式只暂存块间空行，
+    内存占用与事件数无关。
+    """
+
     if emoji:
-        lines.append(f"🗓️ 时间线 {timeline.query_date.isoformat()} ({timeline.timezone})")
+        yield f"🗓️ 时间线 {timeline.query_date.isoformat()} ({timeline.timezone})"
     else:
-        lines.append(f"Timeline {timeline.query_date.isoformat()} ({timeline.timezone})")
-    lines.append("─" * 72)
+        yield f"Timeline {timeline.query_date.isoformat()} ({timeline.timezone})"
+    yield "─" * 72
 
     if not timeline.events:
-        lines.append("无数据")
-        return "\n".join(lines)
+        yield "无数据"
+        return
+
+    blocks = _iter_event_blocks(
+        timeline,
+        emoji=emoji,
+        complex_mode=complex_mode,
+        duration_unit_style=duration_unit_style,
+        tree=tree,
+    )
+    if tree:
+        previous: tuple[str, list[str]] | None = None
+        for block in blocks:
+            if previous is not None:
+                yield from _decorate_tree_block(*previous, is_last=False)
+            previous = block
+        if previous is not None:
+            yield from _decorate_tree_block(*previous, is_last=True)
+        return
+
+    # 块后空行延迟到下一个非空行再输出，保证结尾不留空行。
+    pending_blank_lines = 0
+    for _, block in blocks:
+        for line in (*block, ""):
+            if not line:
+                pending_blank_lines += 1
+                continue
+            for _ in range(pending_blank_lines):
+                yield ""
+            pending_blank_lines = 0
+            yield line
+
+
+def render_trip_pretty(
+    trip: TripTimeline,
+    emoji: bool = True,
+    complex_mode: bool = False,
+    duration_unit_style: DurationUnitStyle = "compact",
+    tree: bool = False,
+) -> str:
+    """渲染行程时间线：行程汇总后逐日输出时间线与当日小计。"""
+
+    return "\n".join(
+        iter_trip_pretty_lines(
+            trip,
+            emoji=emoji,
+            complex_mode=complex_mode,
+            duration_unit_style=duration_unit_style,
+            tree=tree,
+        )
+    )
+
+
+def write_trip_pretty(
+    trip: TripTimeline,
+    file: TextIO,
+    emoji: bool = True,
+    complex_mode: bool = False,
+    duration_unit_style: DurationUnitStyle = "compact",
+    tree: bool = False,
+) -> None:
+    """边生成边写出行程时间线，末尾带换行。"""
+
+    _write_lines(
+        file,
+        iter_trip_pretty_lines(
+            trip,
+            emoji=emoji,
+            complex_mode=complex_mode,
+            duration_unit_style=duration_unit_style,
+            tree=tree,
+        ),
+    )
+
+
+def iter_trip_pretty_lines(
+    trip: TripTimeline,
+    emoji: bool = True,
+    complex_mode: bool = False,
+    duration_unit_style: DurationUnitStyle = "compact",
+    tree: bool = False,
+) -> Iterator[str]:
+    """逐行产出行程时间线，逐日渲染。"""
+
+    title = trip.title or f"#{trip.trip_id}"
+    range_text = f"{trip.start_at:%Y-%m-%d %H:%M} -> {trip.end_at:%Y-%m-%d %H:%M}"
+    if not trip.is_ended:
+        range_text = f"{range_text} (进行中)"
+    header = f"🧳 行程 {title}" if emoji else f"Trip {title}"
+    yield f"{header} ({trip.timezone})"
+    yield range_text
+    yield f"汇总: {_format_trip_summary(trip.summary, duration_unit_style)}"
+    if trip.note:
+        yield f"备注: {trip.note}"
+
+    for day in trip.days:
+        yield ""
+        yield from iter_timeline_pretty_lines(
+            TimelineResult(
+                query_date=day.day,
+                timezone=trip.timezone,
+                events=list(day.events),
+                zone_mode=trip.zone_mode,
+            ),
+            emoji=emoji,
+            complex_mode=complex_mode,
+            duration_unit_style=duration_unit_style,
+            tree=tree,
+        )
+        yield f"小计: {_format_trip_summary(day.summary, duration_unit_style)}"
+
+
+def _iter_event_blocks(
+    timeline: TimelineResult,
+    emoji: bool,
+    complex_mode: bool,
+    duration_unit_style: DurationUnitStyle,
+    tree: bool,
+) -> Iterator[tuple[str, list[str]]]:
+    """按事件顺序产出（块类型, 行）：单个到访，或连续交通合并为一块。"""
 
-    blocks: list[tuple[str, list[str]]] = []
+    events = timeline.events
     index = 0
-    while index < len(timeline.events):
-        event = timeline.events[index]
+    while index < len(events):
+        event = events[index]
         if isinstance(event, VisitEvent):
-            blocks.append(
-                (
-                    "visit",
-                    _format_visit_event(
-                        event,
-                        query_date=timeline.query_date,
-                        emoji=emoji,
-                        complex_mode=complex_mode,
-                        duration_unit_style=duration_unit_style,
-                    ),
-                )
+            yield (
+                "visit",
+                _format_visit_event(
+                    event,
+                    query_date=timeline.query_date,
+                    emoji=emoji,
+                    complex_mode=complex_mode,
+                    duration_unit_style=duration_unit_style,
+                ),
             )
             index += 1
-        else:
-            movement_group: list[MovementEvent] = []
-            while index < len(timeline.events) and isinstance(
-                timeline.events[index], MovementEvent
-            ):
-                movement_group.append(timeline.events[index])
-                index += 1
-            next_visit = (
-                timeline.events[index]
-                if index < len(timeline.events)
-                and isinstance(timeline.events[index], VisitEvent)
-                else None
-            )
-            blocks.append(
-                (
-                    "movement",
-                    _format_movement_group(
-                        movement_group,
-                        next_visit,
-                        emoji=emoji,
-                        complex_mode=complex_mode,
-                        duration_unit_style=duration_unit_style,
-                        leading_indent=not tree,
-                    ),
-                )
-            )
+            continue
 
-    if tree:
-        decorated_blocks = _decorate_tree_blocks(blocks)
-        for block in decorated_blocks:
-            lines.extend(block)
-    else:
-        for _, block in blocks:
-            lines.extend(block)
-            lines.append("")
-        while lines and lines[-1] == "":
-            lines.pop()
+        movement_group: list[MovementEvent] = []
+        while index < len(events) and isinstance(events[index], MovementEvent):
+            movement_group.append(events[index])
+            index += 1
+        next_visit = events[index] if index < len(events) and isinstance(events[index], VisitEvent) else None
+        yield (
+            "movement",
+            _format_movement_group(
+                movement_group,
+                next_visit,
+                emoji=emoji,
+                complex_mode=complex_mode,
+                duration_unit_style=duration_unit_style,
+                leading_indent=not tree,
+            ),
+        )
+
+
+def _write_lines(file: TextIO, lines: Iterable[str]) -> None:
+    for line in lines:
+        file.write(line)
+        file.write("\n")
+
+
+def _format_trip_summary(summary: TripSummary, duration_unit_style: DurationUnitStyle) -> str:
+    """行程汇总一行：停留、交通时长与地点数。"""
 
-    return "\n".join(lines)
+    dwell_text = _format_minutes(int(summary.dwell_minutes), duration_unit_style)
+    transport_text = _format_minutes(int(summary.transport_minutes), duration_unit_style)
+    return f"停留 {dwell_text} | 交通 {transport_text} | {len(summary.places)} 个地点"
 
 
 def _format_visit_event(
@@ -185,7 +394,7 @@ def _format_visit_event(
     duration_unit_style: DurationUnitStyle,
 ) -> list[str]:
     end_text = "停留中" if event.is_ongoing else f"{event.departure_at:%Y-%m-%d %H:%M}"
-    duration_text = _format_duration(
+    duration_text = format_duration(
         event.arrival_at,
         event.departure_at,
         style=duration_unit_style,
@@ -209,10 +418,13 @@ def _format_visit_event(
         if event.tags:
             category_part = f"{category_part} 🏷️ {'、'.join(event.tags)}"
         detail_line = f"{category_part} | {event.location_name}"
+        if event.weather is not None:
+            detail_line = f"{detail_line} | {_format_weather(event.weather, emoji=emoji)}"
         lines = [
             f"{marker} {event.arrival_at:%Y-%m-%d %H:%M} -> {end_text} ({marker_text})",
             detail_line,
         ]
+        lines.extend(_format_nested_stops(event.children))
         return _indent_followup(lines)
 
     marker = "📍" if emoji else "[visit]"
@@ -227,9 +439,44 @@ def _format_visit_event(
     )
     if event.tags:
         lines.append(f"标签: {', '.join(event.tags)}")
+    if event.weather is not None:
+        lines.append(f"天气: {_format_weather(event.weather, emoji=emoji)}")
+    lines.extend(_format_nested_stops(event.children))
     return _indent_followup(lines)
 
 
+def _format_nested_stops(children: tuple[NestedStop, ...]) -> list[str]:
+    """嵌套子到访/停留子段，每项一行。"""
+
+    return [
+        f"↳ {child.start_at:%H:%M} -> {child.end_at:%H:%M} {child.location_name}"
+        for child in children
+    ]
+
+
+def _format_weather(weather: VisitWeather, emoji: bool) -> str:
+    """天气摘要：状况、温度区间、降水量。"""
+
+    parts: list[str] = []
+    if emoji and weather.symbol_name:
+        symbol = next(
+            (value for prefix, value in WEATHER_SYMBOL_EMOJI_RULES if weather.symbol_name.startswith(prefix)),
+            None,
+        )
+        if symbol:
+            parts.append(symbol)
+    if weather.condition:
+        parts.append(WEATHER_CONDITION_LABELS.get(weather.condition, weather.condition))
+    if weather.temperature_min_c is not None and weather.temperature_max_c is not None:
+        if weather.temperature_min_c == weather.temperature_max_c:
+            parts.append(f"{weather.temperature_min_c:g}°C")
+        else:
+            parts.append(f"{weather.temperature_min_c:g}~{weather.temperature_max_c:g}°C")
+    if weather.precipitation_mm > 0:
+        parts.append(f"降水 {weather.precipitation_mm:g}mm")
+    return " ".join(parts) if parts else "无数据"
+
+
 def _visit_marker_text(event: VisitEvent, query_date: date, duration_text: str) -> str:
     if event.arrival_at.date() == event.departure_at.date():
         return duration_text
@@ -255,7 +502,7 @@ def _format_movement_group(
 
     start_at = group[0].start_at
     end_at = group[-1].end_at
-    total_duration_text = _format_duration(
+    total_duration_text = format_duration(
         start_at.replace(second=0, microsecond=0),
         end_at.replace(second=0, microsecond=0),
         style=duration_unit_style,
@@ -294,7 +541,7 @@ def _format_movement_group(
     transport_prefix = "   交通: "
     if wrapped_transport_lines:
         lines.append(f"{transport_prefix}{wrapped_transport_lines[0]}")
-        indent = " " * _display_width(transport_prefix)
+        indent = " " * display_width(transport_prefix)
         lines.extend(f"{indent}{line}" for line in wrapped_transport_lines[1:])
     else:
         lines.append(f"{transport_prefix}无")
@@ -307,11 +554,13 @@ def _movement_part_text(
     duration_unit_style: DurationUnitStyle,
 ) -> str:
     icon = _movement_emoji(event, emoji=emoji)
-    duration_text = _format_duration(
+    duration_text = format_duration(
         event.start_at,
         event.end_at,
         style=duration_unit_style,
     )
+    if event.distance_km is not None:
+        duration_text = f"{duration_text}, {event.distance_km:.1f}km"
     if emoji:
         return f"{icon} {event.transport_name} ({duration_text})"
     return f"{event.transport_name} ({duration_text})"
@@ -321,22 +570,18 @@ def _movement_emoji(event: MovementEvent, emoji: bool) -> str:
     if not emoji:
         return "[movement]"
 
-    name = event.transport_name
-    if _contains_any(name, ("地铁", "电车", "高铁", "火车", "轻轨", "有轨", "公交")):
-        return "🚇"
-    if _contains_any(name, ("步行",)):
-        return "🚶"
-    if _contains_any(name, ("跑",)):
-        return "🏃"
-    if _contains_any(name, ("骑", "单车", "自行车", "电瓶")):
-        return "🚴"
-    if _contains_any(name, ("飞", "航班", "飞机")):
-        return "✈️"
-    if _contains_any(name, ("车", "驾", "打车")):
-        return "🚗"
+    icon = _transport_name_emoji(event.transport_name)
+    if icon is not None:
+        return icon
     return EMOJI_BY_TRANSPORT_MODE.get(event.transport_mode, "🛣️")
 
 
+@lru_cache(maxsize=TRANSPORT_EMOJI_CACHE_SIZE)
+def _transport_name_emoji(transport_name: str) -> str | None:
+    return _TRANSPORT_EMOJI_MATCHER.match(transport_name)
+
+
+@lru_cache(maxsize=CATEGORY_EMOJI_CACHE_SIZE)
 def _category_emoji(
     category_name: str,
     location_name: str,
@@ -354,11 +599,9 @@ def _category_emoji(
         if poi_emoji:
             emoji_value = poi_emoji
 
-    keyword_text = f"{category_name} {location_name}".lower()
-    for keywords, icon in KEYWORD_EMOJI_RULES:
-        if any(keyword in keyword_text for keyword in keywords):
-            emoji_value = icon
-            break
+    keyword_icon = _KEYWORD_EMOJI_MATCHER.match(f"{category_name} {location_name}".lower())
+    if keyword_icon is not None:
+        emoji_value = keyword_icon
 
     direct = CATEGORY_EMOJI_EXACT.get(category_name)
     if direct:
@@ -366,10 +609,6 @@ def _category_emoji(
     return emoji_value
 
 
-def _contains_any(source: str, keywords: tuple[str, ...]) -> bool:
-    return any(keyword in source for keyword in keywords)
-
-
 def _indent_followup(lines: list[str], indent: str = FOLLOWUP_INDENT) -> list[str]:
     if not lines:
         return []
@@ -383,36 +622,26 @@ def _indent_followup(lines: list[str], indent: str = FOLLOWUP_INDENT) -> list[st
     return result
 
 
-def _decorate_tree_blocks(blocks: list[tuple[str, list[str]]]) -> list[list[str]]:
-    if not blocks:
+def _decorate_tree_block(kind: str, block: list[str], is_last: bool) -> list[str]:
+    if not block:
         return []
 
-    result: list[list[str]] = []
-    last_index = len(blocks) - 1
-
-    for index, (kind, block) in enumerate(blocks):
-        if not block:
-            continue
+    if kind == "movement":
+        head_prefix = "└┈ " if is_last else "├┈ "
+    else:
+        head_prefix = "└─ " if is_last else "├─ "
+    follow_prefix = "   " if is_last else "│  "
 
-        is_last = index == last_index
-        if kind == "movement":
-            head_prefix = "└┈ " if is_last else "├┈ "
+    decorated = [f"{head_prefix}{block[0]}"]
+    for line in block[1:]:
+        if line:
+            decorated.append(f"{follow_prefix}{line}")
         else:
-            head_prefix = "└─ " if is_last else "├─ "
-        follow_prefix = "   " if is_last else "│  "
-
-        decorated = [f"{head_prefix}{block[0]}"]
-        for line in block[1:]:
-            if line:
-                decorated.append(f"{follow_prefix}{line}")
-            else:
-                decorated.append(follow_prefix)
-        if not is_last:
-            # 块间空行保留树装饰线，避免出现裸空白行。
-            decorated.append("│")
-        result.append(decorated)
-
-    return result
+            decorated.append(follow_prefix)
+    if not is_last:
+        # 块间空行保留树装饰线，避免出现裸空白行。
+        decorated.append("│")
+    return decorated
 
 
 def _wrap_parts(parts: list[str], max_width: int) -> list[str]:
@@ -420,35 +649,53 @@ def _wrap_parts(parts: list[str], max_width: int) -> list[str]:
 
     lines: list[str] = []
     current = ""
+    current_width = 0
     delimiter = " -> "
     continuation_delimiter = "-> "
-    delimiter_width = _display_width(delimiter)
-    continuation_width = _display_width(continuation_delimiter)
+    delimiter_width = display_width(delimiter)
+    continuation_width = display_width(continuation_delimiter)
     for part in parts:
-        part_width = _display_width(part)
+        part_width = display_width(part)
         if not current:
             current = part
+            current_width = part_width
             continue
 
-        candidate_width = _display_width(current) + delimiter_width + part_width
+        # 当前行宽度随拼接累加，不再对整行重新测量。
+        candidate_width = current_width + delimiter_width + part_width
         if candidate_width <= max_width:
             current = f"{current}{delimiter}{part}"
+            current_width = candidate_width
             continue
 
         lines.append(current)
         if continuation_width + part_width <= max_width:
             current = f"{continuation_delimiter}{part}"
+            current_width = continuation_width + part_width
         else:
             current = part
+            current_width = part_width
 
     if current:
         lines.append(current)
     return [line.strip() for line in lines]
 
 
-def _display_width(text: str) -> int:
+def display_width(text: str) -> int:
+    """终端显示宽度：全角与宽字符计 2，组合字符计 0。"""
+
+    if text.isascii():
+        return len(text)
+    return _display_width_unicode(text)
+
+
+@lru_cache(maxsize=DISPLAY_WIDTH_CACHE_SIZE)
+def _display_width_unicode(text: str) -> int:
     width = 0
     for char in text:
+        if char.isascii():
+            width += 1
+            continue
         if unicodedata.combining(char):
             continue
         east_asian = unicodedata.east_asian_width(char)
@@ -456,12 +703,15 @@ def _display_width(text: str) -> int:
     return width
 
 
-def _format_duration(
+def format_duration(
     start_at: datetime,
     end_at: datetime,
     style: DurationUnitStyle,
 ) -> str:
-    total_minutes = int(max((end_at - start_at).total_seconds(), 0) // 60)
+    return _format_minutes(int(max((end_at - start_at).total_seconds(), 0) // 60), style)
+
+
+def _format_minutes(total_minutes: int, style: DurationUnitStyle) -> str:
     days = total_minutes // (24 * 60)
     hours = (total_minutes % (24 * 60)) // 60
     minutes = total_minutes % 60
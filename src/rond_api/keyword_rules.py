@@ -0,0 +1,40 @@
+"""按优先级匹配的关键词规则表。"""
+
+from __future__ import annotations
+
+import re
+from typing import Generic, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class KeywordRules(Generic[T]):
+    """把 [(关键词组, 结果), ...] 编译为一个正则，返回首个命中规则的结果。
+
+    每条规则编译为一个前瞻分组 (?=[\\s\\S]*?(?:k1|k2))，各规则按原顺序以 | 连接并锚定在开头；
+    正则引擎按顺序尝试分支，命中的分组序号即规则序号，与逐条规则做子串判断的优先级完全一致
+    （关键词重叠或互为子串时也是如此），但整张表只需一次正则调用。
+    """
+
+    __slots__ = ("_pattern", "_values")
+
+    def __init__(self, rules: Sequence[tuple[Sequence[str], T]]) -> None:
+        branches: list[str] = []
+        for keywords, _ in rules:
+            if not keywords:
+                raise ValueError("Each keyword rule needs at least one keyword.")
+            # 长关键词在前，仅影响分组内匹配到哪个词，不影响命中哪条规则。
+            alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+            branches.append(f"(?=[\\s\\S]*?({alternatives}))")
+        self._pattern = re.compile(f"(?:{'|'.join(branches)})") if branches else None
+        self._values = [value for _, value in rules]
+
+    def match(self, text: str) -> T | None:
+        """返回首个有关键词出现在 text 中的规则结果，全部未命中时返回 None。"""
+
+        if self._pattern is None:
+            return None
+        found = self._pattern.match(text)
+        if found is None or found.lastindex is None:
+            return None
+        return self._values[found.lastindex - 1]
@@ -1,5 +1,7 @@
 """Repositories."""
 
+from rond_api.repositories.location_profiles import LocationProfileStore
+from rond_api.repositories.stats_repository import StatsRepository
 from rond_api.repositories.timeline_repository import TimelineRepository
 
-__all__ = ["TimelineRepository"]
+__all__ = ["LocationProfileStore", "StatsRepository", "TimelineRepository"]
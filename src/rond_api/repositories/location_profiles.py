@@ -0,0 +1,161 @@
+"""地点画像物化。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.profile_types import LocationProfile
+
+# 未结束到访的离开时间是远未来哨兵值，不计入停留时长。
+OPEN_DEPARTURE_SENTINEL_CORE = 60_000_000_000
+
+
+class LocationProfileStore:
+    """内存中的地点画像表，按到访行版本增量刷新。
+
+    每条到访的贡献（所属地点、是否家、到达时间、停留秒数）按 Z_PK 保存；刷新时先比对
+    ZVISIT/ZACTIVITY 指纹，未变化则直接返回，变化时只重读 Z_OPT 不同或新增的到访，
+    并只重算受影响地点的汇总。活动表变化（如“家”标记调整）会触发全量重建。
+    """
+
+    def __init__(self, client: SQLiteReadClient) -> None:
+        self._client = client
+        self._fingerprint: tuple[str, str] | None = None
+        self._versions: dict[int, int] = {}
+        self._contributions: dict[int, tuple[int, bool, float | None, float]] = {}
+        self._visits_by_location: dict[int, set[int]] = {}
+        self._profiles: dict[int, LocationProfile] = {}
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def get(self, location_id: int) -> LocationProfile | None:
+        """读取单个地点画像（调用方负责先刷新）。"""
+
+        return self._profiles.get(location_id)
+
+    def profiles(self) -> dict[int, LocationProfile]:
+        """刷新后返回全部地点画像。"""
+
+        self.refresh()
+        return dict(self._profiles)
+
+    def refresh(self) -> bool:
+        """按指纹增量刷新，返回是否有变化。"""
+
+        visit_fingerprint, activity_fingerprint = self._fetch_fingerprint()
+        if self._fingerprint == (visit_fingerprint, activity_fingerprint):
+            return False
+        if self._fingerprint is None or self._fingerprint[1] != activity_fingerprint:
+            self._versions.clear()
+            self._contributions.clear()
+            self._visits_by_location.clear()
+            self._profiles.clear()
+
+        current_versions = self._fetch_visit_versions()
+        changed_ids = [
+            visit_id
+            for visit_id, version in current_versions.items()
+            if self._versions.get(visit_id) != version
+        ]
+        removed_ids = [visit_id for visit_id in self._versions if visit_id not in current_versions]
+
+        touched_locations: set[int] = set()
+        for visit_id in [*removed_ids, *changed_ids]:
+            previous = self._contributions.pop(visit_id, None)
+            if previous is not None:
+                touched_locations.add(previous[0])
+                self._visits_by_location[previous[0]].discard(visit_id)
+        for row in self._fetch_contributions(changed_ids):
+            location_id = int(row["location_id"])
+            self._contributions[int(row["visit_id"])] = (
+                location_id,
+                bool(row["is_home"]),
+                row["arrival_core"],
+                float(row["dwell_seconds"] or 0.0),
+            )
+            self._visits_by_location.setdefault(location_id, set()).add(int(row["visit_id"]))
+            touched_locations.add(location_id)
+
+        for location_id in touched_locations:
+            self._rebuild_profile(location_id)
+        self._versions = current_versions
+        self._fingerprint = (visit_fingerprint, activity_fingerprint)
+        return True
+
+    def _rebuild_profile(self, location_id: int) -> None:
+        """按贡献重算单个地点画像。"""
+
+        visit_ids = self._visits_by_location.get(location_id)
+        if not visit_ids:
+            self._visits_by_location.pop(location_id, None)
+            self._profiles.pop(location_id, None)
+            return
+        contributions = [self._contributions[visit_id] for visit_id in visit_ids]
+        arrivals = [arrival for _, _, arrival, _ in contributions if arrival is not None]
+        self._profiles[location_id] = LocationProfile(
+            location_id=location_id,
+            home_visit_count=sum(1 for _, is_home, _, _ in contributions if is_home),
+            visit_count=len(contributions),
+            last_arrival_core=max(arrivals) if arrivals else None,
+            total_dwell_seconds=sum(dwell for *_, dwell in contributions),
+        )
+
+    def _fetch_fingerprint(self) -> tuple[str, str]:
+        """到访与活动表的变更指纹。"""
+
+        sql = """
+        SELECT
+            (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZVISIT
+            ) AS visit_fingerprint,
+            (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZACTIVITY
+            ) AS activity_fingerprint;
+        """
+        row = self._client.execute_query(sql)[0]
+        return str(row["visit_fingerprint"]), str(row["activity_fingerprint"])
+
+    def _fetch_visit_versions(self) -> dict[int, int]:
+        """读取全部到访的 Z_OPT 版本。"""
+
+        rows = self._client.execute_query("SELECT Z_PK AS visit_id, COALESCE(Z_OPT, 0) AS version FROM ZVISIT;")
+        return {int(row["visit_id"]): int(row["version"]) for row in rows}
+
+    def _fetch_contributions(self, visit_ids: list[int]) -> list[dict[str, Any]]:
+        """读取指定到访对地点画像的贡献。"""
+
+        if not visit_ids:
+            return []
+
+        sql = """
+        SELECT
+            v.Z_PK AS visit_id,
+            v.ZLOCATION AS location_id,
+            CASE WHEN va.ZISHOME = 1 THEN 1 ELSE 0 END AS is_home,
+            v.ZARRIVALDATE_ AS arrival_core,
+            CASE
+                WHEN v.ZARRIVALDATE_ IS NOT NULL
+                    AND v.ZDEPARTUREDATE_ IS NOT NULL
+                    AND v.ZDEPARTUREDATE_ < :open_sentinel
+                    AND v.ZDEPARTUREDATE_ > v.ZARRIVALDATE_
+                THEN v.ZDEPARTUREDATE_ - v.ZARRIVALDATE_
+                ELSE 0
+            END AS dwell_seconds
+        FROM ZVISIT v
+        LEFT JOIN ZACTIVITY va ON va.Z_PK = v.ZACTIVITY_
+        WHERE
+            v.Z_PK IN (SELECT value FROM json_each(:visit_ids))
+            AND v.ZLOCATION IS NOT NULL
+            AND v.ZPARENT IS NULL
+            AND v.ZMERGEDTO IS NULL;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {"visit_ids": json.dumps(visit_ids), "open_sentinel": OPEN_DEPARTURE_SENTINEL_CORE},
+        )
+        return [dict(row) for row in rows]
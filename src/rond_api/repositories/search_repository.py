@@ -0,0 +1,177 @@
+"""全文检索数据源仓储。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Literal, Sequence
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+
+SearchKind = Literal["location", "visit", "movement", "journal"]
+
+# 各类文档的来源 SQL：title/body 为可检索文本，date_core 用于关联时间线日期。
+DOCUMENT_SQL: dict[SearchKind, str] = {
+    "location": """
+        SELECT
+            l.Z_PK AS source_id,
+            COALESCE(l.ZNAME_, '') AS title,
+            COALESCE(l.ZNOTE_, '') AS body,
+            COALESCE(
+                l.ZLASTARRIVALDATE_,
+                (SELECT MAX(v.ZARRIVALDATE_) FROM ZVISIT v WHERE v.ZLOCATION = l.Z_PK)
+            ) AS date_core
+        FROM ZLOCATION l
+        WHERE (TRIM(COALESCE(l.ZNAME_, '')) <> '' OR TRIM(COALESCE(l.ZNOTE_, '')) <> '')
+    """,
+    "visit": """
+        SELECT
+            v.Z_PK AS source_id,
+            COALESCE(NULLIF(l.ZNAME_, ''), NULLIF(rv.ZNAME, ''), '未知地点') AS title,
+            v.ZREMARK_ AS body,
+            v.ZARRIVALDATE_ AS date_core
+        FROM ZVISIT v
+        LEFT JOIN ZLOCATION l ON l.Z_PK = v.ZLOCATION
+        LEFT JOIN ZRAWVISIT rv ON rv.Z_PK = v.ZRAW
+        WHERE v.ZMERGEDTO IS NULL AND TRIM(COALESCE(v.ZREMARK_, '')) <> ''
+    """,
+    "movement": """
+        SELECT
+            m.Z_PK AS source_id,
+            COALESCE(NULLIF(lf.ZNAME_, ''), '未知地点') || ' → ' || COALESCE(NULLIF(lt.ZNAME_, ''), '未知地点')
+                AS title,
+            m.ZNOTE_ AS body,
+            m.ZSTART_ AS date_core
+        FROM ZMOVEMENT m
+        LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
+        LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
+        LEFT JOIN ZLOCATION lf ON lf.Z_PK = vf.ZLOCATION
+        LEFT JOIN ZLOCATION lt ON lt.Z_PK = vt.ZLOCATION
+        WHERE TRIM(COALESCE(m.ZNOTE_, '')) <> ''
+    """,
+    "journal": """
+        SELECT
+            j.Z_PK AS source_id,
+            COALESCE(j.ZTITLE_, '') AS title,
+            COALESCE(j.ZCONTENT_, '') AS body,
+            j.ZDATE_ AS date_core
+        FROM ZJOURNAL j
+        WHERE (TRIM(COALESCE(j.ZTITLE_, '')) <> '' OR TRIM(COALESCE(j.ZCONTENT_, '')) <> '')
+    """,
+}
+SOURCE_ID_COLUMN: dict[SearchKind, str] = {
+    "location": "l.Z_PK",
+    "visit": "v.Z_PK",
+    "movement": "m.Z_PK",
+    "journal": "j.Z_PK",
+}
+ENTITY_NAMES = ("Location", "Visit", "Movement", "Journal")
+
+
+class SearchSourceRepository:
+    """读取检索文档来源与 Core Data 持久化历史。"""
+
+    def __init__(self, client: SQLiteReadClient) -> None:
+        self._client = client
+
+    def fetch_documents(self, kind: SearchKind, source_ids: Sequence[int] | None = None) -> list[dict[str, Any]]:
+        """读取某类文档；给定 source_ids 时只读这些记录。"""
+
+        sql = DOCUMENT_SQL[kind]
+        params: dict[str, Any] = {}
+        if source_ids is not None:
+            if not source_ids:
+                return []
+            sql += f" AND {SOURCE_ID_COLUMN[kind]} IN (SELECT value FROM json_each(:source_ids))"
+            params["source_ids"] = json.dumps(list(source_ids))
+        rows = self._client.execute_query(sql, params)
+        return [dict(row) for row in rows]
+
+    def fetch_store_identity(self) -> str:
+        """Core Data 存储 UUID，换库时据此重建索引。"""
+
+        rows = self._client.execute_query("SELECT Z_UUID AS store_uuid FROM Z_METADATA LIMIT 1;")
+        return str(rows[0]["store_uuid"]) if rows else ""
+
+    def fetch_entity_ids(self) -> dict[str, int]:
+        """实体名到 Z_ENT 编号。"""
+
+        sql = """
+        SELECT Z_NAME AS name, Z_ENT AS entity
+        FROM Z_PRIMARYKEY
+        WHERE Z_NAME IN (SELECT value FROM json_each(:names));
+        """
+        rows = self._client.execute_query(sql, {"names": json.dumps(list(ENTITY_NAMES))})
+        return {str(row["name"]): int(row["entity"]) for row in rows}
+
+    def fetch_history_bounds(self) -> tuple[int | None, int | None]:
+        """持久化历史变更的最小/最大主键（历史被清理后最小值会前移）。"""
+
+        rows = self._client.execute_query("SELECT MIN(Z_PK) AS min_pk, MAX(Z_PK) AS max_pk FROM ACHANGE;")
+        row = rows[0]
+        return (
+            int(row["min_pk"]) if row["min_pk"] is not None else None,
+            int(row["max_pk"]) if row["max_pk"] is not None else None,
+        )
+
+    def fetch_history_changes(
+        self,
+        after_change_pk: int,
+        up_to_change_pk: int,
+        entity_ids: Sequence[int],
+    ) -> list[dict[str, Any]]:
+        """读取游标之后、指定实体的变更记录（去重到实体+主键）。"""
+
+        sql = """
+        SELECT ZENTITY AS entity, ZENTITYPK AS entity_pk
+        FROM ACHANGE
+        WHERE
+            Z_PK > :after
+            AND Z_PK <= :up_to
+            AND ZENTITY IN (SELECT value FROM json_each(:entity_ids))
+        GROUP BY ZENTITY, ZENTITYPK;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {"after": after_change_pk, "up_to": up_to_change_pk, "entity_ids": json.dumps(list(entity_ids))},
+        )
+        return [dict(row) for row in rows]
+
+    def fetch_dependent_ids(
+        self,
+        location_ids: Sequence[int],
+        visit_ids: Sequence[int],
+    ) -> tuple[list[int], list[int]]:
+        """标题随地点/到访变化的到访备注与交通备注主键。"""
+
+        if not location_ids and not visit_ids:
+            return [], []
+        params = {"location_ids": json.dumps(list(location_ids)), "visit_ids": json.dumps(list(visit_ids))}
+        visit_rows = self._client.execute_query(
+            """
+            SELECT Z_PK AS visit_id FROM ZVISIT
+            WHERE ZLOCATION IN (SELECT value FROM json_each(:location_ids))
+            AND TRIM(COALESCE(ZREMARK_, '')) <> '';
+            """,
+            params,
+        )
+        movement_rows = self._client.execute_query(
+            """
+            SELECT m.Z_PK AS movement_id
+            FROM ZMOVEMENT m
+            LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
+            LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
+            WHERE
+                TRIM(COALESCE(m.ZNOTE_, '')) <> ''
+                AND (
+                    m.ZVISITFROM_ IN (SELECT value FROM json_each(:visit_ids))
+                    OR m.ZVISITTO_ IN (SELECT value FROM json_each(:visit_ids))
+                    OR vf.ZLOCATION IN (SELECT value FROM json_each(:location_ids))
+                    OR vt.ZLOCATION IN (SELECT value FROM json_each(:location_ids))
+                );
+            """,
+            params,
+        )
+        return (
+            [int(row["visit_id"]) for row in visit_rows],
+            [int(row["movement_id"]) for row in movement_rows],
+        )
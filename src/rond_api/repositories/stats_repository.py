@@ -0,0 +1,310 @@
+"""统计数据仓储。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Literal, Mapping
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.timeline_types import CORE_DATA_UNIX_EPOCH_OFFSET
+
+StatsGroupBy = Literal["category", "location", "transport", "weekday", "hour"]
+StatsPeriod = Literal["total", "day", "week"]
+RankingDimension = Literal["place", "category", "route", "transport"]
+RankingMetric = Literal["dwell", "count"]
+
+SECONDS_PER_HOUR = 3_600
+SECONDS_PER_DAY = 86_400
+SECONDS_PER_WEEK = 604_800
+
+VISIT_CATEGORY_SQL = "COALESCE(NULLIF(la.ZNAME_, ''), NULLIF(va.ZNAME_, ''), '未分类')"
+VISIT_LOCATION_SQL = "COALESCE(NULLIF(l.ZNAME_, ''), NULLIF(rv.ZNAME, ''), '未知地点')"
+ROUTE_SQL = (
+    "COALESCE(NULLIF(lf.ZNAME_, ''), '未知地点') || ' → ' || COALESCE(NULLIF(lt.ZNAME_, ''), '未知地点')"
+)
+
+
+class StatsRepository:
+    """在 SQLite 内完成裁剪与聚合的统计查询。"""
+
+    def __init__(self, client: SQLiteReadClient) -> None:
+        self._client = client
+
+    def fetch_duration_stats(
+        self,
+        range_start_core: float,
+        range_end_core: float,
+        group_by: StatsGroupBy,
+        period: StatsPeriod,
+        utc_offset_seconds: int,
+        transport_names_by_type: Mapping[int, str],
+        unknown_transport_name: str,
+        movement_speeds: Mapping[int, float] | None = None,
+    ) -> list[dict[str, Any]]:
+        """按维度与周期聚合区间内的停留/交通时长。
+
+        区间在 SQL 中裁剪到查询范围，并按本地（固定 UTC 偏移）小时/日/周边界拆分。
+        Core Data 纪元 2001-01-01 为周一，因此周边界可直接按 604800 秒对齐。
+        movement_speeds（米/秒）按拆分后的片段时长折算距离，汇总为 total_meters；
+        distance_seconds 只累计有距离的片段时长，供计算平均速度。
+        """
+
+        include_visits = group_by in {"category", "location", "weekday", "hour"}
+        include_movements = group_by in {"transport", "weekday", "hour"}
+        params: dict[str, Any] = {
+            "range_start": range_start_core,
+            "range_end": range_end_core,
+            "offset": utc_offset_seconds,
+            "unknown_transport": unknown_transport_name,
+            "movement_speeds": json.dumps(sorted((movement_speeds or {}).items())),
+        }
+
+        interval_parts: list[str] = []
+        if include_visits:
+            visit_key = VISIT_LOCATION_SQL if group_by == "location" else VISIT_CATEGORY_SQL
+            interval_parts.append(_visit_intervals_sql(visit_key, with_speed=True))
+        if include_movements:
+            interval_parts.append(
+                _movement_intervals_sql(
+                    _transport_key_sql(params, transport_names_by_type),
+                    with_speed=True,
+                )
+            )
+
+        step_seconds = _split_step_seconds(group_by, period)
+        if step_seconds is None:
+            next_boundary = "end_core"
+        else:
+            next_boundary = (
+                f"((CAST((piece_start + :offset) / {step_seconds} AS INTEGER) + 1) "
+                f"* {step_seconds} - :offset)"
+            )
+
+        period_label = _period_label_sql(period)
+        if group_by == "weekday":
+            group_key = f"CAST(CAST((piece_start + :offset) / {SECONDS_PER_DAY} AS INTEGER) % 7 AS TEXT)"
+        elif group_by == "hour":
+            group_key = f"CAST(CAST((piece_start + :offset) / {SECONDS_PER_HOUR} AS INTEGER) % 24 AS TEXT)"
+        else:
+            group_key = "group_key"
+
+        sql = f"""
+        WITH RECURSIVE
+        movement_speeds AS (
+            SELECT
+                json_extract(value, '$[0]') AS movement_id,
+                json_extract(value, '$[1]') AS meters_per_second
+            FROM json_each(:movement_speeds)
+        ),
+        intervals AS (
+            {" UNION ALL ".join(interval_parts)}
+        ),
+        pieces(kind, event_id, group_key, piece_start, end_core, meters_per_second) AS (
+            SELECT kind, event_id, group_key, start_core, end_core, meters_per_second
+            FROM intervals
+            WHERE end_core > start_core
+            UNION ALL
+            SELECT kind, event_id, group_key, {next_boundary}, end_core, meters_per_second
+            FROM pieces
+            WHERE {next_boundary} < end_core
+        ),
+        labelled AS (
+            SELECT
+                {period_label} AS period,
+                {group_key} AS group_key,
+                kind,
+                event_id,
+                MIN({next_boundary}, end_core) - piece_start AS seconds,
+                (MIN({next_boundary}, end_core) - piece_start) * meters_per_second AS meters
+            FROM pieces
+        )
+        SELECT
+            period,
+            group_key,
+            kind,
+            SUM(seconds) AS total_seconds,
+            SUM(meters) AS total_meters,
+            SUM(CASE WHEN meters IS NOT NULL THEN seconds END) AS distance_seconds,
+            COUNT(DISTINCT event_id) AS event_count,
+            SUM(SUM(seconds)) OVER (PARTITION BY period, kind) AS period_total_seconds
+        FROM labelled
+        GROUP BY period, group_key, kind
+        ORDER BY period ASC, kind DESC, total_seconds DESC, group_key ASC;
+        """
+        rows = self._client.execute_query(sql, params)
+        return [dict(row) for row in rows]
+
+    def fetch_ranking(
+        self,
+        range_start_core: float,
+        range_end_core: float,
+        dimension: RankingDimension,
+        metric: RankingMetric,
+        limit: int,
+        transport_names_by_type: Mapping[int, str],
+        unknown_transport_name: str,
+    ) -> list[dict[str, Any]]:
+        """在 SQL 中按维度聚合区间内时长与次数，并按指标取前 N。"""
+
+        params: dict[str, Any] = {
+            "range_start": range_start_core,
+            "range_end": range_end_core,
+            "unknown_transport": unknown_transport_name,
+            "limit": limit,
+        }
+        if dimension == "place":
+            intervals = _visit_intervals_sql(VISIT_LOCATION_SQL)
+        elif dimension == "category":
+            intervals = _visit_intervals_sql(VISIT_CATEGORY_SQL)
+        elif dimension == "route":
+            intervals = _movement_intervals_sql(ROUTE_SQL)
+        else:
+            intervals = _movement_intervals_sql(_transport_key_sql(params, transport_names_by_type))
+        order_column = "total_seconds" if metric == "dwell" else "event_count"
+        secondary_column = "event_count" if metric == "dwell" else "total_seconds"
+
+        sql = f"""
+        WITH intervals AS (
+            {intervals}
+        )
+        SELECT
+            group_key,
+            kind,
+            SUM(end_core - start_core) AS total_seconds,
+            COUNT(DISTINCT event_id) AS event_count
+        FROM intervals
+        WHERE end_core > start_core
+        GROUP BY group_key, kind
+        ORDER BY {order_column} DESC, {secondary_column} DESC, group_key ASC
+        LIMIT :limit;
+        """
+        rows = self._client.execute_query(sql, params)
+        return [dict(row) for row in rows]
+
+    def fetch_movement_endpoints(
+        self,
+        range_start_core: float,
+        range_end_core: float,
+    ) -> list[dict[str, Any]]:
+        """查询区间内交通的完整起止时间与起终点坐标（地点优先，原始到访兜底）。"""
+
+        sql = """
+        SELECT
+            m.Z_PK AS movement_id,
+            m.ZSTART_ AS start_core,
+            m.ZEND_ AS end_core,
+            COALESCE(lf.ZLATITUDE, rvf.ZLATITUDE) AS from_latitude,
+            COALESCE(lf.ZLONGITUDE, rvf.ZLONGITUDE) AS from_longitude,
+            COALESCE(lt.ZLATITUDE, rvt.ZLATITUDE) AS to_latitude,
+            COALESCE(lt.ZLONGITUDE, rvt.ZLONGITUDE) AS to_longitude
+        FROM ZMOVEMENT m
+        LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
+        LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
+        LEFT JOIN ZLOCATION lf ON lf.Z_PK = vf.ZLOCATION
+        LEFT JOIN ZLOCATION lt ON lt.Z_PK = vt.ZLOCATION
+        LEFT JOIN ZRAWVISIT rvf ON rvf.Z_PK = vf.ZRAW
+        LEFT JOIN ZRAWVISIT rvt ON rvt.Z_PK = vt.ZRAW
+        WHERE
+            m.ZSTART_ IS NOT NULL
+            AND m.ZEND_ IS NOT NULL
+            AND m.ZSTART_ < :range_end
+            AND m.ZEND_ > :range_start;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {"range_start": range_start_core, "range_end": range_end_core},
+        )
+        return [dict(row) for row in rows]
+
+
+def _visit_intervals_sql(visit_key: str, with_speed: bool = False) -> str:
+    """裁剪到查询范围的到访区间子查询。"""
+
+    speed_column = ", NULL AS meters_per_second" if with_speed else ""
+    return f"""
+    SELECT
+        'visit' AS kind,
+        v.Z_PK AS event_id,
+        {visit_key} AS group_key,
+        MAX(v.ZARRIVALDATE_, :range_start) AS start_core,
+        MIN(v.ZDEPARTUREDATE_, :range_end) AS end_core
+        {speed_column}
+    FROM ZVISIT v
+    LEFT JOIN ZLOCATION l ON l.Z_PK = v.ZLOCATION
+    LEFT JOIN ZACTIVITY la ON la.Z_PK = l.ZUSERACTIVITY_
+    LEFT JOIN ZACTIVITY va ON va.Z_PK = v.ZACTIVITY_
+    LEFT JOIN ZRAWVISIT rv ON rv.Z_PK = v.ZRAW
+    WHERE
+        v.ZPARENT IS NULL
+        AND v.ZMERGEDTO IS NULL
+        AND v.ZARRIVALDATE_ IS NOT NULL
+        AND v.ZDEPARTUREDATE_ IS NOT NULL
+        AND v.ZARRIVALDATE_ < :range_end
+        AND v.ZDEPARTUREDATE_ > :range_start
+    """
+
+
+def _movement_intervals_sql(movement_key: str, with_speed: bool = False) -> str:
+    """裁剪到查询范围的交通区间子查询；with_speed 时联接 movement_speeds CTE 带出速度列。"""
+
+    speed_column = ", ms.meters_per_second" if with_speed else ""
+    speed_join = "LEFT JOIN movement_speeds ms ON ms.movement_id = m.Z_PK" if with_speed else ""
+    return f"""
+    SELECT
+        'movement' AS kind,
+        m.Z_PK AS event_id,
+        {movement_key} AS group_key,
+        MAX(m.ZSTART_, :range_start) AS start_core,
+        MIN(m.ZEND_, :range_end) AS end_core
+        {speed_column}
+    FROM ZMOVEMENT m
+    LEFT JOIN ZTRANSPORT t ON t.Z_PK = m.ZTRANSPORT_
+    LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
+    LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
+    LEFT JOIN ZLOCATION lf ON lf.Z_PK = vf.ZLOCATION
+    LEFT JOIN ZLOCATION lt ON lt.Z_PK = vt.ZLOCATION
+    {speed_join}
+    WHERE
+        m.ZSTART_ IS NOT NULL
+        AND m.ZEND_ IS NOT NULL
+        AND m.ZSTART_ < :range_end
+        AND m.ZEND_ > :range_start
+    """
+
+
+def _transport_key_sql(params: dict[str, Any], transport_names_by_type: Mapping[int, str]) -> str:
+    """交通名称表达式：优先交通工具名，否则按类型映射兜底名称（映射写入参数）。"""
+
+    type_cases: list[str] = []
+    for movement_type, name in sorted(transport_names_by_type.items()):
+        param_name = f"transport_type_{movement_type}"
+        params[param_name] = name
+        type_cases.append(f"WHEN {int(movement_type)} THEN :{param_name}")
+    return (
+        "COALESCE(NULLIF(TRIM(t.ZNAME_), ''), "
+        f"CASE COALESCE(m.ZTYPE_, 0) {' '.join(type_cases)} ELSE :unknown_transport END)"
+    )
+
+
+def _split_step_seconds(group_by: StatsGroupBy, period: StatsPeriod) -> int | None:
+    """区间拆分步长：取维度与周期中更细的一方。"""
+
+    if group_by == "hour":
+        return SECONDS_PER_HOUR
+    if group_by == "weekday" or period == "day":
+        return SECONDS_PER_DAY
+    if period == "week":
+        return SECONDS_PER_WEEK
+    return None
+
+
+def _period_label_sql(period: StatsPeriod) -> str:
+    """周期标签 SQL（本地日期，周以周一开头）。"""
+
+    if period == "total":
+        return "'total'"
+    size = SECONDS_PER_DAY if period == "day" else SECONDS_PER_WEEK
+    return (
+        f"date(CAST((piece_start + :offset) / {size} AS INTEGER) * {size} "
+        f"+ {CORE_DATA_UNIX_EPOCH_OFFSET}, 'unixepoch')"
+    )
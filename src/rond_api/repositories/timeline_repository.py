@@ -2,22 +2,16 @@
 
 from __future__ import annotations
 
+import json
 from collections import defaultdict
-from typing import Any
+from typing import Any, Sequence
 
 from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.location_profiles import OPEN_DEPARTURE_SENTINEL_CORE, LocationProfileStore
 
 
-class TimelineRepository:
-    """封装时间线查询 SQL。"""
-
-    def __init__(self, client: SQLiteReadClient) -> None:
-        self._client = client
-
-    def fetch_visits(self, day_start_core: float, day_end_core: float) -> list[dict[str, Any]]:
-        """查询与目标自然日有重叠的到访。"""
-
-        sql = """
+# 到访行公共查询：列与联表供时间线和地点历史共用，调用方追加 AND 条件与排序。
+VISIT_SELECT_SQL = """
         SELECT
             v.Z_PK AS visit_id,
             v.ZLOCATION AS location_id,
@@ -27,6 +21,8 @@ class TimelineRepository:
             rv.ZTHOROUGHFARE AS raw_thoroughfare,
             rv.ZLATITUDE AS raw_latitude,
             rv.ZLONGITUDE AS raw_longitude,
+            v.ZTIMEZONEIDENTIFIER AS visit_timezone,
+            COALESCE(NULLIF(l.ZTIMEZONE, ''), NULLIF(rv.ZTIMEZONE, '')) AS location_timezone,
             l.ZTYPE_ AS location_type,
             l.ZCATEGORY_ AS poi_category,
             COALESCE(NULLIF(l.ZNAME_, ''), '未知地点') AS location_name,
@@ -40,7 +36,82 @@ class TimelineRepository:
             v.ZPARENT IS NULL
             AND v.ZMERGEDTO IS NULL
             AND v.ZARRIVALDATE_ IS NOT NULL
-            AND v.ZDEPARTUREDATE_ IS NOT NULL
+            AND v.ZDEPARTUREDATE_ IS NOT NULL"""
+
+
+# 交通行公共查询：调用方追加 AND 条件与排序。
+MOVEMENT_SELECT_SQL = """
+        SELECT
+            m.Z_PK AS movement_id,
+            m.ZSTART_ AS start_core,
+            m.ZEND_ AS end_core,
+            m.ZTYPE_ AS movement_type,
+            m.ZTRANSPORT_ AS transport_id,
+            t.ZNAME_ AS transport_name,
+            m.ZVISITFROM_ AS from_visit_id,
+            m.ZVISITTO_ AS to_visit_id,
+            lf.ZNAME_ AS from_location_name,
+            lt.ZNAME_ AS to_location_name,
+            COALESCE(NULLIF(vf.ZTIMEZONEIDENTIFIER, ''), NULLIF(lf.ZTIMEZONE, '')) AS from_timezone,
+            COALESCE(NULLIF(vt.ZTIMEZONEIDENTIFIER, ''), NULLIF(lt.ZTIMEZONE, '')) AS to_timezone,
+            COALESCE(lf.ZLATITUDE, rvf.ZLATITUDE) AS from_latitude,
+            COALESCE(lf.ZLONGITUDE, rvf.ZLONGITUDE) AS from_longitude,
+            COALESCE(lt.ZLATITUDE, rvt.ZLATITUDE) AS to_latitude,
+            COALESCE(lt.ZLONGITUDE, rvt.ZLONGITUDE) AS to_longitude
+        FROM ZMOVEMENT m
+        LEFT JOIN ZTRANSPORT t ON t.Z_PK = m.ZTRANSPORT_
+        LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
+        LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
+        LEFT JOIN ZLOCATION lf ON lf.Z_PK = vf.ZLOCATION
+        LEFT JOIN ZLOCATION lt ON lt.Z_PK = vt.ZLOCATION
+        LEFT JOIN ZRAWVISIT rvf ON rvf.Z_PK = vf.ZRAW
+        LEFT JOIN ZRAWVISIT rvt ON rvt.Z_PK = vt.ZRAW
+        WHERE
+            m.ZSTART_ IS NOT NULL
+            AND m.ZEND_ IS NOT NULL"""
+
+
+# 原始到访公共列：停留中判断按离开时间是否超过哨兵值。
+RAW_VISIT_SELECT_SQL = """
+        SELECT
+            rv.Z_PK AS raw_id,
+            rv.ZARRIVALDATE_ AS arrival_core,
+            rv.ZDEPARTUREDATE_ AS departure_core,
+            rv.ZNAME AS raw_name,
+            rv.ZTHOROUGHFARE AS raw_thoroughfare,
+            rv.ZLATITUDE AS raw_latitude,
+            rv.ZLONGITUDE AS raw_longitude,
+            rv.ZTIMEZONE AS raw_timezone
+        FROM ZRAWVISIT rv"""
+
+
+class TimelineRepository:
+    """封装时间线查询 SQL。"""
+
+    def __init__(
+        self,
+        client: SQLiteReadClient,
+        location_profiles: LocationProfileStore | None = None,
+    ) -> None:
+        self._client = client
+        self._location_profiles = location_profiles
+
+    @property
+    def location_profiles(self) -> LocationProfileStore | None:
+        """地点画像物化表（未启用时为 None）。"""
+
+        return self._location_profiles
+
+    def detach_location_profiles(self) -> None:
+        """丢弃地点画像物化表，之后候选地点改回 SQL 聚合。"""
+
+        self._location_profiles = None
+
+    def fetch_visits(self, day_start_core: float, day_end_core: float) -> list[dict[str, Any]]:
+        """查询与目标自然日有重叠的到访。"""
+
+        sql = f"""
+        {VISIT_SELECT_SQL}
             AND v.ZARRIVALDATE_ < :day_end_core
             AND v.ZDEPARTUREDATE_ > :day_start_core
         ORDER BY v.ZARRIVALDATE_ ASC, v.Z_PK ASC;
@@ -54,22 +125,47 @@ class TimelineRepository:
         )
         return [dict(row) for row in rows]
 
+    def fetch_location_visits(
+        self,
+        location_id: int,
+        limit: int,
+        before_arrival_core: float | None = None,
+        before_visit_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """按（到达时间、主键）倒序分页查询某地点的到访，游标之前的一页。"""
+
+        keyset_sql = ""
+        params: dict[str, Any] = {"location_id": location_id, "limit": limit}
+        if before_arrival_core is not None and before_visit_id is not None:
+            # 键集分页：深页与首页同样只按索引定位，不扫描跳过的行。
+            keyset_sql = """
+            AND (
+                v.ZARRIVALDATE_ < :before_arrival
+                OR (v.ZARRIVALDATE_ = :before_arrival AND v.Z_PK < :before_visit_id)
+            )
+            """
+            params["before_arrival"] = before_arrival_core
+            params["before_visit_id"] = before_visit_id
+
+        sql = f"""
+        {VISIT_SELECT_SQL}
+            AND v.ZLOCATION = :location_id
+            {keyset_sql}
+        ORDER BY v.ZARRIVALDATE_ DESC, v.Z_PK DESC
+        LIMIT :limit;
+        """
+        rows = self._client.execute_query(sql, params)
+        return [dict(row) for row in rows]
+
     def fetch_latest_open_raw_visit(self, day_end_core: float) -> dict[str, Any] | None:
         """查询最新的未结束原始到访。"""
 
-        sql = """
-        SELECT
-            rv.Z_PK AS raw_id,
-            rv.ZARRIVALDATE_ AS arrival_core,
-            rv.ZNAME AS raw_name,
-            rv.ZTHOROUGHFARE AS raw_thoroughfare,
-            rv.ZLATITUDE AS raw_latitude,
-            rv.ZLONGITUDE AS raw_longitude
-        FROM ZRAWVISIT rv
+        sql = f"""
+        {RAW_VISIT_SELECT_SQL}
         WHERE
             rv.ZARRIVALDATE_ IS NOT NULL
             AND rv.ZARRIVALDATE_ < :day_end_core
-            AND rv.ZDEPARTUREDATE_ > 60000000000
+            AND rv.ZDEPARTUREDATE_ > {OPEN_DEPARTURE_SENTINEL_CORE}
         ORDER BY rv.ZARRIVALDATE_ DESC
         LIMIT 1;
         """
@@ -86,7 +182,79 @@ class TimelineRepository:
     ) -> list[dict[str, Any]]:
         """按经纬度获取附近地点。"""
 
-        sql = """
+        return self._fetch_location_candidates(
+            condition_sql="1 = 1",
+            order_sql="""
+            ((l.ZLATITUDE - :lat) * (l.ZLATITUDE - :lat))
+                + ((l.ZLONGITUDE - :lon) * (l.ZLONGITUDE - :lon)) ASC
+            LIMIT :limit
+            """,
+            params={"lat": latitude, "lon": longitude, "limit": limit},
+        )
+
+    def fetch_locations_in_boxes(
+        self,
+        boxes: Sequence[tuple[float, float, float, float]],
+    ) -> list[dict[str, Any]]:
+        """一次查询获取落在任一经纬度矩形（最小纬度、最大纬度、最小经度、最大经度）内的地点。"""
+
+        if not boxes:
+            return []
+
+        params: dict[str, Any] = {}
+        box_clauses: list[str] = []
+        for index, (min_lat, max_lat, min_lon, max_lon) in enumerate(boxes):
+            params[f"min_lat_{index}"] = min_lat
+            params[f"max_lat_{index}"] = max_lat
+            params[f"min_lon_{index}"] = min_lon
+            params[f"max_lon_{index}"] = max_lon
+            box_clauses.append(
+                f"(l.ZLATITUDE BETWEEN :min_lat_{index} AND :max_lat_{index} "
+                f"AND l.ZLONGITUDE BETWEEN :min_lon_{index} AND :max_lon_{index})"
+            )
+        return self._fetch_location_candidates(
+            condition_sql=f"({' OR '.join(box_clauses)})",
+            order_sql="l.ZLATITUDE ASC, l.Z_PK ASC",
+            params=params,
+        )
+
+    def _fetch_location_candidates(
+        self,
+        condition_sql: str,
+        order_sql: str,
+        params: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """查询候选地点及其家/到访次数；有地点画像时只读 ZLOCATION 并补画像列。"""
+
+        if self._location_profiles is not None:
+            self._location_profiles.refresh()
+            sql = f"""
+            SELECT
+                l.Z_PK AS location_id,
+                l.ZNAME_ AS location_name,
+                l.ZTYPE_ AS location_type,
+                l.ZCATEGORY_ AS poi_category,
+                l.ZLATITUDE AS latitude,
+                l.ZLONGITUDE AS longitude
+            FROM ZLOCATION l
+            WHERE
+                l.ZNAME_ IS NOT NULL
+                AND TRIM(l.ZNAME_) <> ''
+                AND l.ZLATITUDE IS NOT NULL
+                AND l.ZLONGITUDE IS NOT NULL
+                AND {condition_sql}
+            ORDER BY {order_sql};
+            """
+            results: list[dict[str, Any]] = []
+            for row in self._client.execute_query(sql, params):
+                item = dict(row)
+                profile = self._location_profiles.get(int(item["location_id"]))
+                item["home_visit_count"] = profile.home_visit_count if profile else 0
+                item["visit_count"] = profile.visit_count if profile else 0
+                results.append(item)
+            return results
+
+        sql = f"""
         SELECT
             l.Z_PK AS location_id,
             l.ZNAME_ AS location_name,
@@ -107,19 +275,29 @@ class TimelineRepository:
             AND TRIM(l.ZNAME_) <> ''
             AND l.ZLATITUDE IS NOT NULL
             AND l.ZLONGITUDE IS NOT NULL
+            AND {condition_sql}
         GROUP BY l.Z_PK
-        ORDER BY
-            ((l.ZLATITUDE - :lat) * (l.ZLATITUDE - :lat))
-            + ((l.ZLONGITUDE - :lon) * (l.ZLONGITUDE - :lon))
-        ASC
-        LIMIT :limit;
+        ORDER BY {order_sql};
         """
-        rows = self._client.execute_query(
-            sql,
-            {"lat": latitude, "lon": longitude, "limit": limit},
-        )
+        rows = self._client.execute_query(sql, params)
         return [dict(row) for row in rows]
 
+    def fetch_location_fingerprint(self) -> str:
+        """地点与活动表的变更指纹（行数、最大主键、Z_OPT 之和）。"""
+
+        sql = """
+        SELECT
+            (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZLOCATION
+            ) || '|' || (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZACTIVITY
+            ) AS fingerprint;
+        """
+        rows = self._client.execute_query(sql)
+        return str(rows[0]["fingerprint"])
+
     def fetch_movements(
         self,
         day_start_core: float,
@@ -127,40 +305,142 @@ class TimelineRepository:
     ) -> list[dict[str, Any]]:
         """查询与目标自然日有重叠的交通记录。"""
 
+        sql = f"""
+        {MOVEMENT_SELECT_SQL}
+            AND m.ZSTART_ < :day_end_core
+            AND m.ZEND_ > :day_start_core
+        ORDER BY m.ZSTART_ ASC, m.Z_PK ASC;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {
+                "day_start_core": day_start_core,
+                "day_end_core": day_end_core,
+            },
+        )
+        return [dict(row) for row in rows]
+
+    def fetch_visit_versions(self, day_start_core: float, day_end_core: float) -> list[dict[str, Any]]:
+        """查询窗口内到访的版本串（到访及其地点、活动、原始到访的 Z_OPT），不取明细列。"""
+
+        sql = """
+        SELECT
+            v.Z_PK AS visit_id,
+            v.Z_OPT || ':' || COALESCE(l.Z_OPT, '') || ':' || COALESCE(la.Z_OPT, '') || ':'
+                || COALESCE(va.Z_OPT, '') || ':' || COALESCE(rv.Z_OPT, '') AS version
+        FROM ZVISIT v
+        LEFT JOIN ZLOCATION l ON l.Z_PK = v.ZLOCATION
+        LEFT JOIN ZACTIVITY la ON la.Z_PK = l.ZUSERACTIVITY_
+        LEFT JOIN ZACTIVITY va ON va.Z_PK = v.ZACTIVITY_
+        LEFT JOIN ZRAWVISIT rv ON rv.Z_PK = v.ZRAW
+        WHERE
+            v.ZPARENT IS NULL
+            AND v.ZMERGEDTO IS NULL
+            AND v.ZARRIVALDATE_ IS NOT NULL
+            AND v.ZDEPARTUREDATE_ IS NOT NULL
+            AND v.ZARRIVALDATE_ < :day_end_core
+            AND v.ZDEPARTUREDATE_ > :day_start_core;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {"day_start_core": day_start_core, "day_end_core": day_end_core},
+        )
+        return [dict(row) for row in rows]
+
+    def fetch_visits_by_ids(self, visit_ids: Sequence[int]) -> list[dict[str, Any]]:
+        """按主键批量查询到访明细。"""
+
+        if not visit_ids:
+            return []
+
+        sql = f"""
+        {VISIT_SELECT_SQL}
+            AND v.Z_PK IN (SELECT value FROM json_each(:visit_ids))
+        ORDER BY v.ZARRIVALDATE_ ASC, v.Z_PK ASC;
+        """
+        rows = self._client.execute_query(sql, {"visit_ids": json.dumps(list(visit_ids))})
+        return [dict(row) for row in rows]
+
+    def fetch_movement_versions(self, day_start_core: float, day_end_core: float) -> list[dict[str, Any]]:
+        """查询窗口内交通的版本串（交通及其交通工具、两端到访与地点、原始到访的 Z_OPT）。"""
+
         sql = """
         SELECT
             m.Z_PK AS movement_id,
-            m.ZSTART_ AS start_core,
-            m.ZEND_ AS end_core,
-            m.ZTYPE_ AS movement_type,
-            m.ZTRANSPORT_ AS transport_id,
-            t.ZNAME_ AS transport_name,
-            m.ZVISITFROM_ AS from_visit_id,
-            m.ZVISITTO_ AS to_visit_id,
-            lf.ZNAME_ AS from_location_name,
-            lt.ZNAME_ AS to_location_name
+            m.Z_OPT || ':' || COALESCE(t.Z_OPT, '') || ':' || COALESCE(vf.Z_OPT, '') || ':'
+                || COALESCE(vt.Z_OPT, '') || ':' || COALESCE(lf.Z_OPT, '') || ':'
+                || COALESCE(lt.Z_OPT, '') || ':' || COALESCE(rvf.Z_OPT, '') || ':'
+                || COALESCE(rvt.Z_OPT, '') AS version
         FROM ZMOVEMENT m
         LEFT JOIN ZTRANSPORT t ON t.Z_PK = m.ZTRANSPORT_
         LEFT JOIN ZVISIT vf ON vf.Z_PK = m.ZVISITFROM_
         LEFT JOIN ZVISIT vt ON vt.Z_PK = m.ZVISITTO_
         LEFT JOIN ZLOCATION lf ON lf.Z_PK = vf.ZLOCATION
         LEFT JOIN ZLOCATION lt ON lt.Z_PK = vt.ZLOCATION
+        LEFT JOIN ZRAWVISIT rvf ON rvf.Z_PK = vf.ZRAW
+        LEFT JOIN ZRAWVISIT rvt ON rvt.Z_PK = vt.ZRAW
         WHERE
             m.ZSTART_ IS NOT NULL
             AND m.ZEND_ IS NOT NULL
             AND m.ZSTART_ < :day_end_core
-            AND m.ZEND_ > :day_start_core
+            AND m.ZEND_ > :day_start_core;
+        """
+        rows = self._client.execute_query(
+            sql,
+            {"day_start_core": day_start_core, "day_end_core": day_end_core},
+        )
+        return [dict(row) for row in rows]
+
+    def fetch_movements_by_ids(self, movement_ids: Sequence[int]) -> list[dict[str, Any]]:
+        """按主键批量查询交通明细。"""
+
+        if not movement_ids:
+            return []
+
+        sql = f"""
+        {MOVEMENT_SELECT_SQL}
+            AND m.Z_PK IN (SELECT value FROM json_each(:movement_ids))
         ORDER BY m.ZSTART_ ASC, m.Z_PK ASC;
         """
+        rows = self._client.execute_query(sql, {"movement_ids": json.dumps(list(movement_ids))})
+        return [dict(row) for row in rows]
+
+    def fetch_raw_visits_after(self, after_raw_id: int, include_raw_id: int | None = None) -> list[dict[str, Any]]:
+        """按主键查询新增的原始到访（及指定的一条），只走主键索引。"""
+
+        sql = f"""
+        {RAW_VISIT_SELECT_SQL}
+        WHERE rv.Z_PK > :after_raw_id OR rv.Z_PK = :include_raw_id
+        ORDER BY rv.Z_PK ASC;
+        """
         rows = self._client.execute_query(
             sql,
-            {
-                "day_start_core": day_start_core,
-                "day_end_core": day_end_core,
-            },
+            {"after_raw_id": after_raw_id, "include_raw_id": include_raw_id},
         )
         return [dict(row) for row in rows]
 
+    def fetch_max_raw_visit_id(self) -> int:
+        """原始到访的最大主键。"""
+
+        rows = self._client.execute_query("SELECT COALESCE(MAX(Z_PK), 0) AS max_id FROM ZRAWVISIT;")
+        return int(rows[0]["max_id"])
+
+    def fetch_reference_fingerprint(self) -> str:
+        """地点、活动、标签与交通工具表的变更指纹，用于判断增量结果是否仍可复用。"""
+
+        sql = """
+        SELECT
+            (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZTAG
+            ) || '|' || (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(Z_PK), 0) || ':' || COALESCE(SUM(Z_OPT), 0)
+                FROM ZTRANSPORT
+            ) AS fingerprint;
+        """
+        rows = self._client.execute_query(sql)
+        return f"{self.fetch_location_fingerprint()}|{rows[0]['fingerprint']}"
+
     def fetch_visit_tags(self, visit_ids: list[int]) -> dict[int, set[str]]:
         """查询 visit 级标签。"""
 
@@ -182,6 +462,89 @@ class TimelineRepository:
         rows = self._client.execute_query(sql, tuple(visit_ids))
         return _rows_to_tag_map(rows, key_name="visit_id")
 
+    def fetch_visit_weather(self, visit_ids: list[int]) -> list[dict[str, Any]]:
+        """一次查询获取多条到访的小时天气（按到访、时间排序）。"""
+
+        if not visit_ids:
+            return []
+
+        sql = """
+        SELECT
+            w.ZVISIT AS visit_id,
+            w.ZDATE_ AS date_core,
+            w.ZTEMPERATURE_ AS temperature_k,
+            w.ZAPPARENTTEMPERATURE_ AS apparent_temperature_k,
+            w.ZHUMIDITY_ AS humidity,
+            w.ZPRECIPITATIONAMOUNT_ AS precipitation_amount,
+            w.ZPRECIPITATIONCHANCE_ AS precipitation_chance,
+            w.ZCONDITION_ AS condition,
+            w.ZSYMBOLNAME_ AS symbol_name
+        FROM ZHOURLYWEATHER w
+        WHERE w.ZVISIT IN (SELECT value FROM json_each(:visit_ids))
+        ORDER BY w.ZVISIT ASC, w.ZDATE_ ASC, w.Z_PK ASC;
+        """
+        rows = self._client.execute_query(sql, {"visit_ids": json.dumps(visit_ids)})
+        return [dict(row) for row in rows]
+
+    def fetch_visit_children(self, parent_ids: list[int]) -> list[dict[str, Any]]:
+        """一次查询获取父到访下的子到访与停留子段。"""
+
+        if not parent_ids:
+            return []
+
+        sql = """
+        SELECT
+            'visit' AS kind,
+            v.Z_PK AS source_id,
+            v.ZPARENT AS parent_id,
+            COALESCE(NULLIF(l.ZNAME_, ''), NULLIF(rv.ZNAME, ''), '未知地点') AS location_name,
+            v.ZARRIVALDATE_ AS start_core,
+            v.ZDEPARTUREDATE_ AS end_core
+        FROM ZVISIT v
+        LEFT JOIN ZLOCATION l ON l.Z_PK = v.ZLOCATION
+        LEFT JOIN ZRAWVISIT rv ON rv.Z_PK = v.ZRAW
+        WHERE
+            v.ZPARENT IN (SELECT value FROM json_each(:parent_ids))
+            AND v.ZMERGEDTO IS NULL
+            AND v.ZARRIVALDATE_ IS NOT NULL
+        UNION ALL
+        SELECT
+            'segment' AS kind,
+            s.Z_PK AS source_id,
+            s.ZPARENTVISIT AS parent_id,
+            COALESCE(NULLIF(l.ZNAME_, ''), '未知地点') AS location_name,
+            s.ZADDEDAT_ AS start_core,
+            NULL AS end_core
+        FROM ZSTAYSEGMENT s
+        LEFT JOIN ZLOCATION l ON l.Z_PK = s.ZLOCATION
+        WHERE
+            s.ZPARENTVISIT IN (SELECT value FROM json_each(:parent_ids))
+            AND s.ZADDEDAT_ IS NOT NULL
+        ORDER BY parent_id ASC, start_core ASC, kind ASC, source_id ASC;
+        """
+        rows = self._client.execute_query(sql, {"parent_ids": json.dumps(parent_ids)})
+        return [dict(row) for row in rows]
+
+    def fetch_trip(self, trip_id: int) -> dict[str, Any] | None:
+        """查询单个行程的时间窗口与元数据。"""
+
+        sql = """
+        SELECT
+            tr.Z_PK AS trip_id,
+            tr.Z_OPT AS trip_version,
+            tr.ZTITLE_ AS title,
+            tr.ZNOTE_ AS note,
+            tr.ZTIMEZONE_ AS timezone,
+            tr.ZSTARTDATE_ AS start_core,
+            tr.ZENDDATE_ AS end_core
+        FROM ZTRIP tr
+        WHERE tr.Z_PK = :trip_id;
+        """
+        rows = self._client.execute_query(sql, {"trip_id": trip_id})
+        if not rows:
+            return None
+        return dict(rows[0])
+
     def fetch_location_tags(self, location_ids: list[int]) -> dict[int, set[str]]:
         """查询 location 级标签。"""
 
@@ -0,0 +1,452 @@
+"""本地 HTTP JSON 接口。"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable, Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+from rond_api.config import ConfigError, load_app_config
+from rond_api.db.sqlite_client import DatabaseReadError
+from rond_api.defaults import SERVE_DEFAULT_HOST, SERVE_DEFAULT_PORT, SERVE_DEFAULT_WORKERS
+from rond_api.formatters.report_json import stats_table_to_dict
+from rond_api.formatters.timeline_json import events_to_dicts, timeline_to_dict
+from rond_api.repositories.stats_repository import StatsGroupBy, StatsPeriod
+from rond_api.services.stats_service import STATS_GROUP_BY, STATS_PERIODS, build_stats
+from rond_api.services.timeline_service import (
+    date_range_bounds,
+    parse_date_range,
+    parse_query_date,
+    validate_zone_mode,
+)
+from rond_api.tenants import TenantNotFoundError, TenantRegistry, TenantRuntime, TenantSpec
+
+GZIP_MIN_BYTES = 4096
+MAX_HEADER_BYTES = 16 * 1024
+HEADER_TIMEOUT_SECONDS = 10.0
+SHUTDOWN_TIMEOUT_SECONDS = 10.0
+IDLE_SWEEP_SECONDS = 60.0
+DEFAULT_TENANT_ID = "default"
+TENANT_PATH_PREFIX = "/tenants/"
+
+logger = logging.getLogger(__name__)
+
+Headers = dict[str, str]
+Response = tuple[int, Headers, bytes]
+
+
+@dataclass(frozen=True, slots=True)
+class _RequestPlan:
+    """已校验的请求：缓存键、是否覆盖当前时刻与构建函数。"""
+
+    key: tuple[object, ...]
+    live: bool
+    build: Callable[[], dict[str, Any]]
+
+
+class RondHTTPServer:
+    """基于 asyncio 的只读 JSON 服务，提供 /timeline、/range、/stats。
+
+    ETag 由数据库变更令牌与规范化查询参数得出，If-None-Match 命中时直接返回 304，不读取任何表；
+    覆盖当前时刻的查询额外按分钟分桶，保证停留中时长会刷新。阻塞的 SQLite 读取在有界线程池中执行。
+    传入租户注册表时按 /tenants/<id>/<endpoint> 路由到各自数据库，不带前缀的路径使用默认租户；
+    同一租户的时间线构建串行执行（服务内有缓存），不同租户之间并行。
+    请求头超过 MAX_HEADER_BYTES 返回 431，HEADER_TIMEOUT_SECONDS 内未读完返回 408。
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        host: str = SERVE_DEFAULT_HOST,
+        port: int = SERVE_DEFAULT_PORT,
+        workers: int = SERVE_DEFAULT_WORKERS,
+        gzip_min_bytes: int = GZIP_MIN_BYTES,
+        registry: TenantRegistry | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1.")
+        self.host = host
+        self.port = port
+        self._owns_registry = registry is None
+        if registry is None:
+            config = load_app_config(db_path=db_path)
+            registry = TenantRegistry(
+                [TenantSpec(tenant_id=DEFAULT_TENANT_ID, db_path=config.db_path, cache_dir=config.cache_dir)],
+                default_tenant=DEFAULT_TENANT_ID,
+                pool_size=workers,
+            )
+        self.registry = registry
+        self._gzip_min_bytes = gzip_min_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rond-api")
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.Task[Any]] = set()
+        self._sweeper: asyncio.Task[None] | None = None
+        self._stop: asyncio.Event | None = None
+        self._routes: dict[str, Callable[[TenantRuntime, Mapping[str, str]], _RequestPlan]] = {
+            "/timeline": self._plan_timeline,
+            "/range": self._plan_range,
+            "/stats": self._plan_stats,
+        }
+
+    async def start(self) -> None:
+        """开始监听；port 为 0 时回填实际端口。"""
+
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.host,
+            self.port,
+            limit=MAX_HEADER_BYTES,
+        )
+        self.port = int(self._server.sockets[0].getsockname()[1])
+        self._sweeper = asyncio.create_task(self._sweep_idle_tenants())
+
+    async def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """停止接收新连接，等待进行中的请求完成后关闭线程池。"""
+
+        if self._server is not None:
+            self._server.close()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+        if self._connections:
+            await asyncio.wait(set(self._connections), timeout=timeout)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        if self._owns_registry:
+            self.registry.close()
+
+    async def serve(self, ready: Callable[[RondHTTPServer], None] | None = None) -> None:
+        """运行到收到 SIGINT/SIGTERM 或 request_stop()，然后优雅关闭。"""
+
+        await self.start()
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        installed: list[signal.Signals] = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            # 非主线程或不支持的平台上无法注册信号处理，退回 request_stop()。
+            with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+                loop.add_signal_handler(signum, self._stop.set)
+                installed.append(signum)
+        try:
+            if ready is not None:
+                ready(self)
+            await self._stop.wait()
+        finally:
+            for signum in installed:
+                loop.remove_signal_handler(signum)
+            await self.shutdown()
+
+    def request_stop(self) -> None:
+        """请求 serve() 退出（需在事件循环线程调用）。"""
+
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _sweep_idle_tenants(self) -> None:
+        """定期关闭空闲租户，无请求时也不会长期占用文件句柄。"""
+
+        interval = min(IDLE_SWEEP_SECONDS, self.registry.idle_seconds)
+        while True:
+            await asyncio.sleep(interval)
+            self.registry.evict_idle()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT_SECONDS)
+            except asyncio.LimitOverrunError:
+                status, headers, body = _error_response(
+                    HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                    f"Request headers exceed {MAX_HEADER_BYTES} bytes.",
+                )
+            except asyncio.TimeoutError:
+                status, headers, body = _error_response(
+                    HTTPStatus.REQUEST_TIMEOUT,
+                    "Timed out reading request headers.",
+                )
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            else:
+                status, headers, body = await self._respond(head)
+            writer.write(_encode_response(status, headers, body))
+            with contextlib.suppress(ConnectionError):
+                await writer.drain()
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            if task is not None:
+                self._connections.discard(task)
+
+    async def _respond(self, head: bytes) -> Response:
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3:
+            return _error_response(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        method, target, _version = parts
+        headers: Headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+
+        if method != "GET":
+            status, error_headers, body = _error_response(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET is supported.")
+            return status, {**error_headers, "Allow": "GET"}, body
+        url = urlsplit(target)
+        tenant_id, endpoint = _split_tenant_path(url.path)
+        route = self._routes.get(endpoint)
+        if route is None:
+            return _error_response(HTTPStatus.NOT_FOUND, f"Unknown path: {url.path}")
+
+        loop = asyncio.get_running_loop()
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        # 租户打开、变更令牌读取与构建都会访问磁盘，整体放入线程池，避免慢盘阻塞事件循环。
+        return await loop.run_in_executor(
+            self._executor,
+            self._serve,
+            tenant_id,
+            endpoint,
+            route,
+            query,
+            headers,
+        )
+
+    def _serve(
+        self,
+        tenant_id: str | None,
+        endpoint: str,
+        route: Callable[[TenantRuntime, Mapping[str, str]], _RequestPlan],
+        query: Mapping[str, str],
+        headers: Headers,
+    ) -> Response:
+        """在工作线程中借用租户、校验 ETag 并构建响应。"""
+
+        try:
+            with self.registry.lease(tenant_id) as runtime:
+                plan = route(runtime, query)
+                etag = _etag(runtime, endpoint, plan)
+                if _etag_matches(headers.get("if-none-match"), etag):
+                    not_modified_headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+                    return HTTPStatus.NOT_MODIFIED, not_modified_headers, b""
+                payload = plan.build()
+        except TenantNotFoundError as exc:
+            return _error_response(HTTPStatus.NOT_FOUND, str(exc))
+        except (ConfigError, ValueError) as exc:
+            return _error_response(HTTPStatus.BAD_REQUEST, str(exc))
+        except DatabaseReadError as exc:
+            return _error_response(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+        except Exception:
+            logger.exception("Unhandled error while serving %s", endpoint)
+            return _error_response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server error.")
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        response_headers: Headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if len(body) >= self._gzip_min_bytes and _accepts_gzip(headers.get("accept-encoding")):
+            body = gzip.compress(body, compresslevel=5)
+            response_headers["Content-Encoding"] = "gzip"
+        return HTTPStatus.OK, response_headers, body
+
+    def _plan_timeline(self, runtime: TenantRuntime, params: Mapping[str, str]) -> _RequestPlan:
+        config = runtime.config
+        query_date = parse_query_date(params.get("date", "today"), config.timezone)
+        zone_mode = validate_zone_mode(params.get("zone_mode", "fixed"))
+        weather = _parse_flag(params, "weather")
+        expand_stays = _parse_flag(params, "expand_stays")
+
+        def build() -> dict[str, Any]:
+            with runtime.lock:
+                timeline = runtime.service.build_timeline(
+                    query_date=query_date,
+                    tz=config.timezone,
+                    timezone_name=config.timezone_name,
+                    zone_mode=zone_mode,
+                    weather=weather,
+                    expand_stays=expand_stays,
+                )
+            return timeline_to_dict(timeline)
+
+        return _RequestPlan(
+            key=(query_date.isoformat(), zone_mode, weather, expand_stays),
+            live=query_date == datetime.now(config.timezone).date(),
+            build=build,
+        )
+
+    def _plan_range(self, runtime: TenantRuntime, params: Mapping[str, str]) -> _RequestPlan:
+        config = runtime.config
+        start_expr = params.get("from", "today")
+        start_date, end_date = parse_date_range(start_expr, params.get("to") or start_expr, config.timezone)
+        range_start, range_end = date_range_bounds(start_date, end_date, config.timezone)
+        zone_mode = validate_zone_mode(params.get("zone_mode", "fixed"))
+
+        def build() -> dict[str, Any]:
+            with runtime.lock:
+                events = runtime.service.build_range_events(
+                    range_start=range_start,
+                    range_end=range_end,
+                    tz=config.timezone,
+                    timezone_name=config.timezone_name,
+                    zone_mode=zone_mode,
+                )
+            return {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "timezone": config.timezone_name,
+                "zone_mode": zone_mode,
+                "events": events_to_dicts(events),
+            }
+
+        return _RequestPlan(
+            key=(start_date.isoformat(), end_date.isoformat(), zone_mode),
+            live=range_start <= datetime.now(config.timezone) < range_end,
+            build=build,
+        )
+
+    def _plan_stats(self, runtime: TenantRuntime, params: Mapping[str, str]) -> _RequestPlan:
+        config = runtime.config
+        start_expr = params.get("from", "today")
+        start_date, end_date = parse_date_range(start_expr, params.get("to") or start_expr, config.timezone)
+        range_start, range_end = date_range_bounds(start_date, end_date, config.timezone)
+        group_by: StatsGroupBy = _parse_choice(params, "group_by", STATS_GROUP_BY, "category")
+        period: StatsPeriod = _parse_choice(params, "period", STATS_PERIODS, "total")
+
+        def build() -> dict[str, Any]:
+            table = build_stats(
+                runtime.stats_repository,
+                start_date=start_date,
+                end_date=end_date,
+                tz=config.timezone,
+                timezone_name=config.timezone_name,
+                group_by=group_by,
+                period=period,
+            )
+            return stats_table_to_dict(table)
+
+        return _RequestPlan(
+            key=(start_date.isoformat(), end_date.isoformat(), group_by, period),
+            live=range_start <= datetime.now(config.timezone) < range_end,
+            build=build,
+        )
+
+
+def serve(
+    db_path: str | None = None,
+    host: str = SERVE_DEFAULT_HOST,
+    port: int = SERVE_DEFAULT_PORT,
+    workers: int = SERVE_DEFAULT_WORKERS,
+    ready: Callable[[RondHTTPServer], None] | None = None,
+    registry: TenantRegistry | None = None,
+) -> None:
+    """阻塞运行 HTTP 服务直到收到停止信号。"""
+
+    server = RondHTTPServer(db_path=db_path, host=host, port=port, workers=workers, registry=registry)
+    asyncio.run(server.serve(ready=ready))
+
+
+def _split_tenant_path(path: str) -> tuple[str | None, str]:
+    """拆分 /tenants/<id>/<endpoint>；无前缀时租户为 None（默认租户）。"""
+
+    if not path.startswith(TENANT_PATH_PREFIX):
+        return None, path
+    tenant_id, _, endpoint = path[len(TENANT_PATH_PREFIX):].partition("/")
+    return tenant_id, f"/{endpoint}"
+
+
+def _etag(runtime: TenantRuntime, endpoint: str, plan: _RequestPlan) -> str:
+    """数据库变更令牌 + 路径与参数（覆盖当前时刻时加分钟桶）得出弱 ETag。"""
+
+    config = runtime.config
+    minute = datetime.now(config.timezone).strftime("%Y-%m-%dT%H:%M") if plan.live else None
+    material = repr((str(config.db_path), runtime.watcher.current_token(), endpoint, plan.key, minute))
+    return f'W/"{hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _parse_flag(params: Mapping[str, str], name: str) -> bool:
+    """解析 0/1、true/false 形式的布尔参数。"""
+
+    value = params.get(name, "").strip().lower()
+    if value in {"", "0", "false", "no"}:
+        return False
+    if value in {"1", "true", "yes"}:
+        return True
+    raise ValueError(f"Invalid {name}: {value}. Use 0/1 or true/false.")
+
+
+def _parse_choice(
+    params: Mapping[str, str],
+    name: str,
+    allowed: tuple[Any, ...],
+    default: Any,
+) -> Any:
+    """校验枚举参数。"""
+
+    value = params.get(name, default)
+    if value not in allowed:
+        raise ValueError(f"Invalid {name}: {value}. Allowed: {', '.join(allowed)}.")
+    return value
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """按弱比较判断 If-None-Match 是否命中。"""
+
+    if not if_none_match:
+        return False
+    target = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == target:
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """客户端是否接受 gzip（q=0 视为拒绝）。"""
+
+    for item in (accept_encoding or "").split(","):
+        coding, _, parameters = item.strip().partition(";")
+        if coding.strip().lower() not in {"gzip", "*"}:
+            continue
+        quality = parameters.strip().lower().removeprefix("q=")
+        try:
+            return not parameters or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def _error_response(status: HTTPStatus, message: str) -> Response:
+    body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+    return status, {"Content-Type": "application/json; charset=utf-8"}, body
+
+
+def _encode_response(status: int, headers: Headers, body: bytes) -> bytes:
+    """编码 HTTP/1.1 响应；每个连接只处理一个请求。"""
+
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    if status != HTTPStatus.NOT_MODIFIED:
+        lines.append(f"Content-Length: {len(body)}")
+    lines.extend(["Connection: close", "", ""])
+    return "\r\n".join(lines).encode("latin-1") + body
@@ -1,5 +1,42 @@
 """Service layer."""
 
-from rond_api.services.timeline_service import get_timeline
+from __future__ import annotations
 
-__all__ = ["get_timeline"]
+from importlib import import_module
+from typing import Any
+
+# 服务按需导入：加载单个服务模块时不会连带导入其余服务。
+_EXPORTS = {
+    "find_gaps": "rond_api.services.gap_service",
+    "get_location_history": "rond_api.services.history_service",
+    "get_stats": "rond_api.services.stats_service",
+    "get_timeline": "rond_api.services.timeline_service",
+    "get_top": "rond_api.services.ranking_service",
+    "get_trip_timeline": "rond_api.services.trip_service",
+    "locate_at": "rond_api.services.locate_service",
+    "search": "rond_api.services.search_service",
+}
+
+__all__ = [
+    "find_gaps",
+    "get_location_history",
+    "get_stats",
+    "get_timeline",
+    "get_top",
+    "get_trip_timeline",
+    "locate_at",
+    "search",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,109 @@
+"""空档检测服务。"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Sequence
+
+from rond_api.domain.gap_types import GapPeriod, GapReport, OverlapPeriod
+from rond_api.domain.timeline_types import TimelineEvent
+from rond_api.services.timeline_service import TimelineService, date_range_bounds
+
+
+def sweep_gaps(
+    events: Sequence[TimelineEvent],
+    range_start: datetime,
+    range_end: datetime,
+    min_minutes: int,
+) -> tuple[list[GapPeriod], list[OverlapPeriod]]:
+    """单次扫描线检测空档与重叠。
+
+    重叠按事件对报告：扫描时维护仍未结束的活动集合，新事件与集合中每个事件各产生一条重叠，
+    因此三个两两重叠的事件会得到三条记录。代价与重叠对数量成正比。
+    """
+
+    min_gap = timedelta(minutes=min_minutes)
+    ordered = sorted(
+        (event for event in events if event.end_at > range_start and event.start_at < range_end),
+        key=lambda event: (event.start_at, event.end_at),
+    )
+
+    gaps: list[GapPeriod] = []
+    overlaps: list[OverlapPeriod] = []
+    cover_end = range_start
+    cover_event: TimelineEvent | None = None
+    # 按开始时间排列的 (截断后结束时间, 事件)，只保留结束时间晚于当前扫描点的事件。
+    active: list[tuple[datetime, TimelineEvent]] = []
+    for event in ordered:
+        start_at = max(event.start_at, range_start)
+        end_at = min(event.end_at, range_end)
+        if start_at > cover_end:
+            if start_at - cover_end >= min_gap:
+                gaps.append(
+                    GapPeriod(start_at=cover_end, end_at=start_at, before=cover_event, after=event)
+                )
+        active = [(active_end, active_event) for active_end, active_event in active if active_end > start_at]
+        for active_end, active_event in active:
+            overlaps.append(
+                OverlapPeriod(
+                    start_at=start_at,
+                    end_at=min(end_at, active_end),
+                    first=active_event,
+                    second=event,
+                )
+            )
+        active.append((end_at, event))
+        if end_at > cover_end:
+            cover_end = end_at
+            cover_event = event
+
+    if range_end - cover_end >= min_gap and range_end > cover_end:
+        gaps.append(GapPeriod(start_at=cover_end, end_at=range_end, before=cover_event, after=None))
+    return gaps, overlaps
+
+
+def build_gap_report(
+    service: TimelineService,
+    start_date: date,
+    end_date: date,
+    tz: tzinfo,
+    timezone_name: str,
+    min_minutes: int = 30,
+) -> GapReport:
+    """一次窗口读取整段区间并生成空档报告。"""
+
+    if min_minutes < 0:
+        raise ValueError("min_minutes must be >= 0.")
+
+    range_start, range_end = date_range_bounds(start_date, end_date, tz)
+    events = service.build_range_events(
+        range_start=range_start,
+        range_end=range_end,
+        tz=tz,
+        timezone_name=timezone_name,
+    )
+    # 未来时段不算空档。
+    effective_end = min(range_end, max(datetime.now(tz), range_start))
+    gaps, overlaps = sweep_gaps(events, range_start, effective_end, min_minutes)
+    return GapReport(
+        start_date=start_date,
+        end_date=end_date,
+        timezone=timezone_name,
+        min_minutes=min_minutes,
+        gaps=gaps,
+        overlaps=overlaps,
+    )
+
+
+def find_gaps(
+    start: str | date,
+    end: str | date,
+    min_minutes: int = 30,
+    db_path: str | None = None,
+) -> GapReport:
+    """查找区间内未被到访或交通覆盖的时段。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.gaps(start, end, min_minutes=min_minutes)
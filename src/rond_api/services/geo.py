@@ -0,0 +1,70 @@
+"""球面距离计算。"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Sequence
+
+from rond_api._optional import load_numpy
+
+EARTH_RADIUS_M = 6_371_000.0
+# 少于该对数时逐项计算更快，也免去导入 numpy（单日时间线通常只有几段交通）。
+NUMPY_MIN_PAIRS = 64
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """两点球面距离（米）。"""
+
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    hav = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.atan2(math.sqrt(hav), math.sqrt(1 - hav))
+
+
+def haversine_meters_many(
+    lat1: Sequence[float],
+    lon1: Sequence[float],
+    lat2: Sequence[float],
+    lon2: Sequence[float],
+) -> list[float]:
+    """逐对计算球面距离（米）；批量较大且安装 numpy 时整批向量化，否则逐项计算。"""
+
+    if not lat1:
+        return []
+    np = load_numpy() if len(lat1) >= NUMPY_MIN_PAIRS else None
+    if np is None:
+        return [haversine_meters(*item) for item in zip(lat1, lon1, lat2, lon2)]
+
+    phi1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    phi2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lon2, dtype=np.float64) - np.asarray(lon1, dtype=np.float64))
+    hav = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    hav = np.clip(hav, 0.0, 1.0)
+    return (2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(hav), np.sqrt(1 - hav))).tolist()
+
+
+def leg_distances(rows: Sequence[dict[str, Any]]) -> dict[int, float]:
+    """按起终点坐标批量计算交通直线距离，缺坐标的记录跳过。
+
+    rows 需含 movement_id 与 from_/to_latitude、from_/to_longitude。
+    """
+
+    ids: list[int] = []
+    coordinates: tuple[list[float], list[float], list[float], list[float]] = ([], [], [], [])
+    for row in rows:
+        values = (
+            row.get("from_latitude"),
+            row.get("from_longitude"),
+            row.get("to_latitude"),
+            row.get("to_longitude"),
+        )
+        if any(value is None for value in values):
+            continue
+        ids.append(int(row["movement_id"]))
+        for target, value in zip(coordinates, values):
+            target.append(float(value))
+    return dict(zip(ids, haversine_meters_many(*coordinates)))
+
@@ -0,0 +1,22 @@
+"""地点历史服务。"""
+
+from __future__ import annotations
+
+from rond_api.domain.history_types import LocationHistoryPage
+from rond_api.domain.timeline_types import ZoneMode
+from rond_api.services.timeline_service import HISTORY_DEFAULT_LIMIT
+
+
+def get_location_history(
+    location_id: int,
+    before: str | None = None,
+    limit: int = HISTORY_DEFAULT_LIMIT,
+    db_path: str | None = None,
+    zone_mode: ZoneMode = "fixed",
+) -> LocationHistoryPage:
+    """获取某地点的到访历史，before 传入上一页的 next_cursor 继续翻页。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.location_history(location_id, before=before, limit=limit, zone_mode=zone_mode)
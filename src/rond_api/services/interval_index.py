@@ -0,0 +1,78 @@
+"""区间索引。"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """按起点排序的半开区间索引，单点查询 O(log n)。
+
+    区间按起点排序后，包含查询点且起点最晚的区间即“起点不晚于该点的前缀中，终点晚于该点的
+    最右一个”。终点建成最大值线段树，沿树下降查找最右位置，长区间包住大量短区间时也只需 O(log n)。
+    """
+
+    def __init__(self, intervals: Iterable[tuple[float, float, T]]) -> None:
+        ordered = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._starts: list[float] = [start for start, _, _ in ordered]
+        self._items: list[T] = [item for _, _, item in ordered]
+        ends = [end for _, end, _ in ordered]
+        # 前缀最大终点，供 previous_end 使用。
+        self._max_ends: list[float] = []
+        running_max = float("-inf")
+        for end in ends:
+            running_max = max(running_max, end)
+            self._max_ends.append(running_max)
+        # 完全二叉树形式的线段树：叶子从 _size 开始，内部节点保存子树最大终点。
+        size = 1
+        while size < len(ends):
+            size *= 2
+        self._size = size
+        self._tree: list[float] = [float("-inf")] * (2 * size)
+        self._tree[size : size + len(ends)] = ends
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def find(self, point: float) -> T | None:
+        """返回包含该点且起点最晚的区间。"""
+
+        last = bisect_right(self._starts, point) - 1
+        if last < 0:
+            return None
+        index = self._rightmost_end_after(1, 0, self._size - 1, last, point)
+        return self._items[index] if index >= 0 else None
+
+    def _rightmost_end_after(self, node: int, low: int, high: int, last: int, point: float) -> int:
+        """在 [low, min(high, last)] 中查找终点晚于 point 的最右位置，不存在时返回 -1。"""
+
+        if low > last or self._tree[node] <= point:
+            return -1
+        if low == high:
+            return low
+        middle = (low + high) // 2
+        found = self._rightmost_end_after(2 * node + 1, middle + 1, high, last, point)
+        if found >= 0:
+            return found
+        return self._rightmost_end_after(2 * node, low, middle, last, point)
+
+    def previous_end(self, point: float) -> float | None:
+        """返回起点不晚于该点的区间中最晚的终点。"""
+
+        index = bisect_right(self._starts, point) - 1
+        if index < 0:
+            return None
+        return self._max_ends[index]
+
+    def next_start(self, point: float) -> float | None:
+        """返回晚于该点的最早起点。"""
+
+        index = bisect_right(self._starts, point)
+        if index >= len(self._starts):
+            return None
+        return self._starts[index]
@@ -0,0 +1,106 @@
+"""时间点定位服务。"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterable, Sequence
+
+from rond_api.domain.locate_types import LocateResult
+from rond_api.domain.timeline_types import MovementEvent, TimelineEvent, VisitEvent, ZoneMode
+from rond_api.services.interval_index import IntervalIndex
+from rond_api.services.timeline_service import TimelineService
+
+
+class EventLocator:
+    """基于区间索引回答“某时刻在哪里”。"""
+
+    def __init__(self, events: Iterable[TimelineEvent], tz: tzinfo) -> None:
+        self._tz = tz
+        visit_intervals: list[tuple[float, float, TimelineEvent]] = []
+        movement_intervals: list[tuple[float, float, TimelineEvent]] = []
+        for event in events:
+            interval = (event.start_at.timestamp(), event.end_at.timestamp(), event)
+            if isinstance(event, VisitEvent):
+                visit_intervals.append(interval)
+            elif isinstance(event, MovementEvent):
+                movement_intervals.append(interval)
+        self._visits = IntervalIndex(visit_intervals)
+        self._movements = IntervalIndex(movement_intervals)
+
+    def locate(self, at: datetime) -> LocateResult:
+        """定位单个时刻，到访优先于交通。"""
+
+        point = at.timestamp()
+        visit = self._visits.find(point)
+        if visit is not None:
+            return LocateResult(at=at, kind="visit", event=visit)
+        movement = self._movements.find(point)
+        if movement is not None:
+            return LocateResult(at=at, kind="movement", event=movement)
+
+        previous_ends = [
+            value
+            for value in (self._visits.previous_end(point), self._movements.previous_end(point))
+            if value is not None
+        ]
+        next_starts = [
+            value
+            for value in (self._visits.next_start(point), self._movements.next_start(point))
+            if value is not None
+        ]
+        return LocateResult(
+            at=at,
+            kind="gap",
+            gap_start_at=self._to_datetime(max(previous_ends)) if previous_ends else None,
+            gap_end_at=self._to_datetime(min(next_starts)) if next_starts else None,
+        )
+
+    def _to_datetime(self, unix_seconds: float) -> datetime:
+        return datetime.fromtimestamp(unix_seconds, tz=timezone.utc).astimezone(self._tz)
+
+
+def locate_timestamps(
+    service: TimelineService,
+    timestamps: Sequence[datetime],
+    tz: tzinfo,
+    timezone_name: str,
+    zone_mode: ZoneMode = "fixed",
+) -> list[LocateResult]:
+    """批量定位时间点，只读取一次覆盖全部时间点的窗口。"""
+
+    if not timestamps:
+        return []
+
+    normalized = [_ensure_aware(value, tz) for value in timestamps]
+    range_start = min(normalized)
+    range_end = max(normalized) + timedelta(seconds=1)
+    events = service.build_range_events(
+        range_start=range_start,
+        range_end=range_end,
+        tz=tz,
+        timezone_name=timezone_name,
+        zone_mode=zone_mode,
+    )
+    locator = EventLocator(events, tz)
+    return [locator.locate(value) for value in normalized]
+
+
+def locate_at(
+    timestamps: Sequence[datetime],
+    db_path: str | None = None,
+    zone_mode: ZoneMode = "fixed",
+) -> list[LocateResult]:
+    """获取每个时间点所在的到访、交通或空档。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.locate(timestamps, zone_mode=zone_mode)
+
+
+def _ensure_aware(value: datetime, tz: tzinfo) -> datetime:
+    """无时区时间按配置时区解释。"""
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tz)
+    return value
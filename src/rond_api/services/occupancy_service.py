@@ -0,0 +1,156 @@
+"""时段占用直方图服务。"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Iterable, Sequence
+
+from rond_api._optional import load_numpy
+from rond_api.domain.occupancy_types import OccupancyMatrix
+from rond_api.domain.timeline_types import TimelineEvent, VisitEvent
+
+OCCUPANCY_BIN_MINUTES = (15, 30, 60)
+MOVEMENT_CATEGORY = "交通"
+
+
+def build_occupancy(
+    events: Iterable[TimelineEvent],
+    start_date: date,
+    end_date: date,
+    tz: tzinfo,
+    timezone_name: str,
+    bin_minutes: int = 60,
+) -> OccupancyMatrix:
+    """把事件区间按本地墙上时间分箱，得到每个分类的占用分钟。"""
+
+    if bin_minutes not in OCCUPANCY_BIN_MINUTES:
+        allowed = ", ".join(str(value) for value in OCCUPANCY_BIN_MINUTES)
+        raise ValueError(f"Invalid bin_minutes: {bin_minutes}. Allowed: {allowed}.")
+
+    day_count = (end_date - start_date).days + 1
+    bins_per_day = (24 * 60) // bin_minutes
+    bin_count = day_count * bins_per_day
+    bin_seconds = float(bin_minutes * 60)
+    origin = datetime.combine(start_date, datetime.min.time())
+    horizon = bin_count * bin_seconds
+
+    intervals: dict[str, tuple[list[float], list[float]]] = defaultdict(lambda: ([], []))
+    for event in events:
+        category = event.category_name if isinstance(event, VisitEvent) else MOVEMENT_CATEGORY
+        start_offset = _wall_offset_seconds(event.start_at, tz, origin)
+        end_offset = _wall_offset_seconds(event.end_at, tz, origin)
+        start_offset = min(max(start_offset, 0.0), horizon)
+        end_offset = min(max(end_offset, 0.0), horizon)
+        if end_offset <= start_offset:
+            continue
+        starts, ends = intervals[category]
+        starts.append(start_offset)
+        ends.append(end_offset)
+
+    categories: dict[str, list[list[float]]] = {}
+    for category in sorted(intervals):
+        starts, ends = intervals[category]
+        minutes = _bin_coverage_minutes(starts, ends, bin_seconds, bin_count)
+        rounded = [round(value, 4) for value in minutes]
+        categories[category] = [
+            rounded[day * bins_per_day : (day + 1) * bins_per_day] for day in range(day_count)
+        ]
+
+    return OccupancyMatrix(
+        days=[start_date + timedelta(days=offset) for offset in range(day_count)],
+        timezone=timezone_name,
+        bin_minutes=bin_minutes,
+        categories=categories,
+    )
+
+
+def get_occupancy(
+    start: str | date,
+    end: str | date,
+    bin_minutes: int = 60,
+    db_path: str | None = None,
+) -> OccupancyMatrix:
+    """获取区间内按分类的时段占用矩阵。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.occupancy(start, end, bin_minutes=bin_minutes)
+
+
+def _wall_offset_seconds(value: datetime, tz: tzinfo, origin: datetime) -> float:
+    """时刻转为相对区间起点的本地墙上秒数。"""
+
+    return (value.astimezone(tz).replace(tzinfo=None) - origin).total_seconds()
+
+
+def _bin_coverage_minutes(
+    starts: Sequence[float],
+    ends: Sequence[float],
+    bin_seconds: float,
+    bin_count: int,
+) -> Sequence[float]:
+    """计算每个分箱被区间覆盖的分钟数。
+
+    覆盖量 C(t) = Σ clip(t - s_i, 0, e_i - s_i) 可由排序后的起止前缀和直接求出，
+    分箱结果即相邻边界处 C 的差值，复杂度 O((n + bins) log n)，与区间时长无关。
+    """
+
+    np = load_numpy()
+    if np is not None:
+        return _bin_coverage_numpy(np, starts, ends, bin_seconds, bin_count)
+    return _bin_coverage_array(starts, ends, bin_seconds, bin_count)
+
+
+def _bin_coverage_numpy(
+    np: Any,
+    starts: Sequence[float],
+    ends: Sequence[float],
+    bin_seconds: float,
+    bin_count: int,
+) -> Any:
+    sorted_starts = np.sort(np.asarray(starts, dtype=np.float64))
+    sorted_ends = np.sort(np.asarray(ends, dtype=np.float64))
+    start_sums = np.concatenate(([0.0], np.cumsum(sorted_starts)))
+    end_sums = np.concatenate(([0.0], np.cumsum(sorted_ends)))
+    edges = np.arange(bin_count + 1, dtype=np.float64) * bin_seconds
+    started = np.searchsorted(sorted_starts, edges, side="left")
+    ended = np.searchsorted(sorted_ends, edges, side="left")
+    coverage = (started * edges - start_sums[started]) - (ended * edges - end_sums[ended])
+    return (np.diff(coverage) / 60.0).tolist()
+
+
+def _bin_coverage_array(
+    starts: Sequence[float],
+    ends: Sequence[float],
+    bin_seconds: float,
+    bin_count: int,
+) -> array:
+    sorted_starts = sorted(starts)
+    sorted_ends = sorted(ends)
+    start_sums = _prefix_sums(sorted_starts)
+    end_sums = _prefix_sums(sorted_ends)
+
+    result = array("d", bytes(8 * bin_count))
+    previous_coverage = 0.0
+    for index in range(1, bin_count + 1):
+        edge = index * bin_seconds
+        started = bisect_left(sorted_starts, edge)
+        ended = bisect_left(sorted_ends, edge)
+        coverage = (started * edge - start_sums[started]) - (ended * edge - end_sums[ended])
+        result[index - 1] = (coverage - previous_coverage) / 60.0
+        previous_coverage = coverage
+    return result
+
+
+def _prefix_sums(values: Sequence[float]) -> array:
+    sums = array("d", [0.0])
+    running = 0.0
+    for value in values:
+        running += value
+        sums.append(running)
+    return sums
+
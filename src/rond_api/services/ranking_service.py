@@ -0,0 +1,197 @@
+"""排行服务。"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import date, datetime, tzinfo
+from typing import Iterable, cast
+
+from rond_api.domain.ranking_types import RankingEntry, RankingResult
+from rond_api.domain.stats_types import StatsKind
+from rond_api.domain.timeline_types import TimelineEvent, VisitEvent
+from rond_api.repositories.stats_repository import RankingDimension, RankingMetric, StatsRepository
+from rond_api.services.timeline_service import (
+    TRANSPORT_FALLBACK_NAME_BY_MODE,
+    TRANSPORT_MODE_BY_TYPE,
+    TimelineService,
+    date_range_bounds,
+    to_core_data_seconds,
+)
+
+RANKING_DIMENSIONS: tuple[RankingDimension, ...] = ("place", "category", "route", "transport")
+RANKING_METRICS: tuple[RankingMetric, ...] = ("dwell", "count")
+UNKNOWN_ROUTE_END = "未知地点"
+
+
+class RankingAccumulator:
+    """流式累加各分组的时长与次数，最后用有界堆取前 N。"""
+
+    def __init__(self, dimension: RankingDimension, metric: RankingMetric, limit: int) -> None:
+        _validate_ranking(dimension, metric, limit)
+        self._dimension = dimension
+        self._metric = metric
+        self._limit = limit
+        self._totals: dict[str, list[float]] = {}
+
+    def add_chunk(
+        self,
+        chunk_start: datetime,
+        chunk_end: datetime,
+        events: Iterable[TimelineEvent],
+        range_start: datetime,
+    ) -> None:
+        """累加一个块：时长裁剪到块内，次数记在事件（裁剪后）起点所在的块。"""
+
+        for event in events:
+            key = _ranking_key(self._dimension, event)
+            if key is None:
+                continue
+            start_at = max(event.start_at, chunk_start)
+            end_at = min(event.end_at, chunk_end)
+            if end_at <= start_at:
+                continue
+            totals = self._totals.setdefault(key, [0.0, 0])
+            totals[0] += (end_at - start_at).total_seconds()
+            if chunk_start <= max(event.start_at, range_start) < chunk_end:
+                totals[1] += 1
+
+    def entries(self) -> list[RankingEntry]:
+        """按指标取前 N（主指标降序，另一指标与键名次之）。"""
+
+        primary = 0 if self._metric == "dwell" else 1
+        top = heapq.nsmallest(
+            self._limit,
+            self._totals.items(),
+            key=lambda item: (-item[1][primary], -item[1][1 - primary], item[0]),
+        )
+        kind = cast(StatsKind, "visit" if self._dimension in {"place", "category"} else "movement")
+        return [
+            RankingEntry(
+                key=key,
+                kind=kind,
+                total_minutes=round(seconds / 60, 2),
+                event_count=int(count),
+            )
+            for key, (seconds, count) in top
+        ]
+
+
+def build_ranking(
+    service: TimelineService,
+    start_date: date,
+    end_date: date,
+    tz: tzinfo,
+    timezone_name: str,
+    dimension: RankingDimension = "place",
+    metric: RankingMetric = "dwell",
+    limit: int = 10,
+) -> RankingResult:
+    """按块遍历区间事件并流式累加排行，结果与时间线一致（含未知地点回退）。"""
+
+    accumulator = RankingAccumulator(dimension, metric, limit)
+    range_start, range_end = date_range_bounds(start_date, end_date, tz)
+    for chunk_start, chunk_end, events in service.iter_range_events(
+        range_start=range_start,
+        range_end=range_end,
+        tz=tz,
+        timezone_name=timezone_name,
+    ):
+        accumulator.add_chunk(chunk_start, chunk_end, events, range_start)
+    return RankingResult(
+        start_date=start_date,
+        end_date=end_date,
+        timezone=timezone_name,
+        dimension=dimension,
+        metric=metric,
+        source="events",
+        entries=accumulator.entries(),
+    )
+
+
+def build_ranking_sql(
+    repository: StatsRepository,
+    start_date: date,
+    end_date: date,
+    tz: tzinfo,
+    timezone_name: str,
+    dimension: RankingDimension = "place",
+    metric: RankingMetric = "dwell",
+    limit: int = 10,
+) -> RankingResult:
+    """把聚合与取前 N 下推到 SQL；地点名取库内原值，不做附近地点回退。"""
+
+    _validate_ranking(dimension, metric, limit)
+    range_start, range_end = date_range_bounds(start_date, end_date, tz)
+    rows = repository.fetch_ranking(
+        range_start_core=to_core_data_seconds(range_start),
+        range_end_core=to_core_data_seconds(range_end),
+        dimension=dimension,
+        metric=metric,
+        limit=limit,
+        transport_names_by_type={
+            movement_type: TRANSPORT_FALLBACK_NAME_BY_MODE[mode]
+            for movement_type, mode in TRANSPORT_MODE_BY_TYPE.items()
+        },
+        unknown_transport_name=TRANSPORT_FALLBACK_NAME_BY_MODE["unknown"],
+    )
+    return RankingResult(
+        start_date=start_date,
+        end_date=end_date,
+        timezone=timezone_name,
+        dimension=dimension,
+        metric=metric,
+        source="sql",
+        entries=[
+            RankingEntry(
+                key=str(row["group_key"]),
+                kind=cast(StatsKind, row["kind"]),
+                total_minutes=round(float(row["total_seconds"] or 0) / 60, 2),
+                event_count=int(row["event_count"] or 0),
+            )
+            for row in rows
+        ],
+    )
+
+
+def get_top(
+    start: str | date,
+    end: str | date,
+    dimension: RankingDimension = "place",
+    metric: RankingMetric = "dwell",
+    limit: int = 10,
+    push_down: bool = False,
+    db_path: str | None = None,
+) -> RankingResult:
+    """获取区间内地点、分类、路线或交通方式的前 N 排行。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.top(start, end, dimension=dimension, metric=metric, limit=limit, push_down=push_down)
+
+
+def _ranking_key(dimension: RankingDimension, event: TimelineEvent) -> str | None:
+    """事件在该维度下的分组键，不属于该维度时返回 None。"""
+
+    if isinstance(event, VisitEvent):
+        if dimension == "place":
+            return event.location_name
+        if dimension == "category":
+            return event.category_name
+        return None
+    if dimension == "transport":
+        return event.transport_name
+    if dimension == "route":
+        from_name = event.from_location_name or UNKNOWN_ROUTE_END
+        to_name = event.to_location_name or UNKNOWN_ROUTE_END
+        return f"{from_name} → {to_name}"
+    return None
+
+
+def _validate_ranking(dimension: str, metric: str, limit: int) -> None:
+    if dimension not in RANKING_DIMENSIONS:
+        raise ValueError(f"Invalid dimension: {dimension}. Allowed: {', '.join(RANKING_DIMENSIONS)}.")
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"Invalid metric: {metric}. Allowed: {', '.join(RANKING_METRICS)}.")
+    if limit < 1:
+        raise ValueError("limit must be >= 1.")
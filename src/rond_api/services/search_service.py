@@ -0,0 +1,122 @@
+"""全文检索服务。"""
+
+from __future__ import annotations
+
+from datetime import tzinfo
+from pathlib import Path
+
+from rond_api.cache.search_index import SearchIndex
+from rond_api.config import AppConfig, db_cache_path
+from rond_api.domain.search_types import SearchHit, SearchResult
+from rond_api.repositories.search_repository import SearchKind, SearchSourceRepository
+from rond_api.services.timeline_service import from_core_data_seconds
+
+SEARCH_INDEX_FILENAME = "search.sqlite"
+SEARCH_KINDS: tuple[SearchKind, ...] = ("location", "visit", "movement", "journal")
+ENTITY_KIND: dict[str, SearchKind] = {
+    "Location": "location",
+    "Visit": "visit",
+    "Movement": "movement",
+    "Journal": "journal",
+}
+
+
+def search_index_path(config: AppConfig) -> Path | None:
+    """当前数据库的检索索引文件；未配置缓存目录时返回 None（内存索引）。"""
+
+    if config.cache_dir is None:
+        return None
+    return db_cache_path(config.cache_dir, config.db_path, SEARCH_INDEX_FILENAME)
+
+
+def refresh_search_index(index: SearchIndex, repository: SearchSourceRepository) -> bool:
+    """按持久化历史增量更新索引，返回是否做了全量重建。
+
+    存储 UUID 变化、首次建立或历史已被清理到游标之后时全量重建；否则只重读游标之后
+    变更过的地点/到访/交通/日记，以及标题随之变化的到访备注与交通备注。
+    """
+
+    identity = repository.fetch_store_identity()
+    # 先取历史上界再读文档，重建期间的新变更会在下次刷新中补上。
+    min_change_pk, max_change_pk = repository.fetch_history_bounds()
+    high_water = max_change_pk or 0
+    last_text = index.get_meta("last_change_pk")
+    last_change_pk = int(last_text) if last_text is not None else None
+
+    history_lost = (
+        last_change_pk is not None
+        and min_change_pk is not None
+        and min_change_pk > last_change_pk + 1
+    )
+    if index.get_meta("store_uuid") != identity or last_change_pk is None or history_lost:
+        index.clear()
+        for kind in SEARCH_KINDS:
+            index.add_documents(kind, repository.fetch_documents(kind))
+        index.set_meta({"store_uuid": identity, "last_change_pk": str(high_water)})
+        return True
+
+    if high_water <= last_change_pk:
+        return False
+
+    entity_ids = repository.fetch_entity_ids()
+    kind_by_entity = {entity_ids[name]: kind for name, kind in ENTITY_KIND.items() if name in entity_ids}
+    changed: dict[SearchKind, set[int]] = {kind: set() for kind in SEARCH_KINDS}
+    for change in repository.fetch_history_changes(last_change_pk, high_water, list(kind_by_entity)):
+        changed[kind_by_entity[int(change["entity"])]].add(int(change["entity_pk"]))
+
+    dependent_visits, dependent_movements = repository.fetch_dependent_ids(
+        sorted(changed["location"]),
+        sorted(changed["visit"]),
+    )
+    changed["visit"].update(dependent_visits)
+    changed["movement"].update(dependent_movements)
+    for kind in SEARCH_KINDS:
+        source_ids = sorted(changed[kind])
+        if source_ids:
+            index.replace_documents(kind, source_ids, repository.fetch_documents(kind, source_ids))
+    index.set_meta({"last_change_pk": str(high_water)})
+    return False
+
+
+def run_search(
+    index: SearchIndex,
+    query: str,
+    tz: tzinfo,
+    timezone_name: str,
+    limit: int = 20,
+) -> SearchResult:
+    """执行检索并把命中时间换算为本地日期。"""
+
+    if not query.strip():
+        raise ValueError("query must not be empty.")
+    if limit < 1:
+        raise ValueError("limit must be >= 1.")
+
+    hits = [
+        SearchHit(
+            kind=str(row["kind"]),
+            source_id=int(row["source_id"]),
+            title=str(row["title"]),
+            snippet=str(row["snippet"] or ""),
+            timeline_date=(
+                from_core_data_seconds(float(row["date_core"]), tz).date()
+                if row["date_core"] is not None
+                else None
+            ),
+            score=round(-float(row["score"]), 4) if row["score"] is not None else None,
+        )
+        for row in index.search(query, limit)
+    ]
+    return SearchResult(query=query, timezone=timezone_name, hits=hits)
+
+
+def search(query: str, limit: int = 20, db_path: str | None = None) -> SearchResult:
+    """在地点名称/备注、到访备注、交通备注与日记中全文检索。
+
+    配置了缓存目录时索引持久化在边车库中并增量更新，否则每次在内存中临时建立。
+    """
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.search(query, limit=limit)
@@ -0,0 +1,129 @@
+"""时长统计服务。"""
+
+from __future__ import annotations
+
+from datetime import date, tzinfo
+from typing import cast
+
+from rond_api.domain.stats_types import StatsKind, StatsRow, StatsTable
+from rond_api.repositories.stats_repository import StatsGroupBy, StatsPeriod, StatsRepository
+from rond_api.services.geo import leg_distances
+from rond_api.services.timeline_service import (
+    TRANSPORT_FALLBACK_NAME_BY_MODE,
+    TRANSPORT_MODE_BY_TYPE,
+    date_range_bounds,
+    to_core_data_seconds,
+)
+
+STATS_GROUP_BY: tuple[StatsGroupBy, ...] = ("category", "location", "transport", "weekday", "hour")
+STATS_PERIODS: tuple[StatsPeriod, ...] = ("total", "day", "week")
+# 含交通行的分组维度，需要先算出每段交通的平均速度。
+MOVEMENT_GROUP_BY: frozenset[StatsGroupBy] = frozenset({"transport", "weekday", "hour"})
+WEEKDAY_LABELS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+
+def build_stats(
+    repository: StatsRepository,
+    start_date: date,
+    end_date: date,
+    tz: tzinfo,
+    timezone_name: str,
+    group_by: StatsGroupBy = "category",
+    period: StatsPeriod = "total",
+) -> StatsTable:
+    """在 SQL 中聚合区间时长并整理为紧凑表格。"""
+
+    if group_by not in STATS_GROUP_BY:
+        raise ValueError(f"Invalid group_by: {group_by}. Allowed: {', '.join(STATS_GROUP_BY)}.")
+    if period not in STATS_PERIODS:
+        raise ValueError(f"Invalid period: {period}. Allowed: {', '.join(STATS_PERIODS)}.")
+
+    range_start, range_end = date_range_bounds(start_date, end_date, tz)
+    range_start_core = to_core_data_seconds(range_start)
+    range_end_core = to_core_data_seconds(range_end)
+    utc_offset = range_start.utcoffset()
+    movement_speeds: dict[int, float] = {}
+    if group_by in MOVEMENT_GROUP_BY:
+        endpoints = repository.fetch_movement_endpoints(range_start_core, range_end_core)
+        durations = {
+            int(row["movement_id"]): float(row["end_core"]) - float(row["start_core"]) for row in endpoints
+        }
+        movement_speeds = {
+            movement_id: distance_m / durations[movement_id]
+            for movement_id, distance_m in leg_distances(endpoints).items()
+            if durations[movement_id] > 0
+        }
+    rows = repository.fetch_duration_stats(
+        range_start_core=range_start_core,
+        range_end_core=range_end_core,
+        group_by=group_by,
+        period=period,
+        utc_offset_seconds=int(utc_offset.total_seconds()) if utc_offset else 0,
+        transport_names_by_type={
+            movement_type: TRANSPORT_FALLBACK_NAME_BY_MODE[mode]
+            for movement_type, mode in TRANSPORT_MODE_BY_TYPE.items()
+        },
+        unknown_transport_name=TRANSPORT_FALLBACK_NAME_BY_MODE["unknown"],
+        movement_speeds=movement_speeds,
+    )
+
+    stats_rows: list[StatsRow] = []
+    for row in rows:
+        total_seconds = float(row["total_seconds"] or 0)
+        period_total = float(row["period_total_seconds"] or 0)
+        total_meters = row.get("total_meters")
+        distance_seconds = row.get("distance_seconds")
+        stats_rows.append(
+            StatsRow(
+                period=str(row["period"]),
+                key=_format_group_key(group_by, row["group_key"]),
+                kind=cast(StatsKind, row["kind"]),
+                total_minutes=round(total_seconds / 60, 2),
+                event_count=int(row["event_count"] or 0),
+                share=round(total_seconds / period_total, 4) if period_total > 0 else 0.0,
+                distance_km=round(float(total_meters) / 1000, 3) if total_meters is not None else None,
+                distance_minutes=round(float(distance_seconds) / 60, 2) if distance_seconds is not None else None,
+            )
+        )
+
+    if group_by in {"weekday", "hour"}:
+        stats_rows.sort(key=lambda item: (item.period, item.kind != "visit", _key_order(group_by, item.key)))
+    return StatsTable(
+        start_date=start_date,
+        end_date=end_date,
+        timezone=timezone_name,
+        group_by=group_by,
+        period=period,
+        rows=stats_rows,
+    )
+
+
+def get_stats(
+    start: str | date,
+    end: str | date,
+    group_by: StatsGroupBy = "category",
+    period: StatsPeriod = "total",
+    db_path: str | None = None,
+) -> StatsTable:
+    """获取区间时长统计。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.stats(start, end, group_by=group_by, period=period)
+
+
+def _format_group_key(group_by: StatsGroupBy, raw_key: object) -> str:
+    """整理分组键：星期转中文，小时补零。"""
+
+    if group_by == "weekday":
+        return WEEKDAY_LABELS[int(str(raw_key)) % 7]
+    if group_by == "hour":
+        return f"{int(str(raw_key)):02d}"
+    return str(raw_key)
+
+
+def _key_order(group_by: StatsGroupBy, key: str) -> int:
+    if group_by == "weekday":
+        return WEEKDAY_LABELS.index(key)
+    return int(key)
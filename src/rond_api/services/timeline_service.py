@@ -4,22 +4,35 @@ from __future__ import annotations
 
 import math
 import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import date, datetime, time, timedelta, timezone, tzinfo
-from typing import Literal, cast
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Literal, cast
 
-from rond_api.config import load_app_config
+from rond_api.cache.resolution_cache import MISSING, LocationResolutionCache
+from rond_api.config import AppConfig, db_cache_path, get_cached_zone
 from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.history_types import LocationHistoryPage
 from rond_api.domain.timeline_types import (
+    CORE_DATA_UNIX_EPOCH_OFFSET,
     MovementEvent,
+    NestedStop,
+    NestedStopKind,
     OutputMode,
     TimelineEvent,
     TimelineResult,
     TransportMode,
     VisitEvent,
+    VisitWeather,
+    ZoneMode,
 )
+from rond_api.keyword_rules import KeywordRules
+from rond_api.repositories.location_profiles import LocationProfileStore
 from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.geo import haversine_meters_many, leg_distances
 
-CORE_DATA_UNIX_EPOCH_OFFSET = 978307200
 TRANSPORT_MODE_BY_TYPE: dict[int, TransportMode] = {
     0: "unknown",
     1: "flight",
@@ -43,43 +56,378 @@ FLIGHT_KEYWORDS = ("飞", "航班", "飞机")
 BIKE_KEYWORDS = ("骑", "单车", "自行车", "电瓶")
 RUN_KEYWORDS = ("跑",)
 WALK_KEYWORDS = ("步行",)
+# 交通名称 → 模式，按顺序优先；ZTRANSPORT 只有少量行，推断结果按名称缓存。
+TRANSPORT_MODE_RULES: list[tuple[tuple[str, ...], TransportMode]] = [
+    (PUBLIC_TRANSIT_KEYWORDS, "public_transit"),
+    (FLIGHT_KEYWORDS, "flight"),
+    (BIKE_KEYWORDS, "bike"),
+    (RUN_KEYWORDS, "run"),
+    (WALK_KEYWORDS, "walk"),
+]
+TRANSPORT_MODE_CACHE_SIZE = 256
+_TRANSPORT_MODE_MATCHER = KeywordRules(TRANSPORT_MODE_RULES)
+ZONE_MODES: tuple[ZoneMode, ...] = ("fixed", "event", "traveller")
+TRAVELLER_WINDOW_BEFORE = timedelta(hours=14)
+TRAVELLER_WINDOW_AFTER = timedelta(hours=12)
+RESOLUTION_CACHE_FILENAME = "location_resolution.json"
+RANGE_CHUNK = timedelta(days=7)
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+KELVIN_OFFSET = 273.15
+NEARBY_MATCH_RADIUS_M = 280.0
+NEARBY_CANDIDATE_LIMIT = 25
+# 批量预取时矩形条件过多则退化为外包矩形，避免 SQL 参数膨胀。
+NEARBY_PREFETCH_MAX_BOXES = 200
+METERS_PER_DEGREE_LATITUDE = 6_371_000.0 * math.pi / 180
 
 
 class TimelineService:
     """时间线业务服务。"""
 
-    def __init__(self, repository: TimelineRepository) -> None:
+    def __init__(
+        self,
+        repository: TimelineRepository,
+        resolution_cache: LocationResolutionCache | None = None,
+    ) -> None:
         self._repository = repository
+        self._resolution_cache = resolution_cache
+
+    def build_timeline(
+        self,
+        query_date: date,
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> TimelineResult:
+        """构建指定日期时间线。
+
+        weather 为 True 时附加到访天气汇总；expand_stays 为 True 时附加子到访与停留子段。
+        """
+
+        validate_zone_mode(zone_mode)
+        fetch_start_core, fetch_end_core, day_end_core = day_fetch_window(query_date, tz, zone_mode)
+
+        self._prepare_resolution_cache()
+        visit_rows = self._repository.fetch_visits(fetch_start_core, fetch_end_core)
+        movement_rows = self._repository.fetch_movements(fetch_start_core, fetch_end_core)
+        zones = _ZoneResolver(tz, timezone_name, zone_mode)
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]] = {}
+        events = self._build_day_events(
+            visit_rows,
+            movement_rows,
+            query_date=query_date,
+            zones=zones,
+            nearby_cache=nearby_cache,
+            weather=weather,
+            expand_stays=expand_stays,
+        )
+
+        today = datetime.now(tz).date()
+        if query_date == today:
+            self._append_ongoing_stay_event(
+                events=events,
+                day_end_core=day_end_core,
+                zones=zones,
+                nearby_cache=nearby_cache,
+            )
+
+        self._flush_resolution_cache()
+        sort_events(events)
+        return TimelineResult(
+            query_date=query_date,
+            timezone=timezone_name,
+            events=events,
+            zone_mode=zone_mode,
+        )
+
+    @property
+    def repository(self) -> TimelineRepository:
+        """底层仓储。"""
+
+        return self._repository
+
+    def cached_entry_count(self) -> int:
+        """内存中的缓存条目数（地点画像贡献 + 解析缓存），用于估算内存占用。"""
+
+        profiles = self._repository.location_profiles
+        count = len(profiles) if profiles is not None else 0
+        if self._resolution_cache is not None:
+            count += len(self._resolution_cache)
+        return count
+
+    def trim_caches(self, max_entries: int) -> None:
+        """把内存缓存压到 max_entries 条以内。
+
+        地点画像无法部分保留，单独超出上限时整体丢弃并改回 SQL 聚合，避免反复全量重建；
+        解析缓存按 LRU 收缩到剩余额度。
+        """
+
+        profiles = self._repository.location_profiles
+        if profiles is not None and len(profiles) > max_entries:
+            self._repository.detach_location_profiles()
+            profiles = None
+        if self._resolution_cache is not None:
+            remaining = max_entries - (len(profiles) if profiles is not None else 0)
+            self._resolution_cache.shrink(max(remaining, 0))
+
+    def build_day_events(
+        self,
+        visit_rows: list[dict[str, Any]],
+        movement_rows: list[dict[str, Any]],
+        query_date: date,
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+    ) -> list[TimelineEvent]:
+        """把指定日期窗口内的到访/交通行转为事件（不含停留中事件），供增量构建复用。"""
+
+        validate_zone_mode(zone_mode)
+        self._prepare_resolution_cache()
+        events = self._build_day_events(
+            visit_rows,
+            movement_rows,
+            query_date=query_date,
+            zones=_ZoneResolver(tz, timezone_name, zone_mode),
+            nearby_cache={},
+        )
+        self._flush_resolution_cache()
+        return events
+
+    def build_ongoing_stay_event(
+        self,
+        raw_open: dict[str, Any] | None,
+        events: list[TimelineEvent],
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+    ) -> VisitEvent | None:
+        """由未结束原始到访构建停留中事件，已被现有到访覆盖时返回 None。"""
+
+        validate_zone_mode(zone_mode)
+        self._prepare_resolution_cache()
+        event = self._ongoing_stay_event(
+            raw_open,
+            events=events,
+            zones=_ZoneResolver(tz, timezone_name, zone_mode),
+            nearby_cache={},
+        )
+        self._flush_resolution_cache()
+        return event
+
+    def build_range_events(
+        self,
+        range_start: datetime,
+        range_end: datetime,
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> list[TimelineEvent]:
+        """一次窗口读取构建与区间重叠的全部事件。"""
+
+        validate_zone_mode(zone_mode)
+        range_start_core = to_core_data_seconds(range_start)
+        range_end_core = to_core_data_seconds(range_end)
+        self._prepare_resolution_cache()
+        visit_rows = self._repository.fetch_visits(range_start_core, range_end_core)
+        movement_rows = self._repository.fetch_movements(range_start_core, range_end_core)
+        zones = _ZoneResolver(tz, timezone_name, zone_mode)
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]] = {}
+
+        events: list[TimelineEvent] = []
+        events.extend(
+            self._build_visit_events(
+                visit_rows,
+                zones=zones,
+                nearby_cache=nearby_cache,
+                weather=weather,
+                expand_stays=expand_stays,
+            )
+        )
+        events.extend(self._build_movement_events(movement_rows, zones=zones))
+        # 停留中事件只属于覆盖当前时刻的区间，历史区间不应拾取遗留的未结束原始到访。
+        if range_start <= datetime.now(tz) < range_end:
+            self._append_ongoing_stay_event(
+                events=events,
+                day_end_core=range_end_core,
+                zones=zones,
+                nearby_cache=nearby_cache,
+            )
+
+        self._flush_resolution_cache()
+        sort_events(events)
+        return events
+
+    def build_location_history(
+        self,
+        location_id: int,
+        tz: tzinfo,
+        timezone_name: str,
+        before: str | None = None,
+        limit: int = HISTORY_DEFAULT_LIMIT,
+        zone_mode: ZoneMode = "fixed",
+    ) -> LocationHistoryPage:
+        """按键集游标分页构建某地点的到访历史。"""
+
+        validate_zone_mode(zone_mode)
+        if not 1 <= limit <= HISTORY_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {HISTORY_MAX_LIMIT}.")
+        before_arrival_core, before_visit_id = (
+            _decode_history_cursor(before) if before is not None else (None, None)
+        )
+
+        self._prepare_resolution_cache()
+        # 多取一行判断是否还有下一页。
+        visit_rows = self._repository.fetch_location_visits(
+            location_id=location_id,
+            limit=limit + 1,
+            before_arrival_core=before_arrival_core,
+            before_visit_id=before_visit_id,
+        )
+        page_rows = visit_rows[:limit]
+        events = self._build_visit_events(
+            page_rows,
+            zones=_ZoneResolver(tz, timezone_name, zone_mode),
+            nearby_cache={},
+        )
+        self._flush_resolution_cache()
+
+        next_cursor = None
+        if len(visit_rows) > limit:
+            last_row = page_rows[-1]
+            next_cursor = _encode_history_cursor(float(last_row["arrival_core"]), int(last_row["visit_id"]))
+        return LocationHistoryPage(
+            location_id=location_id,
+            timezone=timezone_name,
+            events=events,
+            next_cursor=next_cursor,
+        )
+
+    def iter_range_events(
+        self,
+        range_start: datetime,
+        range_end: datetime,
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+        chunk: timedelta = RANGE_CHUNK,
+    ) -> Iterator[tuple[datetime, datetime, list[TimelineEvent]]]:
+        """按块窗口逐段构建事件，跨块事件会在相邻块中重复出现，由调用方按块裁剪。"""
+
+        if chunk <= timedelta(0):
+            raise ValueError("chunk must be positive.")
+        chunk_start = range_start
+        while chunk_start < range_end:
+            chunk_end = min(chunk_start + chunk, range_end)
+            yield chunk_start, chunk_end, self.build_range_events(
+                range_start=chunk_start,
+                range_end=chunk_end,
+                tz=tz,
+                timezone_name=timezone_name,
+                zone_mode=zone_mode,
+            )
+            chunk_start = chunk_end
+
+    def _prepare_resolution_cache(self) -> None:
+        """按地点与活动指纹校验持久缓存。
 
-    def build_timeline(self, query_date: date, tz: tzinfo, timezone_name: str) -> TimelineResult:
-        """构建指定日期时间线。"""
+        不纳入 ZVISIT：到访几乎每天都有增改，纳入后缓存每次运行都会失效；
+        住所判定以解析时为准，只在地点或活动（含是否为家）变化时重算。
+        """
 
-        day_start = datetime.combine(query_date, time.min, tzinfo=tz)
-        day_end = day_start + timedelta(days=1)
-        day_start_core = _to_core_data_seconds(day_start)
-        day_end_core = _to_core_data_seconds(day_end)
+        if self._resolution_cache is not None:
+            self._resolution_cache.validate(self._repository.fetch_location_fingerprint())
 
-        visit_rows = self._repository.fetch_visits(day_start_core, day_end_core)
-        movement_rows = self._repository.fetch_movements(day_start_core, day_end_core)
+    def _flush_resolution_cache(self) -> None:
+        """写回持久缓存。"""
 
-        visit_ids = [int(row["visit_id"]) for row in visit_rows]
+        if self._resolution_cache is None:
+            return
+        try:
+            self._resolution_cache.save()
+        except OSError:
+            # 边车文件写入失败不影响查询结果。
+            pass
+
+    def _build_day_events(
+        self,
+        visit_rows: list[dict[str, Any]],
+        movement_rows: list[dict[str, Any]],
+        query_date: date,
+        zones: _ZoneResolver,
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> list[TimelineEvent]:
+        """单日到访与交通行转事件；traveller 模式按当地日期过滤。"""
+
+        local_day = query_date if zones.zone_mode == "traveller" else None
+        events: list[TimelineEvent] = []
+        events.extend(
+            self._build_visit_events(
+                visit_rows,
+                zones=zones,
+                nearby_cache=nearby_cache,
+                local_day=local_day,
+                weather=weather,
+                expand_stays=expand_stays,
+            )
+        )
+        events.extend(self._build_movement_events(movement_rows, zones=zones, local_day=local_day))
+        return events
+
+    def _build_visit_events(
+        self,
+        visit_rows: list[dict[str, Any]],
+        zones: _ZoneResolver,
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
+        local_day: date | None = None,
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> list[VisitEvent]:
+        """到访行转事件，含标签合并与未知地点回退。
+
+        weather / expand_stays 分别以一次批量查询附加天气与子到访、停留子段。
+        """
+
+        row_zones = [
+            zones.resolve(row.get("visit_timezone"), row.get("location_timezone"))
+            for row in visit_rows
+        ]
+        selected: list[tuple[dict[str, Any], datetime, datetime, tuple[tzinfo, str]]] = []
+        for row, row_zone in zip(visit_rows, row_zones):
+            arrival_at = from_core_data_seconds(float(row["arrival_core"]), row_zone[0])
+            departure_at = from_core_data_seconds(float(row["departure_core"]), row_zone[0])
+            if local_day is not None and not _overlaps_local_day(arrival_at, departure_at, local_day):
+                continue
+            selected.append((row, arrival_at, departure_at, row_zone))
+
+        visit_ids = [int(row["visit_id"]) for row, *_ in selected]
         location_ids = sorted(
             {
                 int(row["location_id"])
-                for row in visit_rows
+                for row, *_ in selected
                 if row.get("location_id") is not None
             }
         )
+        self._prefetch_nearby_locations([row for row, *_ in selected], nearby_cache)
         visit_tags_map = self._repository.fetch_visit_tags(visit_ids)
         location_tags_map = self._repository.fetch_location_tags(location_ids)
-        nearby_cache: dict[tuple[float, float], list[dict[str, object]]] = {}
+        weather_map = (
+            _summarize_weather(self._repository.fetch_visit_weather(visit_ids)) if weather else {}
+        )
+        children_map: dict[int, list[dict[str, Any]]] = defaultdict(list)
+        if expand_stays:
+            for child_row in self._repository.fetch_visit_children(visit_ids):
+                children_map[int(child_row["parent_id"])].append(child_row)
 
-        events: list[TimelineEvent] = []
-        for row in visit_rows:
+        events: list[VisitEvent] = []
+        for row, arrival_at, departure_at, (zone, zone_name) in selected:
             visit_id = int(row["visit_id"])
             location_id = row.get("location_id")
-            arrival_at = _from_core_data_seconds(float(row["arrival_core"]), tz)
-            departure_at = _from_core_data_seconds(float(row["departure_core"]), tz)
             (
                 location_name,
                 category_name,
@@ -105,13 +453,36 @@ class TimelineService:
                     arrival_at=arrival_at,
                     departure_at=departure_at,
                     is_cross_day=arrival_at.date() != departure_at.date(),
+                    timezone_name=zone_name,
+                    weather=weather_map.get(visit_id),
+                    children=_build_nested_stops(children_map.get(visit_id, []), zone, departure_at),
                 )
             )
+        return events
 
-        for row in movement_rows:
-            start_at = _from_core_data_seconds(float(row["start_core"]), tz)
-            end_at = _from_core_data_seconds(float(row["end_core"]), tz)
-            movement_type = int(row["movement_type"]) if row["movement_type"] is not None else 0
+    def _build_movement_events(
+        self,
+        movement_rows: list[dict[str, Any]],
+        zones: _ZoneResolver,
+        local_day: date | None = None,
+    ) -> list[MovementEvent]:
+        """交通行转事件，起点按出发时区、终点按到达时区显示。"""
+
+        row_zones = [
+            (zones.resolve(row.get("from_timezone")), zones.resolve(row.get("to_timezone")))
+            for row in movement_rows
+        ]
+
+        distances = leg_distances(movement_rows)
+
+        events: list[MovementEvent] = []
+        for row, (start_zone, end_zone) in zip(movement_rows, row_zones):
+            start_at = from_core_data_seconds(float(row["start_core"]), start_zone[0])
+            end_at = from_core_data_seconds(float(row["end_core"]), end_zone[0])
+            if local_day is not None and not _overlaps_local_day(start_at, end_at, local_day):
+                continue
+            raw_movement_type = row.get("movement_type")
+            movement_type = int(raw_movement_type) if raw_movement_type is not None else 0
             transport_mode = TRANSPORT_MODE_BY_TYPE.get(movement_type, "unknown")
             raw_transport_name = row.get("transport_name")
             transport_name = str(raw_transport_name).strip() if raw_transport_name else ""
@@ -130,26 +501,11 @@ class TimelineService:
                     duration_minutes=duration_minutes,
                     from_location_name=_normalize_text(row.get("from_location_name")),
                     to_location_name=_normalize_text(row.get("to_location_name")),
+                    timezone_name=start_zone[1],
+                    distance_m=distances.get(int(row["movement_id"])),
                 )
             )
-
-        today = datetime.now(tz).date()
-        if query_date == today:
-            self._append_ongoing_stay_event(
-                events=events,
-                day_end_core=day_end_core,
-                tz=tz,
-                nearby_cache=nearby_cache,
-            )
-
-        events.sort(
-            key=lambda event: (
-                _event_start_at(event),
-                0 if event.event_type == "visit" else 1,
-                _event_stable_id(event),
-            )
-        )
-        return TimelineResult(query_date=query_date, timezone=timezone_name, events=events)
+        return events
 
     def _resolve_visit_location_and_category(
         self,
@@ -174,7 +530,7 @@ class TimelineService:
             latitude=latitude,
             longitude=longitude,
             nearby_cache=nearby_cache,
-            max_distance_m=280.0,
+            max_distance_m=NEARBY_MATCH_RADIUS_M,
         )
         if nearest:
             nearest_name = _normalize_text(nearest.get("location_name"))
@@ -197,25 +553,39 @@ class TimelineService:
         self,
         events: list[TimelineEvent],
         day_end_core: float,
-        tz: tzinfo,
+        zones: _ZoneResolver,
         nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
     ) -> None:
         """补充停留中地点。"""
 
         raw_open = self._repository.fetch_latest_open_raw_visit(day_end_core)
+        event = self._ongoing_stay_event(raw_open, events=events, zones=zones, nearby_cache=nearby_cache)
+        if event is not None:
+            events.append(event)
+
+    def _ongoing_stay_event(
+        self,
+        raw_open: dict[str, Any] | None,
+        events: list[TimelineEvent],
+        zones: _ZoneResolver,
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
+    ) -> VisitEvent | None:
+        """未结束原始到访转停留中事件。"""
+
         if raw_open is None:
-            return
+            return None
 
         arrival_core = raw_open.get("arrival_core")
         if arrival_core is None:
-            return
-        arrival_at = _from_core_data_seconds(float(arrival_core), tz)
-        now_at = datetime.now(tz)
+            return None
+        zone, zone_name = zones.resolve(raw_open.get("raw_timezone"))
+        arrival_at = from_core_data_seconds(float(arrival_core), zone)
+        now_at = datetime.now(zone)
         if now_at < arrival_at:
             now_at = arrival_at
 
         if self._is_time_covered_by_visit(events, arrival_at):
-            return
+            return None
 
         latitude = _to_float(raw_open.get("raw_latitude"))
         longitude = _to_float(raw_open.get("raw_longitude"))
@@ -223,7 +593,7 @@ class TimelineService:
             latitude=latitude,
             longitude=longitude,
             nearby_cache=nearby_cache,
-            max_distance_m=280.0,
+            max_distance_m=NEARBY_MATCH_RADIUS_M,
         )
         raw_name = _normalize_text(raw_open.get("raw_name"))
         raw_road = _normalize_text(raw_open.get("raw_thoroughfare"))
@@ -233,19 +603,18 @@ class TimelineService:
         home_visit_count = int(nearest.get("home_visit_count") or 0) if nearest else 0
         category_name = "家" if home_visit_count > 0 else "未分类"
 
-        events.append(
-            VisitEvent(
-                visit_id=-int(raw_open.get("raw_id", 0) or 0),
-                location_name=location_name or raw_name or raw_road or "未知地点",
-                category_name=category_name,
-                location_type=location_type,
-                poi_category=poi_category,
-                tags=[],
-                arrival_at=arrival_at,
-                departure_at=now_at,
-                is_cross_day=arrival_at.date() != now_at.date(),
-                is_ongoing=True,
-            )
+        return VisitEvent(
+            visit_id=-int(raw_open.get("raw_id", 0) or 0),
+            location_name=location_name or raw_name or raw_road or "未知地点",
+            category_name=category_name,
+            location_type=location_type,
+            poi_category=poi_category,
+            tags=[],
+            arrival_at=arrival_at,
+            departure_at=now_at,
+            is_cross_day=arrival_at.date() != now_at.date(),
+            is_ongoing=True,
+            timezone_name=zone_name,
         )
 
     def _is_time_covered_by_visit(self, events: list[TimelineEvent], target_at: datetime) -> bool:
@@ -270,26 +639,119 @@ class TimelineService:
         if latitude is None or longitude is None:
             return None
 
+        if self._resolution_cache is not None:
+            cached = self._resolution_cache.get(latitude, longitude, max_distance_m)
+            if cached is not MISSING:
+                return cast(dict[str, object] | None, cached)
+
+        nearest = self._find_nearest_location(
+            latitude=latitude,
+            longitude=longitude,
+            nearby_cache=nearby_cache,
+            max_distance_m=max_distance_m,
+        )
+        if self._resolution_cache is not None:
+            self._resolution_cache.put(latitude, longitude, max_distance_m, nearest)
+        return nearest
+
+    def _prefetch_nearby_locations(
+        self,
+        visit_rows: list[dict[str, Any]],
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
+    ) -> None:
+        """以一次矩形范围查询预取所有未知地点的附近候选，写入 nearby_cache。
+
+        每个点的矩形半宽取阈值圆在经度方向的跨度，圆内候选的平方度距离都小于半宽平方，
+        因此按同一距离排序截取前 NEARBY_CANDIDATE_LIMIT 条与逐点查询的结果一致。
+        """
+
+        points: dict[tuple[float, float], tuple[float, float]] = {}
+        for row in visit_rows:
+            location_name = _normalize_text(row.get("location_name"))
+            if location_name and location_name != "未知地点":
+                continue
+            latitude = _to_float(row.get("raw_latitude"))
+            longitude = _to_float(row.get("raw_longitude"))
+            if latitude is None or longitude is None:
+                continue
+            cache_key = (round(latitude, 6), round(longitude, 6))
+            if cache_key in nearby_cache or cache_key in points:
+                continue
+            if (
+                self._resolution_cache is not None
+                and self._resolution_cache.get(latitude, longitude, NEARBY_MATCH_RADIUS_M) is not MISSING
+            ):
+                continue
+            # 与逐点路径一致：同一键以首个出现的原始坐标排序。
+            points[cache_key] = (latitude, longitude)
+        if not points:
+            return
+
+        boxes = {key: _nearby_box(latitude, longitude) for key, (latitude, longitude) in points.items()}
+        candidates = self._repository.fetch_locations_in_boxes(_merge_boxes(list(boxes.values())))
+        located = sorted(
+            (
+                (item_lat, item_lon, int(item.get("location_id") or 0), item)
+                for item in candidates
+                if (item_lat := _to_float(item.get("latitude"))) is not None
+                and (item_lon := _to_float(item.get("longitude"))) is not None
+            ),
+            key=lambda entry: (entry[0], entry[2]),
+        )
+        latitudes = [entry[0] for entry in located]
+
+        for cache_key, (latitude, longitude) in points.items():
+            min_lat, max_lat, min_lon, max_lon = boxes[cache_key]
+            in_box = [
+                (
+                    (item_lat - latitude) ** 2 + (item_lon - longitude) ** 2,
+                    location_id,
+                    item,
+                )
+                for item_lat, item_lon, location_id, item in located[
+                    bisect_left(latitudes, min_lat) : bisect_right(latitudes, max_lat)
+                ]
+                if min_lon <= item_lon <= max_lon
+            ]
+            in_box.sort(key=lambda entry: (entry[0], entry[1]))
+            nearby_cache[cache_key] = [item for *_, item in in_box[:NEARBY_CANDIDATE_LIMIT]]
+
+    def _find_nearest_location(
+        self,
+        latitude: float,
+        longitude: float,
+        nearby_cache: dict[tuple[float, float], list[dict[str, object]]],
+        max_distance_m: float,
+    ) -> dict[str, object] | None:
+        """查询附近地点并按家优先、距离次之选择。"""
+
         cache_key = (round(latitude, 6), round(longitude, 6))
         nearby_locations = nearby_cache.get(cache_key)
         if cache_key not in nearby_cache:
             nearby_locations = self._repository.fetch_nearby_locations(
                 latitude=latitude,
                 longitude=longitude,
-                limit=25,
+                limit=NEARBY_CANDIDATE_LIMIT,
             )
             nearby_cache[cache_key] = nearby_locations
 
         if not nearby_locations:
             return None
 
-        filtered: list[dict[str, object]] = []
+        located: list[tuple[dict[str, object], float, float]] = []
         for item in nearby_locations:
             item_lat = _to_float(item.get("latitude"))
             item_lon = _to_float(item.get("longitude"))
-            if item_lat is None or item_lon is None:
-                continue
-            distance_m = _distance_meters(latitude, longitude, item_lat, item_lon)
+            if item_lat is not None and item_lon is not None:
+                located.append((item, item_lat, item_lon))
+        distances = haversine_meters_many(
+            [latitude] * len(located),
+            [longitude] * len(located),
+            [item_lat for _, item_lat, _ in located],
+            [item_lon for _, _, item_lon in located],
+        )
+        filtered: list[dict[str, object]] = []
+        for (item, _, _), distance_m in zip(located, distances):
             if distance_m <= max_distance_m:
                 candidate = dict(item)
                 candidate["distance_m"] = distance_m
@@ -319,19 +781,65 @@ def get_timeline(
     db_path: str | None = None,
     output: OutputMode = "pretty",
     emoji: bool = True,
+    zone_mode: ZoneMode = "fixed",
+    weather: bool = False,
+    expand_stays: bool = False,
 ) -> TimelineResult:
-    """获取指定日期时间线。"""
+    """获取指定日期时间线（单次查询；循环查询请复用 RondSession）。"""
 
     _validate_output_mode(output)
+    validate_zone_mode(zone_mode)
     if not isinstance(emoji, bool):
         raise ValueError("emoji must be bool.")
 
-    config = load_app_config(db_path=db_path)
-    query_date = parse_query_date(date_expr, config.timezone)
-    client = SQLiteReadClient(config.db_path)
-    repository = TimelineRepository(client)
-    service = TimelineService(repository)
-    return service.build_timeline(query_date=query_date, tz=config.timezone, timezone_name=config.timezone_name)
+    # 会话模块依赖本模块，延迟导入避免循环。
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.timeline(date_expr, zone_mode=zone_mode, weather=weather, expand_stays=expand_stays)
+
+
+def day_fetch_window(query_date: date, tz: tzinfo, zone_mode: ZoneMode) -> tuple[float, float, float]:
+    """单日查询窗口（Core Data 秒）：取数起点、取数终点与当日结束。"""
+
+    day_start = datetime.combine(query_date, time.min, tzinfo=tz)
+    day_end = day_start + timedelta(days=1)
+    if zone_mode == "traveller":
+        # 当地日期归属需覆盖 UTC-12 ~ UTC+14 的全部时区，先放宽窗口再按当地日期过滤。
+        fetch_start = datetime.combine(query_date, time.min, tzinfo=timezone.utc)
+        fetch_start -= TRAVELLER_WINDOW_BEFORE
+        fetch_end = datetime.combine(query_date, time.min, tzinfo=timezone.utc)
+        fetch_end += timedelta(days=1) + TRAVELLER_WINDOW_AFTER
+    else:
+        fetch_start, fetch_end = day_start, day_end
+    return to_core_data_seconds(fetch_start), to_core_data_seconds(fetch_end), to_core_data_seconds(day_end)
+
+
+def build_timeline_service(
+    config: AppConfig,
+    client: SQLiteReadClient | None = None,
+    location_profiles: bool = False,
+) -> TimelineService:
+    """按配置构建时间线服务，配置了缓存目录时启用持久解析缓存。
+
+    location_profiles 为 True 时地点画像走内存物化，仅适合会反复查询的长生命周期调用方
+    （循环复用的会话、租户、watch、HTTP 服务）；一次性查询沿用 SQL 框选聚合，避免读入全部到访。
+    """
+
+    if client is None:
+        client = SQLiteReadClient(config.db_path)
+    resolution_cache = None
+    if config.cache_dir is not None:
+        resolution_cache = LocationResolutionCache(resolution_cache_path(config.cache_dir, config.db_path))
+    profiles = LocationProfileStore(client) if location_profiles else None
+    repository = TimelineRepository(client, location_profiles=profiles)
+    return TimelineService(repository, resolution_cache=resolution_cache)
+
+
+def resolution_cache_path(cache_dir: Path, db_path: Path) -> Path:
+    """按数据库区分的解析缓存边车文件，多个数据库共用缓存目录时互不清空。"""
+
+    return db_cache_path(cache_dir, db_path, RESOLUTION_CACHE_FILENAME)
 
 
 def parse_query_date(date_expr: str, tz: tzinfo) -> date:
@@ -372,6 +880,44 @@ def parse_query_date(date_expr: str, tz: tzinfo) -> date:
     )
 
 
+def parse_date_range(start_expr: str | date, end_expr: str | date, tz: tzinfo) -> tuple[date, date]:
+    """解析起止日期（含两端）。"""
+
+    start_date = start_expr if isinstance(start_expr, date) else parse_query_date(start_expr, tz)
+    end_date = end_expr if isinstance(end_expr, date) else parse_query_date(end_expr, tz)
+    if end_date < start_date:
+        raise ValueError(
+            f"Invalid date range: {start_date.isoformat()} > {end_date.isoformat()}."
+        )
+    return start_date, end_date
+
+
+def date_range_bounds(start_date: date, end_date: date, tz: tzinfo) -> tuple[datetime, datetime]:
+    """日期范围转为时区内的左闭右开时间区间。"""
+
+    range_start = datetime.combine(start_date, time.min, tzinfo=tz)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=tz)
+    return range_start, range_end
+
+
+def _encode_history_cursor(arrival_core: float, visit_id: int) -> str:
+    """地点历史游标：到达时间（Core Data 秒）与主键。"""
+
+    return f"{arrival_core!r}:{visit_id}"
+
+
+def _decode_history_cursor(cursor: str) -> tuple[float, int]:
+    """解析地点历史游标。"""
+
+    arrival_text, separator, visit_text = cursor.strip().rpartition(":")
+    try:
+        if not separator:
+            raise ValueError
+        return float(arrival_text), int(visit_text)
+    except ValueError as exc:
+        raise ValueError(f"Invalid history cursor: {cursor}") from exc
+
+
 def _validate_output_mode(output: str) -> Literal["pretty", "json", "both"]:
     """校验输出模式。"""
 
@@ -381,20 +927,69 @@ def _validate_output_mode(output: str) -> Literal["pretty", "json", "both"]:
     return cast(Literal["pretty", "json", "both"], output)
 
 
-def _to_core_data_seconds(value: datetime) -> float:
+def validate_zone_mode(zone_mode: str) -> ZoneMode:
+    """校验时区模式。"""
+
+    if zone_mode not in ZONE_MODES:
+        raise ValueError(
+            f"Invalid zone mode: {zone_mode}. Allowed: {', '.join(ZONE_MODES)}."
+        )
+    return cast(ZoneMode, zone_mode)
+
+
+def to_core_data_seconds(value: datetime) -> float:
     """时区时间转 Core Data 秒。"""
 
     unix_seconds = value.astimezone(timezone.utc).timestamp()
     return unix_seconds - CORE_DATA_UNIX_EPOCH_OFFSET
 
 
-def _from_core_data_seconds(value: float, tz: tzinfo) -> datetime:
+def from_core_data_seconds(value: float, tz: tzinfo) -> datetime:
     """Core Data 秒转时区时间。"""
 
     unix_seconds = value + CORE_DATA_UNIX_EPOCH_OFFSET
     return datetime.fromtimestamp(unix_seconds, tz=timezone.utc).astimezone(tz)
 
 
+def _overlaps_local_day(start_at: datetime, end_at: datetime, local_day: date) -> bool:
+    """按事件所在时区的墙上时间判断是否与当地日期重叠。"""
+
+    local_day_start = datetime.combine(local_day, time.min)
+    local_day_end = local_day_start + timedelta(days=1)
+    return (
+        start_at.replace(tzinfo=None) < local_day_end
+        and end_at.replace(tzinfo=None) > local_day_start
+    )
+
+
+class _ZoneResolver:
+    """解析事件时区，同一次构建内每个时区标识只查一次缓存。"""
+
+    def __init__(self, tz: tzinfo, timezone_name: str, zone_mode: ZoneMode) -> None:
+        self._default = (tz, timezone_name)
+        self.zone_mode = zone_mode
+        self._enabled = zone_mode != "fixed"
+        self._resolved: dict[str, tuple[tzinfo, str] | None] = {}
+
+    def resolve(self, *candidates: object | None) -> tuple[tzinfo, str]:
+        """按候选顺序返回首个可识别的时区，否则回退查询时区。"""
+
+        if not self._enabled:
+            return self._default
+
+        for candidate in candidates:
+            zone_name = _normalize_text(candidate)
+            if zone_name is None:
+                continue
+            if zone_name not in self._resolved:
+                zone = get_cached_zone(zone_name)
+                self._resolved[zone_name] = (zone, zone_name) if zone is not None else None
+            resolved = self._resolved[zone_name]
+            if resolved is not None:
+                return resolved
+        return self._default
+
+
 def _normalize_text(value: object | None) -> str | None:
     """标准化文本字段。"""
 
@@ -429,36 +1024,159 @@ def _to_int(value: object | None) -> int | None:
 def _infer_transport_mode(transport_name: str, fallback_mode: TransportMode) -> TransportMode:
     """根据交通名称推断模式。"""
 
-    if _contains_any(transport_name, PUBLIC_TRANSIT_KEYWORDS):
-        return "public_transit"
-    if _contains_any(transport_name, FLIGHT_KEYWORDS):
-        return "flight"
-    if _contains_any(transport_name, BIKE_KEYWORDS):
-        return "bike"
-    if _contains_any(transport_name, RUN_KEYWORDS):
-        return "run"
-    if _contains_any(transport_name, WALK_KEYWORDS):
-        return "walk"
-    return fallback_mode
-
-
-def _contains_any(source: str, keywords: tuple[str, ...]) -> bool:
-    return any(keyword in source for keyword in keywords)
-
-
-def _distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """两点球面距离（米）。"""
-
-    radius_m = 6_371_000.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    hav = (
-        math.sin(dphi / 2) ** 2
-        + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
+    inferred = _transport_name_mode(transport_name)
+    return inferred if inferred is not None else fallback_mode
+
+
+@lru_cache(maxsize=TRANSPORT_MODE_CACHE_SIZE)
+def _transport_name_mode(transport_name: str) -> TransportMode | None:
+    return _TRANSPORT_MODE_MATCHER.match(transport_name)
+
+
+def _nearby_box(latitude: float, longitude: float) -> tuple[float, float, float, float]:
+    """阈值圆的正方形外包矩形（度），边长取经度方向跨度并留 1% 余量。"""
+
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    half_width = NEARBY_MATCH_RADIUS_M / METERS_PER_DEGREE_LATITUDE / cos_lat * 1.01
+    return (
+        latitude - half_width,
+        latitude + half_width,
+        longitude - half_width,
+        longitude + half_width,
+    )
+
+
+def _merge_boxes(
+    boxes: list[tuple[float, float, float, float]],
+) -> list[tuple[float, float, float, float]]:
+    """合并相交矩形以缩短查询条件；数量仍过多时退化为单个外包矩形。"""
+
+    merged: list[tuple[float, float, float, float]] = []
+    for min_lat, max_lat, min_lon, max_lon in sorted(boxes):
+        for index, (m_min_lat, m_max_lat, m_min_lon, m_max_lon) in enumerate(merged):
+            if min_lat <= m_max_lat and min_lon <= m_max_lon and max_lon >= m_min_lon:
+                merged[index] = (
+                    min(min_lat, m_min_lat),
+                    max(max_lat, m_max_lat),
+                    min(min_lon, m_min_lon),
+                    max(max_lon, m_max_lon),
+                )
+                break
+        else:
+            merged.append((min_lat, max_lat, min_lon, max_lon))
+    if len(merged) > NEARBY_PREFETCH_MAX_BOXES:
+        return [
+            (
+                min(box[0] for box in merged),
+                max(box[1] for box in merged),
+                min(box[2] for box in merged),
+                max(box[3] for box in merged),
+            )
+        ]
+    return merged
+
+
+def _build_nested_stops(
+    child_rows: list[dict[str, Any]],
+    zone: tzinfo,
+    parent_departure_at: datetime,
+) -> tuple[NestedStop, ...]:
+    """子行转嵌套事件：停留子段只有开始时间，结束取下一子段开始或父到访离开。"""
+
+    if not child_rows:
+        return ()
+
+    segment_starts = sorted(
+        float(row["start_core"]) for row in child_rows if row["kind"] == "segment"
+    )
+    stops: list[NestedStop] = []
+    for row in child_rows:
+        start_core = float(row["start_core"])
+        start_at = from_core_data_seconds(start_core, zone)
+        if row["kind"] == "segment":
+            next_index = bisect_right(segment_starts, start_core)
+            end_at = (
+                from_core_data_seconds(segment_starts[next_index], zone)
+                if next_index < len(segment_starts)
+                else parent_departure_at
+            )
+        elif row.get("end_core") is not None:
+            end_at = from_core_data_seconds(float(row["end_core"]), zone)
+        else:
+            end_at = parent_departure_at
+        stops.append(
+            NestedStop(
+                kind=cast(NestedStopKind, row["kind"]),
+                source_id=int(row["source_id"]),
+                location_name=_normalize_text(row.get("location_name")) or "未知地点",
+                start_at=start_at,
+                end_at=max(start_at, min(end_at, parent_departure_at)),
+            )
+        )
+    return tuple(stops)
+
+
+def _summarize_weather(rows: list[dict[str, Any]]) -> dict[int, VisitWeather]:
+    """小时天气行按到访汇总：开尔文转摄氏度，天气状况取出现最多者（并列取最早）。"""
+
+    grouped: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        if row.get("visit_id") is not None:
+            grouped[int(row["visit_id"])].append(row)
+
+    summaries: dict[int, VisitWeather] = {}
+    for visit_id, hours in grouped.items():
+        temperatures = [_kelvin_to_celsius(row.get("temperature_k")) for row in hours]
+        temperatures_c = [value for value in temperatures if value is not None]
+        apparent = [_kelvin_to_celsius(row.get("apparent_temperature_k")) for row in hours]
+        apparent_c = [value for value in apparent if value is not None]
+        humidity = [value for row in hours if (value := _to_float(row.get("humidity"))) is not None]
+        chances = [value for row in hours if (value := _to_float(row.get("precipitation_chance"))) is not None]
+
+        condition_counts: dict[str, int] = {}
+        symbol_by_condition: dict[str, str | None] = {}
+        for row in hours:
+            condition = _normalize_text(row.get("condition"))
+            if condition is None:
+                continue
+            condition_counts[condition] = condition_counts.get(condition, 0) + 1
+            symbol_by_condition.setdefault(condition, _normalize_text(row.get("symbol_name")))
+        condition = max(condition_counts, key=condition_counts.__getitem__) if condition_counts else None
+
+        summaries[visit_id] = VisitWeather(
+            hours=len(hours),
+            temperature_min_c=min(temperatures_c) if temperatures_c else None,
+            temperature_max_c=max(temperatures_c) if temperatures_c else None,
+            apparent_avg_c=round(sum(apparent_c) / len(apparent_c), 1) if apparent_c else None,
+            humidity_avg=round(sum(humidity) / len(humidity), 2) if humidity else None,
+            precipitation_mm=round(
+                sum(_to_float(row.get("precipitation_amount")) or 0.0 for row in hours),
+                1,
+            ),
+            precipitation_chance_max=max(chances) if chances else None,
+            condition=condition,
+            symbol_name=symbol_by_condition.get(condition) if condition else None,
+        )
+    return summaries
+
+
+def _kelvin_to_celsius(value: object) -> float | None:
+    kelvin = _to_float(value)
+    if kelvin is None:
+        return None
+    return round(kelvin - KELVIN_OFFSET, 1)
+
+
+def sort_events(events: list[TimelineEvent]) -> None:
+    """按起始时间混排，同刻到访优先。"""
+
+    events.sort(
+        key=lambda event: (
+            _event_start_at(event),
+            0 if event.event_type == "visit" else 1,
+            _event_stable_id(event),
+        )
     )
-    return 2 * radius_m * math.atan2(math.sqrt(hav), math.sqrt(1 - hav))
 
 
 def _event_start_at(event: TimelineEvent) -> datetime:
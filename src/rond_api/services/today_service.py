@@ -0,0 +1,200 @@
+"""今日时间线增量构建。"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, datetime, tzinfo
+from typing import Any, Literal
+
+from rond_api.domain.timeline_types import (
+    MovementEvent,
+    TimelineEvent,
+    TimelineResult,
+    VisitEvent,
+    ZoneMode,
+)
+from rond_api.repositories.location_profiles import OPEN_DEPARTURE_SENTINEL_CORE
+from rond_api.services.timeline_service import (
+    TimelineService,
+    day_fetch_window,
+    sort_events,
+    validate_zone_mode,
+)
+
+RefreshKind = Literal["full", "incremental"]
+
+
+class TodayTimelineBuilder:
+    """今日时间线的增量构建器，结果与 build_timeline 全量重建一致。
+
+    保留上次结果与高水位：窗口内到访/交通的版本串（自身及关联地点、活动、原始到访等行的 Z_OPT）、
+    原始到访最大主键，以及地点/活动/标签/交通工具表指纹。刷新时只读版本串，仅对新增或版本变化的行
+    取明细并重建事件，在上次的事件表上原地替换；跨日或指纹变化时退化为全量构建。
+    停留中事件只按主键查看新增的原始到访，不再排序整个 ZRAWVISIT；假定已结束的原始到访不会被重新打开。
+    """
+
+    def __init__(
+        self,
+        service: TimelineService,
+        tz: tzinfo,
+        timezone_name: str,
+        zone_mode: ZoneMode = "fixed",
+    ) -> None:
+        validate_zone_mode(zone_mode)
+        self._service = service
+        self._repository = service.repository
+        self._tz = tz
+        self._timezone_name = timezone_name
+        self._zone_mode = zone_mode
+        self._query_date: date | None = None
+        self._fingerprint: str | None = None
+        self._visit_versions: dict[int, str] = {}
+        self._movement_versions: dict[int, str] = {}
+        self._visit_events: dict[int, VisitEvent] = {}
+        self._movement_events: dict[int, MovementEvent] = {}
+        self._max_raw_id = 0
+        self._raw_open: dict[str, Any] | None = None
+        self._ongoing: VisitEvent | None = None
+        self.last_refresh: RefreshKind | None = None
+        self.last_fetched: tuple[int, int] = (0, 0)
+
+    def refresh(self) -> TimelineResult:
+        """刷新今日时间线。"""
+
+        query_date = datetime.now(self._tz).date()
+        fetch_start_core, fetch_end_core, day_end_core = day_fetch_window(query_date, self._tz, self._zone_mode)
+        fingerprint = self._repository.fetch_reference_fingerprint()
+        visit_versions = {
+            int(row["visit_id"]): str(row["version"])
+            for row in self._repository.fetch_visit_versions(fetch_start_core, fetch_end_core)
+        }
+        movement_versions = {
+            int(row["movement_id"]): str(row["version"])
+            for row in self._repository.fetch_movement_versions(fetch_start_core, fetch_end_core)
+        }
+
+        full = query_date != self._query_date or fingerprint != self._fingerprint
+        if full:
+            self._visit_events.clear()
+            self._movement_events.clear()
+            changed_visit_ids = list(visit_versions)
+            changed_movement_ids = list(movement_versions)
+        else:
+            changed_visit_ids = _changed_ids(self._visit_versions, visit_versions)
+            changed_movement_ids = _changed_ids(self._movement_versions, movement_versions)
+            for visit_id in set(self._visit_versions) - set(visit_versions):
+                self._visit_events.pop(visit_id, None)
+            for movement_id in set(self._movement_versions) - set(movement_versions):
+                self._movement_events.pop(movement_id, None)
+
+        patched = bool(changed_visit_ids or changed_movement_ids)
+        patched = patched or self._visit_versions.keys() != visit_versions.keys()
+        patched = patched or self._movement_versions.keys() != movement_versions.keys()
+        if changed_visit_ids or changed_movement_ids:
+            self._patch_events(query_date, changed_visit_ids, changed_movement_ids)
+        self._query_date = query_date
+        self._fingerprint = fingerprint
+        self._visit_versions = visit_versions
+        self._movement_versions = movement_versions
+        self.last_refresh = "full" if full else "incremental"
+        self.last_fetched = (len(changed_visit_ids), len(changed_movement_ids))
+
+        events: list[TimelineEvent] = [*self._visit_events.values(), *self._movement_events.values()]
+        raw_open = self._refresh_raw_open(day_end_core, full)
+        if full or patched or raw_open != self._raw_open:
+            self._ongoing = self._service.build_ongoing_stay_event(
+                raw_open,
+                events=events,
+                tz=self._tz,
+                timezone_name=self._timezone_name,
+                zone_mode=self._zone_mode,
+            )
+        elif self._ongoing is not None:
+            now_at = max(datetime.now(self._ongoing.arrival_at.tzinfo), self._ongoing.arrival_at)
+            self._ongoing = replace(
+                self._ongoing,
+                departure_at=now_at,
+                is_cross_day=self._ongoing.arrival_at.date() != now_at.date(),
+            )
+        self._raw_open = raw_open
+        if self._ongoing is not None:
+            events.append(self._ongoing)
+
+        sort_events(events)
+        return TimelineResult(
+            query_date=query_date,
+            timezone=self._timezone_name,
+            events=events,
+            zone_mode=self._zone_mode,
+        )
+
+    def _patch_events(self, query_date: date, visit_ids: list[int], movement_ids: list[int]) -> None:
+        """取变化行明细并替换对应事件；traveller 模式下不再属于当日的行会被移除。"""
+
+        events = self._service.build_day_events(
+            self._repository.fetch_visits_by_ids(visit_ids),
+            self._repository.fetch_movements_by_ids(movement_ids),
+            query_date=query_date,
+            tz=self._tz,
+            timezone_name=self._timezone_name,
+            zone_mode=self._zone_mode,
+        )
+        for visit_id in visit_ids:
+            self._visit_events.pop(visit_id, None)
+        for movement_id in movement_ids:
+            self._movement_events.pop(movement_id, None)
+        for event in events:
+            if isinstance(event, VisitEvent):
+                self._visit_events[event.visit_id] = event
+            else:
+                self._movement_events[event.movement_id] = event
+
+    def _refresh_raw_open(self, day_end_core: float, full: bool) -> dict[str, Any] | None:
+        """更新最新的未结束原始到访：只按主键读取新增行与上次的未结束行。"""
+
+        if full:
+            self._max_raw_id = self._repository.fetch_max_raw_visit_id()
+            return self._repository.fetch_latest_open_raw_visit(day_end_core)
+
+        open_id = int(self._raw_open["raw_id"]) if self._raw_open is not None else None
+        rows = self._repository.fetch_raw_visits_after(self._max_raw_id, open_id)
+        candidates: list[dict[str, Any]] = []
+        if self._raw_open is not None:
+            current = next((row for row in rows if int(row["raw_id"]) == open_id), None)
+            if (
+                current is None
+                or not _is_open_before(current, day_end_core)
+                or current["arrival_core"] != self._raw_open["arrival_core"]
+            ):
+                # 上次的未结束行已结束或被改动，较早的未结束行可能重新成为最新，回退全量查询。
+                self._max_raw_id = max([self._max_raw_id, *(int(row["raw_id"]) for row in rows)])
+                return self._repository.fetch_latest_open_raw_visit(day_end_core)
+            candidates.append(current)
+
+        for row in rows:
+            raw_id = int(row["raw_id"])
+            if raw_id > self._max_raw_id and _is_open_before(row, day_end_core):
+                candidates.append(row)
+            self._max_raw_id = max(self._max_raw_id, raw_id)
+        if not candidates:
+            return None
+        return max(candidates, key=lambda row: (float(row["arrival_core"]), int(row["raw_id"])))
+
+
+def _changed_ids(previous: dict[int, str], current: dict[int, str]) -> list[int]:
+    """新增或版本串变化的主键。"""
+
+    return [row_id for row_id, version in current.items() if previous.get(row_id) != version]
+
+
+def _is_open_before(row: dict[str, Any], day_end_core: float) -> bool:
+    """原始到访是否未结束且在当日结束前到达（与全量查询条件一致）。"""
+
+    arrival_core = row.get("arrival_core")
+    departure_core = row.get("departure_core")
+    return (
+        arrival_core is not None
+        and float(arrival_core) < day_end_core
+        and departure_core is not None
+        and float(departure_core) > OPEN_DEPARTURE_SENTINEL_CORE
+    )
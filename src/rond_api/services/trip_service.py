@@ -0,0 +1,226 @@
+"""行程时间线服务。"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Iterable
+
+from rond_api.config import get_cached_zone
+from rond_api.domain.timeline_types import TimelineEvent, VisitEvent, ZoneMode
+from rond_api.domain.trip_types import TripDay, TripSummary, TripTimeline
+from rond_api.services.timeline_service import (
+    TimelineService,
+    date_range_bounds,
+    from_core_data_seconds,
+)
+
+TripSectionKey = tuple[str, int, int, float, float, str, str]
+
+
+class TripSectionCache:
+    """已结束行程的分日结果缓存（进程内 LRU）。
+
+    行程结束后分日结果视为不可变；键包含数据库路径、行程版本号（Z_OPT）、
+    时间窗口、时区与时区模式，行程本身被编辑时自然失效。
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0.")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[TripSectionKey, tuple[TripDay, ...]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: TripSectionKey) -> tuple[TripDay, ...] | None:
+        """命中返回分日结果，未命中返回 None。"""
+
+        days = self._entries.get(key)
+        if days is not None:
+            self._entries.move_to_end(key)
+        return days
+
+    def put(self, key: TripSectionKey, days: tuple[TripDay, ...]) -> None:
+        """写入分日结果并按 LRU 淘汰。"""
+
+        self._entries[key] = days
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_ENDED_TRIP_SECTIONS = TripSectionCache()
+
+
+def ended_trip_sections_cache() -> TripSectionCache:
+    """进程内共享的已结束行程分日缓存。"""
+
+    return _ENDED_TRIP_SECTIONS
+
+
+def build_trip_timeline(
+    service: TimelineService,
+    trip_row: dict[str, Any],
+    tz: tzinfo,
+    timezone_name: str,
+    zone_mode: ZoneMode = "fixed",
+    cache: TripSectionCache | None = None,
+    cache_scope: str = "",
+    now: datetime | None = None,
+) -> TripTimeline:
+    """一次窗口读取整个行程，再按本地日期切分并汇总。
+
+    行程记录了时区时以行程时区划分日期，否则使用查询时区；行程无结束时间时视为进行中。
+    """
+
+    if trip_row.get("start_core") is None:
+        raise ValueError(f"Trip {trip_row.get('trip_id')} has no start date.")
+
+    trip_id = int(trip_row["trip_id"])
+    trip_zone_name = str(trip_row.get("timezone") or "").strip()
+    trip_zone = get_cached_zone(trip_zone_name)
+    if trip_zone is None:
+        trip_zone, trip_zone_name = tz, timezone_name
+
+    current = now or datetime.now(trip_zone)
+    start_core = float(trip_row["start_core"])
+    start_at = from_core_data_seconds(start_core, trip_zone)
+    end_core = trip_row.get("end_core")
+    is_ended = end_core is not None
+    end_at = from_core_data_seconds(float(end_core), trip_zone) if is_ended else current
+    is_ended = is_ended and end_at <= current
+    if end_at < start_at:
+        raise ValueError(f"Trip {trip_id} ends before it starts.")
+
+    first_day = start_at.date()
+    # 恰好结束于零点时，最后一天不再包含该零点所在日期。
+    last_day = max(first_day, (end_at - timedelta(microseconds=1)).date())
+
+    key: TripSectionKey = (
+        cache_scope,
+        trip_id,
+        int(trip_row.get("trip_version") or 0),
+        start_core,
+        float(end_core) if end_core is not None else 0.0,
+        trip_zone_name,
+        zone_mode,
+    )
+    days = cache.get(key) if cache is not None and is_ended else None
+    if days is None:
+        range_start, range_end = date_range_bounds(first_day, last_day, trip_zone)
+        events = service.build_range_events(
+            range_start=range_start,
+            range_end=range_end,
+            tz=trip_zone,
+            timezone_name=trip_zone_name,
+            zone_mode=zone_mode,
+        )
+        days = _split_trip_days(events, first_day, last_day, trip_zone)
+        if cache is not None and is_ended:
+            cache.put(key, days)
+
+    return TripTimeline(
+        trip_id=trip_id,
+        title=_optional_text(trip_row.get("title")),
+        note=_optional_text(trip_row.get("note")),
+        timezone=trip_zone_name,
+        zone_mode=zone_mode,
+        start_at=start_at,
+        end_at=end_at,
+        is_ended=is_ended,
+        days=list(days),
+        summary=_summarize_events(
+            _unique_events(days),
+            *date_range_bounds(first_day, last_day, trip_zone),
+        ),
+    )
+
+
+def get_trip_timeline(
+    trip_id: int,
+    db_path: str | None = None,
+    zone_mode: ZoneMode = "fixed",
+) -> TripTimeline:
+    """获取行程时间线：分日事件与每日、整体汇总。"""
+
+    from rond_api.session import RondSession
+
+    with RondSession(db_path=db_path, location_profiles=False) as session:
+        return session.trip(trip_id, zone_mode=zone_mode)
+
+
+def _split_trip_days(
+    events: list[TimelineEvent],
+    first_day: date,
+    last_day: date,
+    tz: tzinfo,
+) -> tuple[TripDay, ...]:
+    """按本地日期切分事件，跨天事件归入每个重叠的日期。"""
+
+    days: list[TripDay] = []
+    day = first_day
+    while day <= last_day:
+        day_start, day_end = date_range_bounds(day, day, tz)
+        day_events = tuple(
+            event for event in events if event.start_at < day_end and event.end_at > day_start
+        )
+        days.append(
+            TripDay(
+                day=day,
+                events=day_events,
+                summary=_summarize_events(day_events, day_start, day_end),
+            )
+        )
+        day += timedelta(days=1)
+    return tuple(days)
+
+
+def _summarize_events(
+    events: Iterable[TimelineEvent],
+    window_start: datetime,
+    window_end: datetime,
+) -> TripSummary:
+    """汇总窗口内的停留、交通时长与去过的地点（按首次出现顺序）。"""
+
+    dwell_seconds = 0.0
+    transport_seconds = 0.0
+    visit_count = 0
+    movement_count = 0
+    places: dict[str, None] = {}
+    for event in events:
+        seconds = max(
+            0.0,
+            (min(event.end_at, window_end) - max(event.start_at, window_start)).total_seconds(),
+        )
+        if isinstance(event, VisitEvent):
+            dwell_seconds += seconds
+            visit_count += 1
+            places.setdefault(event.location_name, None)
+        else:
+            transport_seconds += seconds
+            movement_count += 1
+    return TripSummary(
+        dwell_minutes=round(dwell_seconds / 60, 1),
+        transport_minutes=round(transport_seconds / 60, 1),
+        visit_count=visit_count,
+        movement_count=movement_count,
+        places=tuple(places),
+    )
+
+
+def _unique_events(days: Iterable[TripDay]) -> list[TimelineEvent]:
+    """分日事件去重（跨天事件只计一次）。"""
+
+    unique: dict[tuple[str, int], TimelineEvent] = {}
+    for day in days:
+        for event in day.events:
+            event_id = event.visit_id if isinstance(event, VisitEvent) else event.movement_id
+            unique.setdefault((event.event_type, event_id), event)
+    return list(unique.values())
+
+
+def _optional_text(value: object) -> str | None:
+    text = str(value).strip() if value is not None else ""
+    return text or None
@@ -0,0 +1,147 @@
+"""时间线监视服务。"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from datetime import date, datetime
+from typing import Callable, Iterator
+
+from rond_api.config import load_app_config
+from rond_api.db.change_watcher import DatabaseChangeWatcher
+from rond_api.defaults import WATCH_DEFAULT_INTERVAL_SECONDS
+from rond_api.domain.timeline_types import (
+    EventKey,
+    TimelineEvent,
+    TimelineResult,
+    TimelineUpdate,
+    VisitEvent,
+    ZoneMode,
+)
+from rond_api.services.timeline_service import (
+    build_timeline_service,
+    parse_query_date,
+    validate_zone_mode,
+)
+from rond_api.services.today_service import TodayTimelineBuilder
+
+
+def watch_timeline(
+    date_expr: str = "today",
+    db_path: str | None = None,
+    zone_mode: ZoneMode = "fixed",
+    interval_seconds: float = WATCH_DEFAULT_INTERVAL_SECONDS,
+    weather: bool = False,
+    expand_stays: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+    max_updates: int | None = None,
+) -> Iterator[TimelineUpdate]:
+    """持续输出时间线更新。
+
+    首次输出完整时间线；之后每个间隔只做一次变更检测，数据库变化（或 today 跨日）时才重建，
+    并只输出新增/变化/移除的事件；未变化时仅在本地推进停留中事件的时长。
+    """
+
+    validate_zone_mode(zone_mode)
+    if interval_seconds <= 0:
+        raise ValueError("interval_seconds must be > 0.")
+
+    config = load_app_config(db_path=db_path)
+    service = build_timeline_service(config, location_profiles=True)
+    # 监视今日且不需要天气/嵌套停留时，走增量构建，只重取版本变化的行。
+    today_builder = (
+        TodayTimelineBuilder(service, tz=config.timezone, timezone_name=config.timezone_name, zone_mode=zone_mode)
+        if date_expr.strip().lower() == "today" and not weather and not expand_stays
+        else None
+    )
+
+    def build(query_date_value: date) -> TimelineResult:
+        if today_builder is not None:
+            return today_builder.refresh()
+        return service.build_timeline(
+            query_date=query_date_value,
+            tz=config.timezone,
+            timezone_name=config.timezone_name,
+            zone_mode=zone_mode,
+            weather=weather,
+            expand_stays=expand_stays,
+        )
+
+    emitted = 0
+    with DatabaseChangeWatcher(config.db_path) as watcher:
+        # 先记录基线再构建，构建期间发生的写入会在下一轮被发现。
+        watcher.has_changed()
+        query_date = parse_query_date(date_expr, config.timezone)
+        timeline = build(query_date)
+        yield TimelineUpdate(timeline=timeline, changed=list(timeline.events), removed=[], rebuilt=True)
+        emitted += 1
+
+        while max_updates is None or emitted < max_updates:
+            sleep(interval_seconds)
+            next_date = parse_query_date(date_expr, config.timezone)
+            if watcher.has_changed() or next_date != query_date:
+                previous = timeline
+                query_date = next_date
+                timeline = build(query_date)
+                if query_date != previous.query_date:
+                    update = TimelineUpdate(
+                        timeline=timeline,
+                        changed=list(timeline.events),
+                        removed=[],
+                        rebuilt=True,
+                    )
+                else:
+                    changed, removed = diff_events(previous.events, timeline.events)
+                    update = TimelineUpdate(timeline=timeline, changed=changed, removed=removed, rebuilt=True)
+            else:
+                timeline, changed = advance_ongoing(timeline)
+                update = TimelineUpdate(timeline=timeline, changed=changed, removed=[], rebuilt=False)
+
+            if update.changed or update.removed:
+                yield update
+                emitted += 1
+
+
+def event_key(event: TimelineEvent) -> EventKey:
+    """事件标识。"""
+
+    if isinstance(event, VisitEvent):
+        return event.event_type, event.visit_id
+    return event.event_type, event.movement_id
+
+
+def diff_events(
+    previous: list[TimelineEvent],
+    current: list[TimelineEvent],
+) -> tuple[list[TimelineEvent], list[EventKey]]:
+    """对比两次结果：返回新增或内容变化的事件（按时间顺序）与消失的事件标识。"""
+
+    previous_by_key = {event_key(event): event for event in previous}
+    current_keys = {event_key(event) for event in current}
+    changed = [event for event in current if previous_by_key.get(event_key(event)) != event]
+    removed = [key for key in previous_by_key if key not in current_keys]
+    return changed, removed
+
+
+def advance_ongoing(
+    timeline: TimelineResult,
+    now: datetime | None = None,
+) -> tuple[TimelineResult, list[TimelineEvent]]:
+    """不访问数据库，把停留中事件的离开时间推进到当前时刻。"""
+
+    changed: list[TimelineEvent] = []
+    events: list[TimelineEvent] = []
+    for event in timeline.events:
+        if isinstance(event, VisitEvent) and event.is_ongoing:
+            current = (now or datetime.now(event.arrival_at.tzinfo)).astimezone(event.arrival_at.tzinfo)
+            if current > event.departure_at:
+                event = replace(
+                    event,
+                    departure_at=current,
+                    is_cross_day=event.arrival_at.date() != current.date(),
+                )
+                changed.append(event)
+        events.append(event)
+    if not changed:
+        return timeline, []
+    return replace(timeline, events=events), changed
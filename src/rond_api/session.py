@@ -0,0 +1,311 @@
+"""可复用的查询会话。"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Sequence
+
+from rond_api.config import AppConfig, load_app_config
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.timeline_types import TimelineEvent, TimelineResult, ZoneMode
+from rond_api.services.timeline_service import (
+    HISTORY_DEFAULT_LIMIT,
+    TimelineService,
+    build_timeline_service,
+    date_range_bounds,
+    parse_date_range,
+    parse_query_date,
+    validate_zone_mode,
+)
+
+if TYPE_CHECKING:
+    from rond_api.cache.search_index import SearchIndex
+    from rond_api.domain.gap_types import GapReport
+    from rond_api.domain.history_types import LocationHistoryPage
+    from rond_api.domain.locate_types import LocateResult
+    from rond_api.domain.occupancy_types import OccupancyMatrix
+    from rond_api.domain.ranking_types import RankingResult
+    from rond_api.domain.search_types import SearchResult
+    from rond_api.domain.stats_types import StatsTable
+    from rond_api.domain.trip_types import TripTimeline
+    from rond_api.repositories.stats_repository import (
+        RankingDimension,
+        RankingMetric,
+        StatsGroupBy,
+        StatsPeriod,
+        StatsRepository,
+    )
+
+# 时间线以外的服务在对应方法中按需导入，单独查询时间线时不加载检索、统计等模块。
+
+
+class RondSession:
+    """一次加载配置、复用客户端与服务的查询会话。
+
+    构造时只加载一次 .env、校验数据库路径并解析时区；会话内共享同一个只读客户端、时间线服务
+    （地点画像与解析缓存随之复用）、统计仓储与检索索引，适合在循环中反复查询。
+    只查询一次时传 location_profiles=False，跳过地点画像的内存物化。
+    会话本身不是线程安全的，跨线程请各自创建；pool_size 大于 0 时底层客户端改用线程安全连接池，
+    可供统计等无状态查询并发使用。用完调用 close() 或使用 with 语句释放连接。
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        timezone_name: str | None = None,
+        config: AppConfig | None = None,
+        pool_size: int = 0,
+        location_profiles: bool = True,
+    ) -> None:
+        self.config = config if config is not None else load_app_config(db_path=db_path, timezone_name=timezone_name)
+        self._client = SQLiteReadClient(self.config.db_path, pool_size=pool_size)
+        self._location_profiles = location_profiles
+        self._service: TimelineService | None = None
+        self._stats_repository: StatsRepository | None = None
+        self._search_index: SearchIndex | None = None
+        self._closed = False
+
+    def __enter__(self) -> RondSession:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """释放检索索引与连接池；可重复调用。"""
+
+        if self._search_index is not None:
+            self._search_index.close()
+            self._search_index = None
+        self._client.close()
+        self._closed = True
+
+    @property
+    def service(self) -> TimelineService:
+        """会话共享的时间线服务。"""
+
+        self._ensure_open()
+        if self._service is None:
+            self._service = build_timeline_service(
+                self.config,
+                client=self._client,
+                location_profiles=self._location_profiles,
+            )
+        return self._service
+
+    @property
+    def stats_repository(self) -> StatsRepository:
+        """会话共享的统计仓储。"""
+
+        self._ensure_open()
+        if self._stats_repository is None:
+            from rond_api.repositories.stats_repository import StatsRepository
+
+            self._stats_repository = StatsRepository(self._client)
+        return self._stats_repository
+
+    def timeline(
+        self,
+        date_expr: str | date = "today",
+        zone_mode: ZoneMode = "fixed",
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> TimelineResult:
+        """获取指定日期时间线。"""
+
+        validate_zone_mode(zone_mode)
+        if not isinstance(weather, bool):
+            raise ValueError("weather must be bool.")
+        if not isinstance(expand_stays, bool):
+            raise ValueError("expand_stays must be bool.")
+        query_date = date_expr if isinstance(date_expr, date) else parse_query_date(date_expr, self.config.timezone)
+        return self.service.build_timeline(
+            query_date=query_date,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            zone_mode=zone_mode,
+            weather=weather,
+            expand_stays=expand_stays,
+        )
+
+    def timeline_range(
+        self,
+        start: str | date,
+        end: str | date | None = None,
+        zone_mode: ZoneMode = "fixed",
+        weather: bool = False,
+        expand_stays: bool = False,
+    ) -> list[TimelineEvent]:
+        """获取与日期区间（含首尾）重叠的全部事件。"""
+
+        start_date, end_date = parse_date_range(start, end if end is not None else start, self.config.timezone)
+        range_start, range_end = date_range_bounds(start_date, end_date, self.config.timezone)
+        return self.service.build_range_events(
+            range_start=range_start,
+            range_end=range_end,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            zone_mode=zone_mode,
+            weather=weather,
+            expand_stays=expand_stays,
+        )
+
+    def gaps(self, start: str | date, end: str | date | None = None, min_minutes: int = 30) -> GapReport:
+        """查找区间内未被到访或交通覆盖的时段。"""
+
+        from rond_api.services.gap_service import build_gap_report
+
+        start_date, end_date = parse_date_range(start, end if end is not None else start, self.config.timezone)
+        return build_gap_report(
+            self.service,
+            start_date=start_date,
+            end_date=end_date,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            min_minutes=min_minutes,
+        )
+
+    def stats(
+        self,
+        start: str | date,
+        end: str | date | None = None,
+        group_by: StatsGroupBy = "category",
+        period: StatsPeriod = "total",
+    ) -> StatsTable:
+        """获取区间时长统计。"""
+
+        from rond_api.services.stats_service import build_stats
+
+        start_date, end_date = parse_date_range(start, end if end is not None else start, self.config.timezone)
+        return build_stats(
+            self.stats_repository,
+            start_date=start_date,
+            end_date=end_date,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            group_by=group_by,
+            period=period,
+        )
+
+    def top(
+        self,
+        start: str | date,
+        end: str | date | None = None,
+        dimension: RankingDimension = "place",
+        metric: RankingMetric = "dwell",
+        limit: int = 10,
+        push_down: bool = False,
+    ) -> RankingResult:
+        """获取区间内地点、分类、路线或交通方式的前 N 排行。"""
+
+        from rond_api.services.ranking_service import build_ranking, build_ranking_sql
+
+        start_date, end_date = parse_date_range(start, end if end is not None else start, self.config.timezone)
+        if push_down:
+            return build_ranking_sql(
+                self.stats_repository,
+                start_date=start_date,
+                end_date=end_date,
+                tz=self.config.timezone,
+                timezone_name=self.config.timezone_name,
+                dimension=dimension,
+                metric=metric,
+                limit=limit,
+            )
+        return build_ranking(
+            self.service,
+            start_date=start_date,
+            end_date=end_date,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            dimension=dimension,
+            metric=metric,
+            limit=limit,
+        )
+
+    def search(self, query: str, limit: int = 20) -> SearchResult:
+        """全文检索；索引在会话内保持打开，之后的检索只做增量同步。"""
+
+        from rond_api.cache.search_index import SearchIndex
+        from rond_api.repositories.search_repository import SearchSourceRepository
+        from rond_api.services.search_service import refresh_search_index, run_search, search_index_path
+
+        self._ensure_open()
+        if self._search_index is None:
+            self._search_index = SearchIndex(search_index_path(self.config))
+        refresh_search_index(self._search_index, SearchSourceRepository(self._client))
+        return run_search(
+            self._search_index,
+            query,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            limit=limit,
+        )
+
+    def locate(self, timestamps: Sequence[datetime], zone_mode: ZoneMode = "fixed") -> list[LocateResult]:
+        """获取每个时间点所在的到访、交通或空档。"""
+
+        from rond_api.services.locate_service import locate_timestamps
+
+        return locate_timestamps(
+            self.service,
+            timestamps,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            zone_mode=zone_mode,
+        )
+
+    def location_history(
+        self,
+        location_id: int,
+        before: str | None = None,
+        limit: int = HISTORY_DEFAULT_LIMIT,
+        zone_mode: ZoneMode = "fixed",
+    ) -> LocationHistoryPage:
+        """获取某地点的到访历史，before 传入上一页的 next_cursor 继续翻页。"""
+
+        return self.service.build_location_history(
+            location_id=location_id,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            before=before,
+            limit=limit,
+            zone_mode=zone_mode,
+        )
+
+    def trip(self, trip_id: int, zone_mode: ZoneMode = "fixed") -> TripTimeline:
+        """获取行程时间线：分日事件与每日、整体汇总。"""
+
+        from rond_api.services.trip_service import build_trip_timeline, ended_trip_sections_cache
+
+        trip_row = self.service.repository.fetch_trip(trip_id)
+        if trip_row is None:
+            raise ValueError(f"Trip not found: {trip_id}.")
+        return build_trip_timeline(
+            self.service,
+            trip_row,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            zone_mode=zone_mode,
+            cache=ended_trip_sections_cache(),
+            cache_scope=str(self.config.db_path),
+        )
+
+    def occupancy(self, start: str | date, end: str | date | None = None, bin_minutes: int = 60) -> OccupancyMatrix:
+        """获取区间内按分类的时段占用矩阵。"""
+
+        from rond_api.services.occupancy_service import build_occupancy
+
+        start_date, end_date = parse_date_range(start, end if end is not None else start, self.config.timezone)
+        return build_occupancy(
+            self.timeline_range(start_date, end_date),
+            start_date=start_date,
+            end_date=end_date,
+            tz=self.config.timezone,
+            timezone_name=self.config.timezone_name,
+            bin_minutes=bin_minutes,
+        )
+
+    def _ensure_open(self) -> None:
+        if self._closed:
+            raise ValueError("RondSession is closed.")
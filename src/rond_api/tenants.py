@@ -0,0 +1,317 @@
+"""多数据库（租户）注册表。"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from rond_api.config import AppConfig, ConfigError, resolve_timezone
+from rond_api.db.change_watcher import DatabaseChangeWatcher
+from rond_api.defaults import TENANT_DEFAULT_MAX_OPEN
+from rond_api.repositories.stats_repository import StatsRepository
+from rond_api.services.timeline_service import TimelineService
+from rond_api.session import RondSession
+
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+TENANT_DEFAULT_IDLE_SECONDS = 600.0
+TENANT_DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+# 单个缓存条目（地点画像贡献或解析结果）的粗略内存占用。
+CACHE_ENTRY_BYTES_ESTIMATE = 256
+
+
+class TenantNotFoundError(ConfigError):
+    """未登记的租户。"""
+
+
+@dataclass(frozen=True, slots=True)
+class TenantSpec:
+    """租户登记信息：数据库路径、时区、可选缓存目录与内存预算（None 时用注册表默认值）。"""
+
+    tenant_id: str
+    db_path: Path
+    timezone_name: str | None = None
+    cache_dir: Path | None = None
+    memory_budget_bytes: int | None = None
+
+
+class TenantRuntime:
+    """已打开租户的运行时资源：时间线服务、统计仓储与变更检测连接。
+
+    时间线服务带有内存缓存且非线程安全，调用方需在 lock 内使用；统计仓储共享线程安全的只读客户端，可并发使用。
+    """
+
+    def __init__(
+        self,
+        spec: TenantSpec,
+        config: AppConfig,
+        pool_size: int = 0,
+        memory_budget_bytes: int = TENANT_DEFAULT_MEMORY_BUDGET_BYTES,
+    ) -> None:
+        self.spec = spec
+        self.config = config
+        self.memory_budget_bytes = memory_budget_bytes
+        self.lock = threading.Lock()
+        self.session = RondSession(config=config, pool_size=pool_size)
+        self.service: TimelineService = self.session.service
+        self.stats_repository: StatsRepository = self.session.stats_repository
+        self.watcher = DatabaseChangeWatcher(config.db_path)
+        self.last_used = 0.0
+        self.leases = 0
+        self.evicted = False
+
+    def estimated_bytes(self) -> int:
+        """按缓存条目数估算内存占用。"""
+
+        return self.service.cached_entry_count() * CACHE_ENTRY_BYTES_ESTIMATE
+
+    def trim_to_budget(self) -> bool:
+        """估算内存超出本租户预算时只收缩自身缓存，返回是否做了收缩。"""
+
+        if self.estimated_bytes() <= self.memory_budget_bytes:
+            return False
+        with self.lock:
+            self.service.trim_caches(self.memory_budget_bytes // CACHE_ENTRY_BYTES_ESTIMATE)
+        return True
+
+    def close(self) -> None:
+        """释放持有的连接。"""
+
+        self.watcher.close()
+        self.session.close()
+
+
+class TenantRegistry:
+    """租户 id 到数据库的注册表，按需打开并按 LRU 淘汰空闲租户。
+
+    每个租户有自己的内存预算（登记信息中的 memory_budget_bytes，默认 tenant_memory_budget_bytes），
+    超出时只收缩该租户自己的缓存，不影响其他租户。打开的租户数超过 max_open、全部租户的估算内存
+    超过可选的总上限 memory_budget_bytes 或空闲超过 idle_seconds 时，从最久未用的租户开始关闭连接
+    并丢弃缓存；正在使用（持有租约）的租户不会被关闭，被淘汰时延迟到租约归还后再关闭。
+    pool_size 大于 0 时每个租户的只读连接复用并限制在该数量以内。
+    """
+
+    def __init__(
+        self,
+        specs: Iterable[TenantSpec],
+        max_open: int = TENANT_DEFAULT_MAX_OPEN,
+        idle_seconds: float = TENANT_DEFAULT_IDLE_SECONDS,
+        tenant_memory_budget_bytes: int = TENANT_DEFAULT_MEMORY_BUDGET_BYTES,
+        memory_budget_bytes: int | None = None,
+        default_tenant: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        pool_size: int = 0,
+    ) -> None:
+        if max_open < 1:
+            raise ValueError("max_open must be >= 1.")
+        if idle_seconds <= 0:
+            raise ValueError("idle_seconds must be > 0.")
+        if pool_size < 0:
+            raise ValueError("pool_size must be >= 0.")
+        if tenant_memory_budget_bytes <= 0:
+            raise ValueError("tenant_memory_budget_bytes must be > 0.")
+        if memory_budget_bytes is not None and memory_budget_bytes <= 0:
+            raise ValueError("memory_budget_bytes must be > 0.")
+        self._specs: dict[str, TenantSpec] = {}
+        for spec in specs:
+            if not TENANT_ID_PATTERN.fullmatch(spec.tenant_id):
+                raise ConfigError(f"Invalid tenant id: {spec.tenant_id!r}. Use 1-64 letters, digits, '_' or '-'.")
+            if spec.tenant_id in self._specs:
+                raise ConfigError(f"Duplicate tenant id: {spec.tenant_id}")
+            if spec.memory_budget_bytes is not None and spec.memory_budget_bytes <= 0:
+                raise ConfigError(f"Tenant {spec.tenant_id} memory_budget_bytes must be > 0.")
+            # 提前校验时区，避免首个请求才报错。
+            resolve_timezone(spec.timezone_name)
+            self._specs[spec.tenant_id] = spec
+        if default_tenant is not None and default_tenant not in self._specs:
+            raise TenantNotFoundError(f"Unknown tenant: {default_tenant}")
+        self.default_tenant = default_tenant
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self.tenant_memory_budget_bytes = tenant_memory_budget_bytes
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pool_size = pool_size
+        self._clock = clock
+        self._open: OrderedDict[str, TenantRuntime] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path | str, **kwargs: Any) -> TenantRegistry:
+        """从 JSON 文件加载：{"tenant_id": {"db_path": ..., "timezone": ..., "cache_dir": ...}}。
+
+        条目可选 memory_budget_bytes，覆盖该租户的内存预算。
+        """
+
+        file_path = Path(path).expanduser()
+        try:
+            payload = json.loads(file_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise ConfigError(f"Unable to read tenants file {file_path}: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise ConfigError("Tenants file must be a JSON object keyed by tenant id.")
+
+        specs: list[TenantSpec] = []
+        for tenant_id, entry in payload.items():
+            if not isinstance(entry, dict) or not entry.get("db_path"):
+                raise ConfigError(f"Tenant {tenant_id} requires db_path.")
+            base = file_path.parent
+            cache_dir = entry.get("cache_dir")
+            memory_budget = entry.get("memory_budget_bytes")
+            if memory_budget is not None and (isinstance(memory_budget, bool) or not isinstance(memory_budget, int)):
+                raise ConfigError(f"Tenant {tenant_id} memory_budget_bytes must be an integer.")
+            specs.append(
+                TenantSpec(
+                    tenant_id=str(tenant_id),
+                    db_path=(base / str(entry["db_path"])).expanduser().resolve(),
+                    timezone_name=entry.get("timezone") or None,
+                    cache_dir=(base / str(cache_dir)).expanduser().resolve() if cache_dir else None,
+                    memory_budget_bytes=memory_budget,
+                )
+            )
+        return cls(specs, **kwargs)
+
+    def __enter__(self) -> TenantRegistry:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """当前打开的租户数。"""
+
+        return len(self._open)
+
+    def __contains__(self, tenant_id: object) -> bool:
+        return tenant_id in self._specs
+
+    def tenant_ids(self) -> list[str]:
+        """全部登记的租户 id。"""
+
+        return sorted(self._specs)
+
+    def open_tenant_ids(self) -> list[str]:
+        """当前打开的租户 id（最久未用在前）。"""
+
+        with self._lock:
+            return list(self._open)
+
+    @contextmanager
+    def lease(self, tenant_id: str | None = None) -> Iterator[TenantRuntime]:
+        """借用租户运行时；首次使用时打开，借用期间不会被关闭。"""
+
+        runtime = self._acquire(tenant_id)
+        try:
+            yield runtime
+        finally:
+            self._release(runtime)
+
+    def evict_idle(self) -> list[str]:
+        """关闭空闲超时的租户，返回被淘汰的 id。"""
+
+        with self._lock:
+            now = self._clock()
+            expired = [
+                tenant_id
+                for tenant_id, runtime in self._open.items()
+                if runtime.leases == 0 and now - runtime.last_used >= self.idle_seconds
+            ]
+            to_close = [self._evict_locked(tenant_id) for tenant_id in expired]
+        for runtime in to_close:
+            runtime.close()
+        return expired
+
+    def close(self) -> None:
+        """关闭全部租户；仍被借用的租户在归还时关闭。"""
+
+        with self._lock:
+            evicted = [self._evict_locked(tenant_id) for tenant_id in list(self._open)]
+            to_close = [runtime for runtime in evicted if runtime.leases == 0]
+        for runtime in to_close:
+            runtime.close()
+
+    def _acquire(self, tenant_id: str | None) -> TenantRuntime:
+        resolved_id = tenant_id if tenant_id is not None else self.default_tenant
+        if resolved_id is None:
+            raise TenantNotFoundError("Tenant id is required.")
+        spec = self._specs.get(resolved_id)
+        if spec is None:
+            raise TenantNotFoundError(f"Unknown tenant: {resolved_id}")
+
+        with self._lock:
+            runtime = self._open.get(resolved_id)
+            if runtime is None:
+                runtime = TenantRuntime(
+                    spec,
+                    _tenant_config(spec),
+                    pool_size=self.pool_size,
+                    memory_budget_bytes=(
+                        spec.memory_budget_bytes
+                        if spec.memory_budget_bytes is not None
+                        else self.tenant_memory_budget_bytes
+                    ),
+                )
+                self._open[resolved_id] = runtime
+            self._open.move_to_end(resolved_id)
+            runtime.leases += 1
+            runtime.last_used = self._clock()
+            to_close = self._enforce_budget_locked()
+        for evicted in to_close:
+            evicted.close()
+        return runtime
+
+    def _release(self, runtime: TenantRuntime) -> None:
+        with self._lock:
+            runtime.leases -= 1
+            runtime.last_used = self._clock()
+            evicted = runtime.evicted
+            close_now = evicted and runtime.leases == 0
+        if close_now:
+            runtime.close()
+        if evicted:
+            return
+        # 借用期间缓存可能增长：先按本租户预算收缩自身缓存（不持有注册表锁），再检查数量与总上限。
+        runtime.trim_to_budget()
+        with self._lock:
+            to_close = self._enforce_budget_locked()
+        for other in to_close:
+            other.close()
+
+    def _enforce_budget_locked(self) -> list[TenantRuntime]:
+        """按数量与可选的内存总上限从最久未用的空闲租户开始淘汰，返回需关闭的运行时。"""
+
+        to_close: list[TenantRuntime] = []
+        budget = self.memory_budget_bytes
+        total_bytes = sum(runtime.estimated_bytes() for runtime in self._open.values()) if budget is not None else 0
+        for tenant_id, runtime in list(self._open.items()):
+            if len(self._open) <= self.max_open and (budget is None or total_bytes <= budget):
+                break
+            if runtime.leases > 0:
+                continue
+            total_bytes -= runtime.estimated_bytes()
+            to_close.append(self._evict_locked(tenant_id))
+        return to_close
+
+    def _evict_locked(self, tenant_id: str) -> TenantRuntime:
+        runtime = self._open.pop(tenant_id)
+        runtime.evicted = True
+        return runtime
+
+
+def _tenant_config(spec: TenantSpec) -> AppConfig:
+    """租户运行配置；数据库文件在打开时校验。"""
+
+    if not spec.db_path.exists():
+        raise ConfigError(f"Database path does not exist for tenant {spec.tenant_id}: {spec.db_path}")
+    timezone, timezone_name = resolve_timezone(spec.timezone_name)
+    return AppConfig(
+        db_path=spec.db_path,
+        timezone=timezone,
+        timezone_name=timezone_name,
+        cache_dir=spec.cache_dir,
+    )
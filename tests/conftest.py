@@ -2,10 +2,170 @@
 
 from __future__ import annotations
 
+import sqlite3
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+CORE_DATA_UNIX_EPOCH_OFFSET = 978307200
+FIXTURE_SCHEMA = """
+CREATE TABLE ZACTIVITY (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZISHOME INTEGER, ZNAME_ VARCHAR
+);
+CREATE TABLE ZLOCATION (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZTYPE_ INTEGER,
+    ZUSERACTIVITY_ INTEGER, ZLASTARRIVALDATE_ TIMESTAMP, ZLATITUDE FLOAT, ZLONGITUDE FLOAT,
+    ZCATEGORY_ VARCHAR, ZNAME_ VARCHAR, ZNOTE_ VARCHAR, ZTIMEZONE VARCHAR
+);
+CREATE TABLE ZRAWVISIT (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZLOCATION INTEGER, ZVISIT INTEGER,
+    ZARRIVALDATE_ TIMESTAMP, ZDEPARTUREDATE_ TIMESTAMP, ZLATITUDE FLOAT, ZLONGITUDE FLOAT,
+    ZNAME VARCHAR, ZTHOROUGHFARE VARCHAR, ZTIMEZONE VARCHAR
+);
+CREATE TABLE ZVISIT (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZACTIVITY_ INTEGER, ZLOCATION INTEGER,
+    ZMERGEDTO INTEGER, ZPARENT INTEGER, ZRAW INTEGER, ZARRIVALDATE_ TIMESTAMP,
+    ZDEPARTUREDATE_ TIMESTAMP, ZREMARK_ VARCHAR, ZTIMEZONEIDENTIFIER VARCHAR
+);
+CREATE TABLE ZTRANSPORT (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZNAME_ VARCHAR);
+CREATE TABLE ZMOVEMENT (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZTYPE_ INTEGER, ZTRANSPORT_ INTEGER,
+    ZVISITFROM_ INTEGER, ZVISITTO_ INTEGER, ZEND_ TIMESTAMP, ZSTART_ TIMESTAMP, ZNOTE_ VARCHAR
+);
+CREATE TABLE ZTAG (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZNAME_ VARCHAR);
+CREATE TABLE Z_10VISITS_ (Z_10TAGS_5 INTEGER, Z_17VISITS_ INTEGER);
+CREATE TABLE Z_5TAGS_ (Z_5LOCATIONS_ INTEGER, Z_10TAGS_2 INTEGER);
+CREATE TABLE ZJOURNAL (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZDATE_ TIMESTAMP,
+    ZCONTENT_ VARCHAR, ZTITLE_ VARCHAR
+);
+CREATE TABLE ZHOURLYWEATHER (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZVISIT INTEGER, ZAPPARENTTEMPERATURE_ FLOAT,
+    ZDATE_ TIMESTAMP, ZHUMIDITY_ FLOAT, ZPRECIPITATIONAMOUNT_ FLOAT, ZPRECIPITATIONCHANCE_ FLOAT,
+    ZTEMPERATURE_ FLOAT, ZCONDITION_ VARCHAR, ZSYMBOLNAME_ VARCHAR
+);
+CREATE TABLE ZSTAYSEGMENT (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZLOCATION INTEGER, ZPARENTVISIT INTEGER,
+    ZADDEDAT_ TIMESTAMP
+);
+CREATE TABLE ZTRIP (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZSTARTDATE_ TIMESTAMP, ZENDDATE_ TIMESTAMP,
+    ZNOTE_ VARCHAR, ZTIMEZONE_ VARCHAR, ZTITLE_ VARCHAR
+);
+CREATE TABLE Z_PRIMARYKEY (Z_ENT INTEGER PRIMARY KEY, Z_NAME VARCHAR, Z_SUPER INTEGER, Z_MAX INTEGER);
+CREATE TABLE Z_METADATA (Z_VERSION INTEGER PRIMARY KEY, Z_UUID VARCHAR(255), Z_PLIST BLOB);
+CREATE TABLE ATRANSACTION (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZTIMESTAMP FLOAT);
+CREATE TABLE ACHANGE (
+    Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZCHANGETYPE INTEGER, ZENTITY INTEGER,
+    ZENTITYPK INTEGER, ZTRANSACTIONID INTEGER, ZCOLUMNS BLOB
+);
+"""
+
+
+def core_seconds(value: datetime) -> float:
+    """UTC 时间转 Core Data 秒。"""
+
+    return value.astimezone(timezone.utc).timestamp() - CORE_DATA_UNIX_EPOCH_OFFSET
+
+
+def build_fixture_database(path: Path) -> None:
+    """创建最小 Rond 数据库：家 -> 地铁/步行 -> 商场（2026-01-29, UTC）。"""
+
+    utc = timezone.utc
+    with sqlite3.connect(path) as connection:
+        connection.executescript(FIXTURE_SCHEMA)
+        connection.execute("INSERT INTO Z_METADATA (Z_VERSION, Z_UUID) VALUES (1, 'fixture-store');")
+        connection.executemany(
+            "INSERT INTO Z_PRIMARYKEY (Z_ENT, Z_NAME, Z_SUPER, Z_MAX) VALUES (?, ?, 0, 0);",
+            [
+                (1, "Activity"),
+                (3, "Journal"),
+                (5, "Location"),
+                (6, "Movement"),
+                (8, "RawVisit"),
+                (10, "Tag"),
+                (12, "Transport"),
+                (17, "Visit"),
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO ZACTIVITY (Z_PK, Z_ENT, Z_OPT, ZISHOME, ZNAME_) VALUES (?, 1, 1, ?, ?);",
+            [(1, 1, "家"), (2, 0, "商场")],
+        )
+        connection.executemany(
+            """
+            INSERT INTO ZLOCATION (
+                Z_PK, Z_ENT, Z_OPT, ZTYPE_, ZUSERACTIVITY_, ZLATITUDE, ZLONGITUDE,
+                ZCATEGORY_, ZNAME_, ZTIMEZONE
+            ) VALUES (?, 5, 1, 0, ?, ?, ?, ?, ?, 'UTC');
+            """,
+            [
+                (1, None, 32.0, 119.0, None, "示例住宅A"),
+                (2, 2, 32.01, 119.01, "MKPOICategoryStore", "示例商场B"),
+            ],
+        )
+        connection.executemany(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZACTIVITY_, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_,
+                ZTIMEZONEIDENTIFIER
+            ) VALUES (?, 17, 1, ?, ?, ?, ?, 'UTC');
+            """,
+            [
+                (
+                    1,
+                    1,
+                    1,
+                    core_seconds(datetime(2026, 1, 28, 20, 0, tzinfo=utc)),
+                    core_seconds(datetime(2026, 1, 29, 8, 0, tzinfo=utc)),
+                ),
+                (
+                    2,
+                    None,
+                    2,
+                    core_seconds(datetime(2026, 1, 29, 9, 0, tzinfo=utc)),
+                    core_seconds(datetime(2026, 1, 29, 12, 0, tzinfo=utc)),
+                ),
+            ],
+        )
+        connection.execute("INSERT INTO ZTRANSPORT (Z_PK, Z_ENT, Z_OPT, ZNAME_) VALUES (1, 12, 1, '地铁');")
+        connection.executemany(
+            """
+            INSERT INTO ZMOVEMENT (
+                Z_PK, Z_ENT, Z_OPT, ZTYPE_, ZTRANSPORT_, ZVISITFROM_, ZVISITTO_, ZSTART_, ZEND_
+            ) VALUES (?, 6, 1, ?, ?, 1, 2, ?, ?);
+            """,
+            [
+                (
+                    1,
+                    5,
+                    1,
+                    core_seconds(datetime(2026, 1, 29, 8, 0, tzinfo=utc)),
+                    core_seconds(datetime(2026, 1, 29, 8, 40, tzinfo=utc)),
+                ),
+                (
+                    2,
+                    2,
+                    None,
+                    core_seconds(datetime(2026, 1, 29, 8, 40, tzinfo=utc)),
+                    core_seconds(datetime(2026, 1, 29, 9, 0, tzinfo=utc)),
+                ),
+            ],
+        )
+        connection.commit()
+
+
+@pytest.fixture
+def rond_db_path(tmp_path: Path) -> Path:
+    """最小 Rond 数据库文件。"""
+
+    db_path = tmp_path / "LifeEasy.sqlite"
+    build_fixture_database(db_path)
+    return db_path
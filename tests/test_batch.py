@@ -0,0 +1,78 @@
+"""Batch mode tests."""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+from rond_api import RondSession
+from rond_api.batch import run_batch
+from rond_api.cli import main
+
+BATCH_INPUT = [
+    "2026-01-29\n",
+    "\n",
+    "# 示例注释\n",
+    '{"command": "stats", "from": "2026-01-29", "group_by": "transport"}\n',
+    '{"command": "timeline", "date": "2026-01-29", "bogus": 1}\n',
+    '{"command": "range", "from": "2026-01-28", "to": "2026-01-29"}\n',
+    '{"command": "top", "from": "2026-01-29", "sql": true}\n',
+    "not-a-date\n",
+]
+
+
+def test_run_batch_keeps_input_order_and_isolates_errors(rond_db_path: Path) -> None:
+    with RondSession(db_path=str(rond_db_path), timezone_name="UTC") as session:
+        serial = list(run_batch(session, BATCH_INPUT))
+    with RondSession(db_path=str(rond_db_path), timezone_name="UTC", pool_size=3) as session:
+        parallel = list(run_batch(session, BATCH_INPUT, jobs=3))
+
+    assert parallel == serial
+    assert [outcome["line"] for outcome in serial] == [1, 4, 5, 6, 7, 8]
+    timeline, stats, unknown_field, events, top, bad_date = serial
+    assert timeline["command"] == "timeline" and len(timeline["result"]["events"]) == 4
+    assert {row["key"] for row in stats["result"]["rows"]} == {"地铁", "步行"}
+    assert "Unknown field(s) for timeline: bogus" in unknown_field["error"]
+    assert len(events["result"]["events"]) == 4
+    assert top["result"]["dimension"] == "place"
+    assert bad_date["command"] == "timeline" and "error" in bad_date
+
+
+def test_cli_batch_streams_ndjson_from_stdin(rond_db_path: Path, capsys, monkeypatch) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO("2026-01-29\nyesterday\n"))
+
+    exit_code = main(["batch", "--db-path", str(rond_db_path)])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert exit_code == 0
+    assert [json.loads(line)["line"] for line in lines] == [1, 2]
+    assert json.loads(lines[0])["result"]["query_date"] == "2026-01-29"
+
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"command": "trip"}\n'))
+    assert main(["batch", "--db-path", str(rond_db_path), "--jobs", "2"]) == 1
+    assert json.loads(capsys.readouterr().out)["error"] == "Missing field: trip_id."
+
+
+def test_run_batch_reports_wrong_field_types_per_line(rond_db_path: Path) -> None:
+    lines = [
+        '{"command": "timeline", "date": 7}\n',
+        '{"command": "stats", "from": 5}\n',
+        '{"command": "search", "query": 5}\n',
+        '{"command": "top", "from": "2026-01-29", "limit": "3"}\n',
+        '{"command": "range", "from": "2026-01-29", "weather": 1}\n',
+        "2026-01-29\n",
+    ]
+
+    with RondSession(db_path=str(rond_db_path), timezone_name="UTC") as session:
+        outcomes = list(run_batch(session, lines))
+
+    assert [outcome.get("error") for outcome in outcomes] == [
+        "date must be str.",
+        "from must be str.",
+        "query must be str.",
+        "limit must be int.",
+        "weather must be bool.",
+        None,
+    ]
+    assert outcomes[-1]["result"]["query_date"] == "2026-01-29"
@@ -6,9 +6,8 @@ import json
 from datetime import date, datetime
 from zoneinfo import ZoneInfo
 
-import rond_api.cli as cli
 from rond_api.cli import _resolve_tree_mode, main
-from rond_api.domain.timeline_types import TimelineResult, VisitEvent
+from rond_api.domain.timeline_types import TimelineResult, TimelineUpdate, VisitEvent
 
 
 def test_cli_timeline_json_output(capsys, monkeypatch) -> None:
@@ -31,7 +30,8 @@ def test_cli_timeline_json_output(capsys, monkeypatch) -> None:
         ],
     )
 
-    monkeypatch.setattr(cli, "get_timeline", lambda **_: timeline)
+    # CLI 在运行子命令时才导入服务模块，因此替换服务模块上的函数。
+    monkeypatch.setattr("rond_api.services.timeline_service.get_timeline", lambda **_: timeline)
 
     exit_code = main(
         [
@@ -50,6 +50,32 @@ def test_cli_timeline_json_output(capsys, monkeypatch) -> None:
     assert isinstance(payload["events"], list)
 
 
+def test_cli_timeline_watch_both_renders_pretty_and_json(capsys, monkeypatch) -> None:
+    tz = ZoneInfo("UTC")
+    event = VisitEvent(
+        visit_id=1,
+        location_name="示例地点A",
+        category_name="示例分类",
+        location_type=0,
+        poi_category=None,
+        tags=[],
+        arrival_at=datetime(2026, 1, 29, 9, 0, tzinfo=tz),
+        departure_at=datetime(2026, 1, 29, 10, 0, tzinfo=tz),
+        is_cross_day=False,
+    )
+    timeline = TimelineResult(query_date=date(2026, 1, 29), timezone="UTC", events=[event])
+    update = TimelineUpdate(timeline=timeline, changed=[event], removed=[], rebuilt=True)
+    monkeypatch.setattr("rond_api.services.watch_service.watch_timeline", lambda **_: iter([update]))
+
+    exit_code = main(["timeline", "--date", "2026-01-29", "--watch", "--output", "both", "--no-emoji"])
+
+    assert exit_code == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert any("示例地点A" in line for line in lines[:-1])
+    payload = json.loads(lines[-1])
+    assert payload["rebuilt"] is True
+
+
 def test_resolve_tree_mode_from_env(monkeypatch) -> None:
     monkeypatch.delenv("tree", raising=False)
     monkeypatch.delenv("TIMELINE_TREE", raising=False)
@@ -0,0 +1,57 @@
+"""CLI cold-start import tests."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from conftest import SRC
+
+# timeline --output json 的全部模块导入耗时上限；本机实测约 70ms，留出慢速 CI 的余量。
+COLD_START_IMPORT_BUDGET_US = 250_000
+HELP_FORBIDDEN_MODULES = {"dotenv", "sqlite3", "zoneinfo", "rond_api.config", "rond_api.services"}
+JSON_FORBIDDEN_MODULES = {
+    "asyncio",
+    "numpy",
+    "rond_api.formatters.report_pretty",
+    "rond_api.formatters.timeline_pretty",
+    "rond_api.server",
+    "rond_api.services.search_service",
+    "rond_api.services.stats_service",
+}
+
+
+def _import_times(args: list[str], cwd: Path) -> tuple[dict[str, int], subprocess.CompletedProcess[str]]:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    command = [sys.executable, "-X", "importtime", "-m", "rond_api.cli", *args]
+    # 先运行一次生成字节码缓存，只测量冷启动的导入而非编译。
+    subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, check=False)
+    completed = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, check=False)
+
+    self_times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_us)
+    return self_times, completed
+
+
+def test_cli_help_does_not_import_services(tmp_path: Path) -> None:
+    self_times, completed = _import_times(["--help"], tmp_path)
+
+    assert completed.returncode == 0
+    assert "rond_api.defaults" in self_times
+    assert HELP_FORBIDDEN_MODULES.isdisjoint(self_times)
+
+
+def test_cli_timeline_json_stays_within_import_budget(rond_db_path: Path, tmp_path: Path) -> None:
+    args = ["timeline", "--date", "2026-01-29", "--output", "json", "--db-path", str(rond_db_path)]
+    self_times, completed = _import_times(args, tmp_path)
+
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    assert '"query_date": "2026-01-29"' in completed.stdout
+    assert JSON_FORBIDDEN_MODULES.isdisjoint(self_times)
+    assert sum(self_times.values()) < COLD_START_IMPORT_BUDGET_US
@@ -0,0 +1,89 @@
+"""Gap detection tests."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from rond_api.domain.timeline_types import MovementEvent, VisitEvent
+from rond_api.services.gap_service import sweep_gaps
+
+
+def _visit(visit_id: int, start: datetime, end: datetime) -> VisitEvent:
+    return VisitEvent(
+        visit_id=visit_id,
+        location_name=f"示例地点{visit_id}",
+        category_name="未分类",
+        location_type=0,
+        poi_category=None,
+        tags=[],
+        arrival_at=start,
+        departure_at=end,
+        is_cross_day=start.date() != end.date(),
+    )
+
+
+def test_sweep_gaps_reports_gap_across_midnight_and_overlaps() -> None:
+    tz = ZoneInfo("UTC")
+    range_start = datetime(2026, 1, 28, 0, 0, tzinfo=tz)
+    range_end = datetime(2026, 1, 30, 0, 0, tzinfo=tz)
+    events = [
+        _visit(1, datetime(2026, 1, 28, 0, 0, tzinfo=tz), datetime(2026, 1, 28, 22, 0, tzinfo=tz)),
+        _visit(2, datetime(2026, 1, 29, 2, 0, tzinfo=tz), datetime(2026, 1, 29, 12, 0, tzinfo=tz)),
+        MovementEvent(
+            movement_id=3,
+            transport_name="步行",
+            transport_mode="walk",
+            start_at=datetime(2026, 1, 29, 11, 50, tzinfo=tz),
+            end_at=datetime(2026, 1, 29, 12, 10, tzinfo=tz),
+            duration_minutes=20,
+            from_location_name=None,
+            to_location_name=None,
+        ),
+        _visit(4, datetime(2026, 1, 29, 12, 20, tzinfo=tz), datetime(2026, 1, 30, 0, 0, tzinfo=tz)),
+    ]
+
+    gaps, overlaps = sweep_gaps(events, range_start, range_end, min_minutes=30)
+
+    assert len(gaps) == 1
+    assert gaps[0].start_at == datetime(2026, 1, 28, 22, 0, tzinfo=tz)
+    assert gaps[0].end_at == datetime(2026, 1, 29, 2, 0, tzinfo=tz)
+    assert gaps[0].minutes == 240
+    assert len(overlaps) == 1
+    assert overlaps[0].minutes == 10
+
+    short_gaps, _ = sweep_gaps(events, range_start, range_end, min_minutes=5)
+    assert len(short_gaps) == 2
+
+
+def test_sweep_gaps_reports_leading_and_trailing_gaps() -> None:
+    tz = ZoneInfo("UTC")
+    range_start = datetime(2026, 1, 29, 0, 0, tzinfo=tz)
+    range_end = datetime(2026, 1, 30, 0, 0, tzinfo=tz)
+    events = [
+        _visit(1, datetime(2026, 1, 29, 8, 0, tzinfo=tz), datetime(2026, 1, 29, 9, 0, tzinfo=tz)),
+    ]
+
+    gaps, _ = sweep_gaps(events, range_start, range_end, min_minutes=0)
+
+    assert [(gap.start_at.hour, gap.end_at.hour) for gap in gaps] == [(0, 8), (9, 0)]
+    assert gaps[0].before is None
+    assert gaps[1].after is None
+
+
+def test_sweep_gaps_reports_every_overlapping_pair() -> None:
+    tz = ZoneInfo("UTC")
+    range_start = datetime(2026, 1, 29, 0, 0, tzinfo=tz)
+    range_end = datetime(2026, 1, 30, 0, 0, tzinfo=tz)
+    events = [
+        _visit(1, datetime(2026, 1, 29, 8, 0, tzinfo=tz), datetime(2026, 1, 29, 12, 0, tzinfo=tz)),
+        _visit(2, datetime(2026, 1, 29, 9, 0, tzinfo=tz), datetime(2026, 1, 29, 11, 0, tzinfo=tz)),
+        _visit(3, datetime(2026, 1, 29, 10, 0, tzinfo=tz), datetime(2026, 1, 29, 10, 30, tzinfo=tz)),
+        _visit(4, datetime(2026, 1, 29, 12, 0, tzinfo=tz), datetime(2026, 1, 29, 13, 0, tzinfo=tz)),
+    ]
+
+    _, overlaps = sweep_gaps(events, range_start, range_end, min_minutes=30)
+
+    # 1/2/3 两两重叠（包括不涉及覆盖事件 1 的 2-3）；4 与 1 首尾相接，不算重叠。
+    pairs = {(overlap.first.visit_id, overlap.second.visit_id): overlap.minutes for overlap in overlaps}
+    assert pairs == {(1, 2): 120, (1, 3): 30, (2, 3): 30}
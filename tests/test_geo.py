@@ -0,0 +1,33 @@
+"""Geo helper tests."""
+
+from __future__ import annotations
+
+import pytest
+
+import rond_api._optional
+import rond_api.services.geo as geo
+from rond_api.services.geo import haversine_meters, haversine_meters_many, leg_distances
+
+
+def test_vectorized_haversine_matches_scalar_with_and_without_numpy(monkeypatch) -> None:
+    points = ([32.0, 0.0, 10.0], [119.0, 0.0, 20.0], [32.01, 0.0, -10.0], [119.01, 1.0, -160.0])
+    expected = [haversine_meters(*item) for item in zip(*points)]
+
+    assert haversine_meters_many(*points) == pytest.approx(expected)
+    monkeypatch.setattr(geo, "NUMPY_MIN_PAIRS", 0)
+    assert haversine_meters_many(*points) == pytest.approx(expected)
+    monkeypatch.setattr(rond_api._optional, "_numpy", None)
+    assert haversine_meters_many(*points) == pytest.approx(expected)
+    assert haversine_meters_many([], [], [], []) == []
+
+
+def test_leg_distances_skip_rows_without_coordinates() -> None:
+    rows = [
+        {"movement_id": 1, "from_latitude": 0.0, "from_longitude": 0.0, "to_latitude": 0.0, "to_longitude": 1.0},
+        {"movement_id": 2, "from_latitude": None, "from_longitude": 0.0, "to_latitude": 0.0, "to_longitude": 1.0},
+    ]
+
+    distances = leg_distances(rows)
+
+    assert list(distances) == [1]
+    assert distances[1] == pytest.approx(111_195, rel=1e-3)
@@ -0,0 +1,75 @@
+"""Location history tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from conftest import core_seconds
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.timeline_service import TimelineService
+
+
+def _add_visits_to_mall(db_path: Path) -> None:
+    """为示例商场追加多次到访，其中两次到达时间相同。"""
+
+    base = datetime(2026, 1, 20, 10, tzinfo=timezone.utc)
+    arrivals = [base + timedelta(days=offset) for offset in range(5)] + [base + timedelta(days=2)]
+    with sqlite3.connect(db_path) as connection:
+        connection.executemany(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZACTIVITY_, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_
+            ) VALUES (?, 17, 1, NULL, 2, ?, ?);
+            """,
+            [
+                (10 + index, core_seconds(arrival), core_seconds(arrival + timedelta(hours=1)))
+                for index, arrival in enumerate(arrivals)
+            ],
+        )
+        connection.execute("INSERT INTO ZTAG (Z_PK, Z_ENT, Z_OPT, ZNAME_) VALUES (1, 10, 1, '示例标签');")
+        connection.execute("INSERT INTO Z_10VISITS_ (Z_10TAGS_5, Z_17VISITS_) VALUES (1, 12);")
+
+
+def test_keyset_pages_cover_every_visit_once_in_descending_order(rond_db_path: Path) -> None:
+    _add_visits_to_mall(rond_db_path)
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+
+    visit_ids: list[int] = []
+    cursor: str | None = None
+    pages = 0
+    while True:
+        page = service.build_location_history(2, ZoneInfo("UTC"), "UTC", before=cursor, limit=2)
+        visit_ids.extend(event.visit_id for event in page.events)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert visit_ids == [2, 14, 13, 15, 12, 11, 10]
+
+
+def test_history_events_reuse_visit_conversion_with_tags(rond_db_path: Path) -> None:
+    _add_visits_to_mall(rond_db_path)
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+
+    page = service.build_location_history(2, ZoneInfo("UTC"), "UTC", limit=50)
+    tagged = next(event for event in page.events if event.visit_id == 12)
+
+    assert page.next_cursor is None
+    assert tagged.tags == ["示例标签"]
+    assert tagged.location_name == "示例商场B"
+    assert tagged.category_name == "商场"
+
+
+def test_invalid_history_cursor_raises_value_error(rond_db_path: Path) -> None:
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+
+    with pytest.raises(ValueError):
+        service.build_location_history(2, ZoneInfo("UTC"), "UTC", before="not-a-cursor")
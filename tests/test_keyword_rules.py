@@ -0,0 +1,60 @@
+"""Keyword rule classifier tests."""
+
+from __future__ import annotations
+
+import random
+from typing import Sequence, TypeVar
+
+import pytest
+
+from rond_api.formatters.timeline_pretty import (
+    KEYWORD_EMOJI_RULES,
+    TRANSPORT_EMOJI_RULES,
+    _category_emoji,
+)
+from rond_api.keyword_rules import KeywordRules
+from rond_api.services.timeline_service import TRANSPORT_MODE_RULES, _infer_transport_mode
+
+T = TypeVar("T")
+
+
+def _first_rule(rules: Sequence[tuple[Sequence[str], T]], text: str) -> T | None:
+    for keywords, value in rules:
+        if any(keyword in text for keyword in keywords):
+            return value
+    return None
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [KEYWORD_EMOJI_RULES, TRANSPORT_EMOJI_RULES, TRANSPORT_MODE_RULES],
+    ids=["category", "transport-emoji", "transport-mode"],
+)
+def test_compiled_rules_match_sequential_precedence(rules: Sequence[tuple[Sequence[str], object]]) -> None:
+    matcher = KeywordRules(rules)
+    fragments = [keyword for keywords, _ in rules for keyword in keywords] + ["示例", "x", " ", "\n", "A"]
+    generator = random.Random(50)
+
+    for _ in range(3000):
+        text = "".join(generator.choice(fragments) for _ in range(generator.randint(0, 4)))
+        assert matcher.match(text) == _first_rule(rules, text), text
+
+
+def test_overlapping_keywords_keep_rule_order() -> None:
+    matcher = KeywordRules([(("b",), "first"), (("ab", "a"), "second")])
+
+    assert matcher.match("zab") == "first"
+    assert matcher.match("za") == "second"
+    assert matcher.match("") is None
+    assert KeywordRules([]).match("anything") is None
+
+
+def test_classifiers_are_memoized() -> None:
+    _category_emoji.cache_clear()
+    first = _category_emoji("示例分类", "示例车站", 0, None, True)
+    second = _category_emoji("示例分类", "示例车站", 0, None, True)
+
+    assert first == second == "🚉"
+    assert _category_emoji.cache_info().hits == 1
+    assert _infer_transport_mode("示例地铁线", "unknown") == "public_transit"
+    assert _infer_transport_mode("示例", "drive") == "drive"
@@ -0,0 +1,99 @@
+"""Locate service tests."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from rond_api.domain.timeline_types import MovementEvent, VisitEvent
+from rond_api.services.interval_index import IntervalIndex
+from rond_api.services.locate_service import EventLocator
+
+
+def _build_events() -> list[VisitEvent | MovementEvent]:
+    tz = ZoneInfo("UTC")
+    return [
+        VisitEvent(
+            visit_id=1,
+            location_name="示例地点A",
+            category_name="家",
+            location_type=0,
+            poi_category=None,
+            tags=[],
+            arrival_at=datetime(2026, 1, 29, 0, 0, tzinfo=tz),
+            departure_at=datetime(2026, 1, 29, 8, 0, tzinfo=tz),
+            is_cross_day=False,
+        ),
+        MovementEvent(
+            movement_id=2,
+            transport_name="步行",
+            transport_mode="walk",
+            start_at=datetime(2026, 1, 29, 8, 0, tzinfo=tz),
+            end_at=datetime(2026, 1, 29, 8, 30, tzinfo=tz),
+            duration_minutes=30,
+            from_location_name="示例地点A",
+            to_location_name="示例地点B",
+        ),
+        VisitEvent(
+            visit_id=3,
+            location_name="示例地点B",
+            category_name="商场",
+            location_type=0,
+            poi_category=None,
+            tags=[],
+            arrival_at=datetime(2026, 1, 29, 9, 0, tzinfo=tz),
+            departure_at=datetime(2026, 1, 29, 10, 0, tzinfo=tz),
+            is_cross_day=False,
+        ),
+    ]
+
+
+def test_interval_index_finds_enclosing_interval_behind_shorter_ones() -> None:
+    index = IntervalIndex([(0.0, 100.0, "long"), (10.0, 20.0, "short"), (30.0, 40.0, "later")])
+
+    assert index.find(15.0) == "short"
+    assert index.find(25.0) == "long"
+    assert index.find(100.0) is None
+    assert index.previous_end(120.0) == 100.0
+    assert index.next_start(25.0) == 30.0
+
+
+def test_interval_index_lookup_stays_logarithmic_under_enclosing_interval(monkeypatch) -> None:
+    children = 10_000
+    index = IntervalIndex(
+        [(0.0, children * 10.0, "long"), *((i * 10.0, i * 10.0 + 5.0, i) for i in range(1, children))]
+    )
+    steps = 0
+    original = IntervalIndex._rightmost_end_after
+
+    def counting(self: IntervalIndex[object], *args: object) -> int:
+        nonlocal steps
+        steps += 1
+        return original(self, *args)
+
+    monkeypatch.setattr(IntervalIndex, "_rightmost_end_after", counting)
+    for i in range(1, children, 97):
+        steps = 0
+        assert index.find(i * 10.0 + 7.0) == "long"
+        # 树高 14，下降过程每层最多展开常数个节点。
+        assert steps <= 4 * children.bit_length()
+        assert index.find(i * 10.0 + 2.0) == i
+
+
+def test_event_locator_returns_visit_movement_or_gap() -> None:
+    tz = ZoneInfo("UTC")
+    locator = EventLocator(_build_events(), tz)
+
+    at_home = locator.locate(datetime(2026, 1, 29, 7, 59, tzinfo=tz))
+    assert at_home.kind == "visit"
+    assert isinstance(at_home.event, VisitEvent) and at_home.event.visit_id == 1
+
+    # 区间左闭右开：边界时刻归属下一段事件。
+    walking = locator.locate(datetime(2026, 1, 29, 8, 0, tzinfo=tz))
+    assert walking.kind == "movement"
+
+    gap = locator.locate(datetime(2026, 1, 29, 8, 45, tzinfo=tz))
+    assert gap.kind == "gap"
+    assert gap.event is None
+    assert gap.gap_start_at == datetime(2026, 1, 29, 8, 30, tzinfo=tz)
+    assert gap.gap_end_at == datetime(2026, 1, 29, 9, 0, tzinfo=tz)
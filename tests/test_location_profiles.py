@@ -0,0 +1,57 @@
+"""Location profile store tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from conftest import core_seconds
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.location_profiles import LocationProfileStore
+from rond_api.repositories.timeline_repository import TimelineRepository
+
+
+def test_profiles_summarise_home_counts_dwell_and_last_arrival(rond_db_path: Path) -> None:
+    profiles = LocationProfileStore(SQLiteReadClient(rond_db_path)).profiles()
+
+    home = profiles[1]
+    assert (home.home_visit_count, home.visit_count) == (1, 1)
+    assert home.total_dwell_minutes == 12 * 60
+    assert home.last_arrival_core == core_seconds(datetime(2026, 1, 28, 20, tzinfo=timezone.utc))
+    assert (profiles[2].home_visit_count, profiles[2].visit_count) == (0, 1)
+
+
+def test_refresh_only_rereads_changed_visits(rond_db_path: Path) -> None:
+    store = LocationProfileStore(SQLiteReadClient(rond_db_path))
+    assert store.refresh() is True
+    assert store.refresh() is False
+
+    arrival = core_seconds(datetime(2026, 1, 30, 9, tzinfo=timezone.utc))
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZVISIT (Z_PK, Z_ENT, Z_OPT, ZACTIVITY_, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_)
+            VALUES (3, 17, 1, 1, 2, ?, ?);
+            """,
+            (arrival, arrival + 1800),
+        )
+        # 原到访改挂到其他地点并提升版本。
+        connection.execute("UPDATE ZVISIT SET ZLOCATION = 2, Z_OPT = 2 WHERE Z_PK = 1;")
+
+    assert store.refresh() is True
+    profiles = store.profiles()
+    assert 1 not in profiles
+    assert (profiles[2].home_visit_count, profiles[2].visit_count) == (2, 3)
+    assert profiles[2].last_arrival_core == arrival
+
+
+def test_repository_with_profiles_returns_same_nearby_rows(rond_db_path: Path) -> None:
+    client = SQLiteReadClient(rond_db_path)
+    plain = TimelineRepository(client)
+    profiled = TimelineRepository(client, location_profiles=LocationProfileStore(client))
+
+    assert profiled.fetch_nearby_locations(32.0, 119.0, limit=5) == plain.fetch_nearby_locations(32.0, 119.0, limit=5)
+    boxes = [(31.9, 32.1, 118.9, 119.1)]
+    assert profiled.fetch_locations_in_boxes(boxes) == plain.fetch_locations_in_boxes(boxes)
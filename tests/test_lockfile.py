@@ -0,0 +1,39 @@
+"""uv.lock consistency tests."""
+
+from __future__ import annotations
+
+import re
+import tomllib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _requirement(name: str, specifier: str, extra: str | None = None) -> tuple[str, str, str | None]:
+    return name.lower(), specifier, extra
+
+
+def test_uv_lock_matches_pyproject_dependencies() -> None:
+    """uv.lock 应由 uv lock 生成；依赖或 extra 变更后未重新生成时在这里暴露。"""
+
+    project = tomllib.loads((ROOT / "pyproject.toml").read_text(encoding="utf-8"))["project"]
+    lock = tomllib.loads((ROOT / "uv.lock").read_text(encoding="utf-8"))
+
+    expected: set[tuple[str, str, str | None]] = set()
+    for extra, requirements in [(None, project["dependencies"]), *project.get("optional-dependencies", {}).items()]:
+        for requirement in requirements:
+            match = re.fullmatch(r"([A-Za-z0-9_.-]+)\s*(.*)", requirement)
+            assert match is not None, requirement
+            expected.add(_requirement(match.group(1), match.group(2), extra))
+
+    packages = {package["name"]: package for package in lock["package"]}
+    metadata = packages[project["name"]]["metadata"]
+    locked = set()
+    for entry in metadata["requires-dist"]:
+        extra_match = re.fullmatch(r"extra == '([^']+)'", entry.get("marker", ""))
+        extra = extra_match.group(1) if extra_match else None
+        locked.add(_requirement(entry["name"], entry.get("specifier", ""), extra))
+
+    assert locked == expected
+    assert sorted(metadata.get("provides-extras", [])) == sorted(project.get("optional-dependencies", {}))
+    assert {name for name, _, _ in expected} <= set(packages)
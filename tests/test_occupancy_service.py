@@ -0,0 +1,81 @@
+"""Occupancy histogram tests."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+from zoneinfo import ZoneInfo
+
+import rond_api._optional
+from rond_api.domain.timeline_types import MovementEvent, VisitEvent
+from rond_api.services.occupancy_service import build_occupancy
+
+
+def _events() -> list[VisitEvent | MovementEvent]:
+    tz = ZoneInfo("UTC")
+    return [
+        VisitEvent(
+            visit_id=1,
+            location_name="示例住宅A",
+            category_name="家",
+            location_type=0,
+            poi_category=None,
+            tags=[],
+            arrival_at=datetime(2026, 1, 28, 22, 30, tzinfo=tz),
+            departure_at=datetime(2026, 1, 29, 7, 45, tzinfo=tz),
+            is_cross_day=True,
+        ),
+        MovementEvent(
+            movement_id=2,
+            transport_name="地铁",
+            transport_mode="public_transit",
+            start_at=datetime(2026, 1, 29, 7, 45, tzinfo=tz),
+            end_at=datetime(2026, 1, 29, 8, 20, tzinfo=tz),
+            duration_minutes=35,
+            from_location_name=None,
+            to_location_name=None,
+        ),
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_occupancy_splits_intervals_across_hour_bins(monkeypatch, use_numpy: bool) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(rond_api._optional, "_numpy", None)
+
+    matrix = build_occupancy(
+        _events(),
+        start_date=date(2026, 1, 29),
+        end_date=date(2026, 1, 30),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        bin_minutes=60,
+    )
+
+    assert matrix.days == [date(2026, 1, 29), date(2026, 1, 30)]
+    home = matrix.categories["家"]
+    assert home[0][:8] == [60.0] * 7 + [45.0]
+    assert sum(home[0]) == 465.0
+    assert sum(home[1]) == 0.0
+    transit = matrix.categories["交通"][0]
+    assert transit[7] == 15.0
+    assert transit[8] == 20.0
+
+
+def test_occupancy_supports_quarter_hour_bins() -> None:
+    matrix = build_occupancy(
+        _events(),
+        start_date=date(2026, 1, 29),
+        end_date=date(2026, 1, 29),
+        tz=ZoneInfo("Etc/GMT-8"),
+        timezone_name="Etc/GMT-8",
+        bin_minutes=15,
+    )
+
+    assert matrix.bins_per_day == 96
+    # 本地 UTC+8：07:45Z 即 15:45，对应第 63 个 15 分钟分箱。
+    assert matrix.categories["家"][0][62] == 15.0
+    assert matrix.categories["家"][0][63] == 0.0
@@ -0,0 +1,76 @@
+"""Ranking service tests."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.stats_repository import StatsRepository
+from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.ranking_service import RankingAccumulator, build_ranking, build_ranking_sql
+from rond_api.services.timeline_service import TimelineService, date_range_bounds
+
+
+def _ranking_kwargs(**overrides: object) -> dict[str, object]:
+    kwargs: dict[str, object] = {
+        "start_date": date(2026, 1, 28),
+        "end_date": date(2026, 1, 29),
+        "tz": ZoneInfo("UTC"),
+        "timezone_name": "UTC",
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_chunked_ranking_counts_cross_chunk_visit_once(rond_db_path: Path) -> None:
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+    tz = ZoneInfo("UTC")
+    range_start, range_end = date_range_bounds(date(2026, 1, 28), date(2026, 1, 29), tz)
+    accumulator = RankingAccumulator("place", "dwell", limit=5)
+    for chunk_start, chunk_end, events in service.iter_range_events(
+        range_start, range_end, tz, "UTC", chunk=timedelta(hours=6)
+    ):
+        accumulator.add_chunk(chunk_start, chunk_end, events, range_start)
+
+    entries = accumulator.entries()
+    assert [(entry.key, entry.total_minutes, entry.event_count) for entry in entries] == [
+        ("示例住宅A", 720.0, 1),
+        ("示例商场B", 180.0, 1),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("dimension", "metric"),
+    [("place", "dwell"), ("category", "count"), ("route", "count"), ("transport", "dwell")],
+)
+def test_sql_push_down_matches_event_stream(rond_db_path: Path, dimension: str, metric: str) -> None:
+    client = SQLiteReadClient(rond_db_path)
+    streamed = build_ranking(
+        TimelineService(TimelineRepository(client)),
+        **_ranking_kwargs(dimension=dimension, metric=metric),  # type: ignore[arg-type]
+    )
+    pushed = build_ranking_sql(
+        StatsRepository(client),
+        **_ranking_kwargs(dimension=dimension, metric=metric),  # type: ignore[arg-type]
+    )
+
+    assert streamed.entries == pushed.entries
+    assert (streamed.source, pushed.source) == ("events", "sql")
+
+
+def test_ranking_limit_keeps_top_entries(rond_db_path: Path) -> None:
+    result = build_ranking_sql(
+        StatsRepository(SQLiteReadClient(rond_db_path)),
+        **_ranking_kwargs(dimension="transport", metric="dwell", limit=1),  # type: ignore[arg-type]
+    )
+
+    assert [entry.key for entry in result.entries] == ["地铁"]
+    with pytest.raises(ValueError):
+        build_ranking_sql(
+            StatsRepository(SQLiteReadClient(rond_db_path)),
+            **_ranking_kwargs(limit=0),  # type: ignore[arg-type]
+        )
@@ -0,0 +1,64 @@
+"""Persistent resolution cache tests."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from rond_api.cache.resolution_cache import MISSING, LocationResolutionCache
+
+
+def test_resolution_cache_round_trips_and_evicts_lru(tmp_path: Path) -> None:
+    cache_path = tmp_path / "cache" / "resolution.json"
+    cache = LocationResolutionCache(cache_path, max_entries=2)
+    cache.validate("v1")
+    cache.put(32.0, 119.0, 280.0, {"location_id": 1, "location_name": "示例住宅A", "home_visit_count": 3})
+    cache.put(32.5, 119.5, 280.0, None)
+    assert cache.get(32.0, 119.0, 280.0) is not MISSING
+    cache.put(33.0, 120.0, 280.0, {"location_id": 2, "location_name": "示例地点B"})
+    cache.save()
+
+    reloaded = LocationResolutionCache(cache_path, max_entries=2)
+    reloaded.validate("v1")
+    assert reloaded.get(32.5, 119.5, 280.0) is MISSING
+    hit = reloaded.get(32.0, 119.0, 280.0)
+    assert hit["location_id"] == 1
+    assert hit["home_visit_count"] == 1
+    assert reloaded.get(32.0, 119.0, 100.0) is MISSING
+
+
+def test_resolution_cache_invalidates_on_fingerprint_change(tmp_path: Path) -> None:
+    cache_path = tmp_path / "resolution.json"
+    cache = LocationResolutionCache(cache_path)
+    cache.validate("v1")
+    cache.put(32.0, 119.0, 280.0, None)
+    cache.save()
+
+    reloaded = LocationResolutionCache(cache_path)
+    reloaded.validate("v2")
+    assert reloaded.get(32.0, 119.0, 280.0) is MISSING
+
+
+def test_resolution_cache_saves_concurrently_without_temp_collisions(tmp_path: Path) -> None:
+    cache_path = tmp_path / "resolution.json"
+    cache = LocationResolutionCache(cache_path)
+    cache.validate("v1")
+    errors: list[BaseException] = []
+
+    def work(offset: int) -> None:
+        try:
+            for index in range(50):
+                cache.put(30.0 + offset, 110.0 + index / 100, 280.0, None)
+                cache.save()
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(LocationResolutionCache(cache_path)) == 200
+    assert list(tmp_path.glob("*.tmp")) == []
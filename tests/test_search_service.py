@@ -0,0 +1,99 @@
+"""Full-text search tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from conftest import core_seconds
+
+from rond_api import RondSession
+from rond_api.cache.search_index import SearchIndex
+from rond_api.config import AppConfig
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.search_repository import SearchSourceRepository
+from rond_api.services.search_service import refresh_search_index, run_search, search_index_path
+
+
+def _seed_texts(db_path: Path) -> None:
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("UPDATE ZVISIT SET ZREMARK_ = '示例备注：和朋友吃了火锅' WHERE Z_PK = 2;")
+        connection.execute(
+            "INSERT INTO ZJOURNAL (Z_PK, Z_ENT, Z_OPT, ZDATE_, ZTITLE_, ZCONTENT_) VALUES (1, 3, 1, ?, ?, ?);",
+            (core_seconds(datetime(2026, 1, 30, 12, tzinfo=timezone.utc)), "示例日记", "测试正文：周末整理相册"),
+        )
+        connection.execute("INSERT INTO ACHANGE (Z_PK, ZENTITY, ZENTITYPK, ZCHANGETYPE) VALUES (1, 17, 2, 1);")
+
+
+def _search(index: SearchIndex, query: str) -> list[tuple[str, int, date | None]]:
+    result = run_search(index, query, tz=ZoneInfo("UTC"), timezone_name="UTC")
+    return [(hit.kind, hit.source_id, hit.timeline_date) for hit in result.hits]
+
+
+def test_search_links_hits_to_timeline_dates(rond_db_path: Path) -> None:
+    _seed_texts(rond_db_path)
+    index = SearchIndex(None)
+    assert refresh_search_index(index, SearchSourceRepository(SQLiteReadClient(rond_db_path))) is True
+
+    assert _search(index, "吃了火锅") == [("visit", 2, date(2026, 1, 29))]
+    assert _search(index, "整理相册") == [("journal", 1, date(2026, 1, 30))]
+    # 两字词低于 trigram 长度，走 LIKE 回退。
+    assert _search(index, "火锅") == [("visit", 2, date(2026, 1, 29))]
+    assert ("location", 2, date(2026, 1, 29)) in _search(index, "示例商场")
+
+
+def test_incremental_refresh_applies_history_changes(rond_db_path: Path, tmp_path: Path) -> None:
+    _seed_texts(rond_db_path)
+    repository = SearchSourceRepository(SQLiteReadClient(rond_db_path))
+    index_path = tmp_path / "cache" / "search.sqlite"
+    index = SearchIndex(index_path)
+    refresh_search_index(index, repository)
+    index.close()
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute("UPDATE ZVISIT SET ZREMARK_ = '示例备注：改成了烧烤' WHERE Z_PK = 2;")
+        connection.execute("UPDATE ZLOCATION SET ZNAME_ = '示例商场C' WHERE Z_PK = 2;")
+        connection.execute("INSERT INTO ACHANGE (Z_PK, ZENTITY, ZENTITYPK, ZCHANGETYPE) VALUES (2, 5, 2, 1);")
+        connection.execute("INSERT INTO ACHANGE (Z_PK, ZENTITY, ZENTITYPK, ZCHANGETYPE) VALUES (3, 17, 2, 1);")
+
+    reopened = SearchIndex(index_path)
+    assert refresh_search_index(reopened, repository) is False
+    assert _search(reopened, "烧烤") == [("visit", 2, date(2026, 1, 29))]
+    assert _search(reopened, "吃了火锅") == []
+    # 地点改名后，挂在该地点下的到访备注标题同步更新。
+    assert {hit.title for hit in run_search(reopened, "示例商场C", ZoneInfo("UTC"), "UTC").hits} == {"示例商场C"}
+
+
+def test_purged_history_triggers_full_rebuild(rond_db_path: Path) -> None:
+    _seed_texts(rond_db_path)
+    repository = SearchSourceRepository(SQLiteReadClient(rond_db_path))
+    index = SearchIndex(None)
+    refresh_search_index(index, repository)
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute("DELETE FROM ACHANGE;")
+        connection.execute("INSERT INTO ACHANGE (Z_PK, ZENTITY, ZENTITYPK, ZCHANGETYPE) VALUES (9, 3, 1, 1);")
+
+    assert refresh_search_index(index, repository) is True
+
+
+def test_search_index_file_is_keyed_by_database(rond_db_path: Path, tmp_path: Path) -> None:
+    other_path = rond_db_path.with_name("other.sqlite")
+    other_path.write_bytes(rond_db_path.read_bytes())
+    cache_dir = tmp_path / "cache"
+    utc = ZoneInfo("UTC")
+    configs = [
+        AppConfig(db_path=path, timezone=utc, timezone_name="UTC", cache_dir=cache_dir)
+        for path in (rond_db_path, other_path)
+    ]
+
+    paths = [search_index_path(config) for config in configs]
+    assert paths[0] != paths[1]
+    assert search_index_path(AppConfig(db_path=rond_db_path, timezone=utc, timezone_name="UTC")) is None
+
+    for config in configs:
+        with RondSession(config=config) as session:
+            session.search("示例商场")
+    assert sorted(cache_dir.glob("search-*.sqlite")) == sorted(paths)
@@ -0,0 +1,207 @@
+"""HTTP server tests."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+from conftest import core_seconds
+
+from rond_api.db.change_watcher import DatabaseChangeWatcher
+from rond_api.server import MAX_HEADER_BYTES, RondHTTPServer
+from rond_api.services.timeline_service import TimelineService
+from rond_api.tenants import TenantRegistry, TenantSpec
+
+UTC = timezone.utc
+
+
+def _get(port: int, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def _run(rond_db_path: Path, scenario: Any, **kwargs: Any) -> None:
+    async def main() -> None:
+        server = RondHTTPServer(db_path=str(rond_db_path), port=0, workers=2, **kwargs)
+        await server.start()
+        try:
+            await scenario(server)
+        finally:
+            await server.shutdown()
+
+    asyncio.run(main())
+
+
+def test_server_answers_if_none_match_without_building(rond_db_path: Path, monkeypatch) -> None:
+    builds: list[object] = []
+    original_build = TimelineService.build_timeline
+
+    def counting_build(self: TimelineService, **kwargs: Any) -> Any:
+        builds.append(kwargs["query_date"])
+        return original_build(self, **kwargs)
+
+    monkeypatch.setattr(TimelineService, "build_timeline", counting_build)
+
+    async def scenario(server: RondHTTPServer) -> None:
+        path = "/timeline?date=2026-01-29"
+        status, headers, body = await asyncio.to_thread(_get, server.port, path)
+        assert status == 200
+        assert [event["location_name"] for event in json.loads(body)["events"] if "location_name" in event] == [
+            "示例住宅A",
+            "示例商场B",
+        ]
+        etag = headers["ETag"]
+
+        status, not_modified_headers, body = await asyncio.to_thread(_get, server.port, path, {"If-None-Match": etag})
+        assert (status, body) == (304, b"")
+        assert not_modified_headers["Vary"] == "Accept-Encoding"
+        assert len(builds) == 1
+
+        with sqlite3.connect(rond_db_path) as connection:
+            connection.execute(
+                "UPDATE ZVISIT SET ZDEPARTUREDATE_ = ? WHERE Z_PK = 2;",
+                (core_seconds(datetime(2026, 1, 29, 13, tzinfo=UTC)),),
+            )
+        status, headers, _ = await asyncio.to_thread(_get, server.port, path, {"If-None-Match": etag})
+        assert status == 200
+        assert headers["ETag"] != etag
+        assert len(builds) == 2
+
+        status, _, body = await asyncio.to_thread(_get, server.port, "/stats?from=2026-01-29&group_by=bogus")
+        assert status == 400
+        assert "Invalid group_by" in json.loads(body)["error"]
+        assert (await asyncio.to_thread(_get, server.port, "/nope"))[0] == 404
+
+    _run(rond_db_path, scenario)
+
+
+def test_server_gzips_large_range_responses(rond_db_path: Path) -> None:
+    async def scenario(server: RondHTTPServer) -> None:
+        path = "/range?from=2026-01-28&to=2026-01-29"
+        status, headers, body = await asyncio.to_thread(_get, server.port, path, {"Accept-Encoding": "gzip"})
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip"
+        payload = json.loads(gzip.decompress(body))
+        assert payload["start_date"] == "2026-01-28"
+        assert len(payload["events"]) == 4
+
+        _, plain_headers, plain_body = await asyncio.to_thread(_get, server.port, path)
+        assert "Content-Encoding" not in plain_headers
+        assert json.loads(plain_body) == payload
+
+    _run(rond_db_path, scenario, gzip_min_bytes=1)
+
+
+def test_server_rejects_oversized_and_slow_headers(rond_db_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("rond_api.server.HEADER_TIMEOUT_SECONDS", 0.2)
+
+    async def raw_request(port: int, data: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+
+    async def scenario(server: RondHTTPServer) -> None:
+        oversized = b"GET /timeline HTTP/1.1\r\nX-Padding: " + b"a" * (MAX_HEADER_BYTES + 1) + b"\r\n\r\n"
+        assert (await raw_request(server.port, oversized)).startswith(b"HTTP/1.1 431 ")
+        assert (await raw_request(server.port, b"GET /timeline HTTP/1.1\r\n")).startswith(b"HTTP/1.1 408 ")
+
+    _run(rond_db_path, scenario)
+
+
+def test_server_keeps_event_loop_free_and_reports_unexpected_errors(rond_db_path: Path, monkeypatch) -> None:
+    original_token = DatabaseChangeWatcher.current_token
+
+    def slow_token(self: DatabaseChangeWatcher) -> Any:
+        time.sleep(0.5)
+        return original_token(self)
+
+    def broken_build(self: TimelineService, **kwargs: Any) -> Any:
+        raise KeyError("boom")
+
+    monkeypatch.setattr(DatabaseChangeWatcher, "current_token", slow_token)
+    monkeypatch.setattr(TimelineService, "build_timeline", broken_build)
+
+    async def scenario(server: RondHTTPServer) -> None:
+        request = asyncio.create_task(asyncio.to_thread(_get, server.port, "/timeline?date=2026-01-29"))
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        # 变更令牌读取在线程池中执行，事件循环仍能及时调度其他协程。
+        assert time.perf_counter() - started < 0.3
+
+        status, _, body = await request
+        assert status == 500
+        assert json.loads(body) == {"error": "Internal server error."}
+
+    _run(rond_db_path, scenario)
+
+
+def test_server_shutdown_waits_for_in_flight_requests(rond_db_path: Path, monkeypatch) -> None:
+    original_build = TimelineService.build_range_events
+
+    def slow_build(self: TimelineService, **kwargs: Any) -> Any:
+        time.sleep(0.3)
+        return original_build(self, **kwargs)
+
+    monkeypatch.setattr(TimelineService, "build_range_events", slow_build)
+
+    async def main() -> None:
+        server = RondHTTPServer(db_path=str(rond_db_path), port=0, workers=1)
+        await server.start()
+        port = server.port
+        request = asyncio.create_task(asyncio.to_thread(_get, port, "/range?from=2026-01-29"))
+        await asyncio.sleep(0.1)
+        await server.shutdown()
+
+        status, _, body = await request
+        assert status == 200
+        assert json.loads(body)["events"]
+        with pytest.raises(urllib.error.URLError):
+            await asyncio.to_thread(_get, port, "/range?from=2026-01-29")
+
+    asyncio.run(main())
+
+
+def test_server_routes_tenant_paths(rond_db_path: Path) -> None:
+    other_path = rond_db_path.with_name("other.sqlite")
+    other_path.write_bytes(rond_db_path.read_bytes())
+    registry = TenantRegistry(
+        [
+            TenantSpec(tenant_id="home", db_path=rond_db_path, timezone_name="UTC"),
+            TenantSpec(tenant_id="other", db_path=other_path, timezone_name="Etc/GMT-9"),
+        ],
+        max_open=1,
+    )
+
+    async def scenario(server: RondHTTPServer) -> None:
+        status, home_headers, body = await asyncio.to_thread(
+            _get, server.port, "/tenants/home/timeline?date=2026-01-29"
+        )
+        assert status == 200 and json.loads(body)["timezone"] == "UTC"
+        status, other_headers, body = await asyncio.to_thread(
+            _get, server.port, "/tenants/other/timeline?date=2026-01-29"
+        )
+        assert status == 200 and json.loads(body)["timezone"] == "Etc/GMT-9"
+        assert home_headers["ETag"] != other_headers["ETag"]
+        assert registry.open_tenant_ids() == ["other"]
+        assert (await asyncio.to_thread(_get, server.port, "/tenants/nobody/timeline"))[0] == 404
+        assert (await asyncio.to_thread(_get, server.port, "/timeline"))[0] == 404
+
+    _run(rond_db_path, scenario, registry=registry)
+    registry.close()
@@ -0,0 +1,98 @@
+"""Session tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+from conftest import core_seconds
+
+import rond_api.session as session_module
+from rond_api import RondSession, get_timeline
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.repositories.location_profiles import LocationProfileStore
+
+
+def test_session_loads_config_once_and_reuses_service(rond_db_path: Path, monkeypatch) -> None:
+    loads: list[str | None] = []
+    original_load = session_module.load_app_config
+
+    def counting_load(**kwargs: object) -> object:
+        loads.append(str(kwargs.get("db_path")))
+        return original_load(**kwargs)
+
+    monkeypatch.setattr(session_module, "load_app_config", counting_load)
+    clients: list[SQLiteReadClient] = []
+    original_init = SQLiteReadClient.__post_init__
+
+    def counting_init(self: SQLiteReadClient) -> None:
+        clients.append(self)
+        original_init(self)
+
+    monkeypatch.setattr(SQLiteReadClient, "__post_init__", counting_init)
+
+    with RondSession(db_path=str(rond_db_path), timezone_name="UTC") as session:
+        first = session.timeline("2026-01-29")
+        second = session.timeline(date(2026, 1, 29))
+        events = session.timeline_range("2026-01-28", "2026-01-29")
+        stats = session.stats("2026-01-29", group_by="transport")
+
+    assert loads == [str(rond_db_path)]
+    assert len(clients) == 1
+    assert first == second
+    assert [event.event_type for event in events] == [event.event_type for event in first.events]
+    assert {row.key for row in stats.rows} == {"地铁", "步行"}
+    with pytest.raises(ValueError, match="closed"):
+        session.timeline("2026-01-29")
+
+
+def test_get_timeline_matches_session(rond_db_path: Path) -> None:
+    with RondSession(db_path=str(rond_db_path)) as session:
+        expected = session.timeline("2026-01-29", zone_mode="event")
+
+    assert get_timeline("2026-01-29", db_path=str(rond_db_path), zone_mode="event") == expected
+    with pytest.raises(ValueError, match="weather must be bool"):
+        get_timeline("2026-01-29", db_path=str(rond_db_path), weather="yes")
+
+
+def test_only_reusable_sessions_materialise_location_profiles(rond_db_path: Path, monkeypatch) -> None:
+    refreshes: list[int] = []
+    original_refresh = LocationProfileStore.refresh
+
+    def counting_refresh(self: LocationProfileStore) -> bool:
+        refreshes.append(1)
+        return original_refresh(self)
+
+    monkeypatch.setattr(LocationProfileStore, "refresh", counting_refresh)
+    with RondSession(db_path=str(rond_db_path), location_profiles=False) as session:
+        one_shot = session.timeline("2026-01-29")
+        assert session.service.repository.location_profiles is None
+    get_timeline("2026-01-29", db_path=str(rond_db_path))
+    assert refreshes == []
+
+    with RondSession(db_path=str(rond_db_path)) as session:
+        assert session.timeline("2026-01-29") == one_shot
+        assert session.service.repository.location_profiles is not None
+
+
+def test_historical_range_ignores_stale_open_raw_visit(rond_db_path: Path) -> None:
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZRAWVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZARRIVALDATE_, ZDEPARTUREDATE_, ZLATITUDE, ZLONGITUDE, ZNAME, ZTIMEZONE
+            ) VALUES (31, 8, 1, ?, 64092211200, 12.5, 34.5, '示例遗留', 'UTC');
+            """,
+            (core_seconds(datetime(2026, 1, 28, 3, tzinfo=timezone.utc)),),
+        )
+
+    with RondSession(db_path=str(rond_db_path), timezone_name="UTC") as session:
+        single_day = session.timeline("2026-01-28")
+        events = session.timeline_range("2026-01-28", "2026-01-29")
+        ranking = session.top("2026-01-28", "2026-01-29")
+
+    assert not any(getattr(event, "is_ongoing", False) for event in single_day.events)
+    assert not any(getattr(event, "is_ongoing", False) for event in events)
+    assert "示例遗留" not in [entry.key for entry in ranking.entries]
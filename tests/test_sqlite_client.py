@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+import time
 from pathlib import Path
+from typing import Callable
 
 import pytest
 
@@ -52,6 +56,132 @@ def test_sqlite_read_client_raises_after_non_retryable_error(
         client.execute_query("SELECT * FROM missing;")
 
 
+def test_pooled_client_hands_connections_over_in_arrival_order(tmp_path: Path) -> None:
+    db_path = tmp_path / "fifo.db"
+    _init_demo_database(db_path)
+    client = SQLiteReadClient(db_path=db_path, pool_size=1, pool_timeout_seconds=5.0)
+    pool = client._pool
+    assert pool is not None
+    original_checkout = pool.checkout
+    acquired: list[int] = []
+
+    def recording_checkout(timeout: float) -> sqlite3.Connection:
+        connection = original_checkout(timeout)
+        acquired.append(int(threading.current_thread().name))
+        return connection
+
+    # 借出后立即记录；持有者归还前下一个线程无法返回，顺序即移交顺序。
+    pool.checkout = recording_checkout
+    held = original_checkout(1.0)
+    threads: list[threading.Thread] = []
+    for index in range(5):
+        thread = threading.Thread(target=client.execute_query, args=("SELECT value FROM demo;",), name=str(index))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda: len(pool._waiters) == index + 1)
+
+    with pytest.raises(DatabaseReadError, match="Timed out"):
+        original_checkout(0.01)
+    pool.checkin(held)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert acquired == [0, 1, 2, 3, 4]
+    assert pool._created == 1
+    client.close()
+    with pytest.raises(DatabaseReadError, match="closed"):
+        client.execute_query("SELECT 1;")
+
+
+def test_pooled_client_reads_consistently_while_writer_commits(tmp_path: Path) -> None:
+    db_path = tmp_path / "wal.db"
+    _init_wal_database(db_path)
+    client = SQLiteReadClient(db_path=db_path, pool_size=4, retry_backoff_seconds=0.01)
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def write() -> None:
+        with sqlite3.connect(db_path) as connection:
+            while not stop.is_set():
+                connection.execute("INSERT INTO demo (value) VALUES ('more');")
+                connection.commit()
+
+    def read() -> None:
+        try:
+            last = 0
+            for _ in range(50):
+                count = client.execute_query("SELECT COUNT(*) AS n FROM demo;")[0]["n"]
+                assert count >= last
+                last = count
+        except BaseException as exc:
+            errors.append(exc)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    readers = [threading.Thread(target=read) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join(timeout=30)
+    stop.set()
+    writer.join(timeout=5)
+
+    assert errors == []
+    assert client._pool is not None and client._pool._created <= 4
+    client.close()
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 4, reason="read throughput scaling needs at least 4 CPUs")
+def test_pooled_client_read_throughput_scales_with_threads(tmp_path: Path) -> None:
+    db_path = tmp_path / "scale.db"
+    _init_wal_database(db_path)
+    threads = 4
+    # 纯 CPU 的递归查询；执行期间 sqlite3 释放 GIL。
+    sql = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 200000) SELECT SUM(i) FROM n;"
+    queries = 8
+
+    def measure(pool_size: int) -> float:
+        """同样的并发负载下的查询吞吐；pool_size=1 时所有线程排队使用同一个连接。"""
+
+        client = SQLiteReadClient(db_path=db_path, pool_size=pool_size)
+
+        def run() -> None:
+            for _ in range(queries):
+                client.execute_query(sql)
+
+        client.execute_query(sql)
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        client.close()
+        return threads * queries / elapsed
+
+    baseline_rate = measure(1)
+    pooled_rate = measure(threads)
+
+    # 与同一次运行中的单连接基线相比，只要求明显加速，不按线程数线性比较，避免机器负载导致抖动。
+    assert pooled_rate > baseline_rate * 1.5
+
+
+def _wait_for(predicate: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def _init_wal_database(path: Path) -> None:
+    with sqlite3.connect(path) as connection:
+        connection.execute("PRAGMA journal_mode = WAL;")
+        connection.execute("CREATE TABLE demo (value TEXT);")
+        connection.executemany("INSERT INTO demo (value) VALUES (?);", [("ok",)] * 100)
+        connection.commit()
+
+
 def _init_demo_database(path: Path) -> None:
     with sqlite3.connect(path) as connection:
         connection.execute("CREATE TABLE demo (value TEXT);")
@@ -0,0 +1,107 @@
+"""Stats service tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from conftest import core_seconds
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.stats_types import StatsTable
+from rond_api.repositories.stats_repository import StatsGroupBy, StatsPeriod, StatsRepository
+from rond_api.services.geo import haversine_meters
+from rond_api.services.stats_service import build_stats
+
+
+def _build(
+    rond_db_path: Path,
+    group_by: StatsGroupBy,
+    period: StatsPeriod = "total",
+    start_date: date = date(2026, 1, 29),
+) -> StatsTable:
+    repository = StatsRepository(SQLiteReadClient(rond_db_path))
+    return build_stats(
+        repository,
+        start_date=start_date,
+        end_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        group_by=group_by,
+        period=period,
+    )
+
+
+def test_category_stats_clip_visits_to_range(rond_db_path: Path) -> None:
+    table = _build(rond_db_path, group_by="category")
+
+    minutes = {row.key: row.total_minutes for row in table.rows}
+    assert minutes == {"家": 480.0, "商场": 180.0}
+    assert sum(row.share for row in table.rows) == 1.0
+
+
+def test_transport_stats_fall_back_to_type_name(rond_db_path: Path) -> None:
+    table = _build(rond_db_path, group_by="transport")
+
+    minutes = {row.key: row.total_minutes for row in table.rows}
+    assert minutes == {"地铁": 40.0, "步行": 20.0}
+    assert all(row.kind == "movement" for row in table.rows)
+
+
+def test_hour_stats_split_intervals_at_hour_boundaries(rond_db_path: Path) -> None:
+    table = _build(rond_db_path, group_by="hour")
+
+    visit_hours = {row.key: row.total_minutes for row in table.rows if row.kind == "visit"}
+    movement_hours = {row.key: row.total_minutes for row in table.rows if row.kind == "movement"}
+    assert visit_hours["00"] == 60.0
+    assert "08" not in visit_hours
+    assert movement_hours == {"08": 60.0}
+
+
+def test_daily_period_buckets_cross_day_visit(rond_db_path: Path) -> None:
+    table = _build(
+        rond_db_path,
+        start_date=date(2026, 1, 28),
+        group_by="category",
+        period="day",
+    )
+
+    home_by_day = {row.period: row.total_minutes for row in table.rows if row.key == "家"}
+    assert home_by_day == {"2026-01-28": 240.0, "2026-01-29": 480.0}
+
+
+def test_transport_stats_report_distance_and_speed(rond_db_path: Path) -> None:
+    table = _build(rond_db_path, group_by="transport")
+
+    leg_km = haversine_meters(32.0, 119.0, 32.01, 119.01) / 1000
+    rows = {row.key: row for row in table.rows}
+    assert rows["地铁"].distance_km == pytest.approx(leg_km, abs=1e-3)
+    assert rows["步行"].average_speed_kmh == pytest.approx(leg_km * 3, abs=0.1)
+
+    hour_table = _build(rond_db_path, group_by="hour")
+    movement_row = next(row for row in hour_table.rows if row.kind == "movement")
+    assert movement_row.distance_km == pytest.approx(leg_km * 2, abs=1e-3)
+    assert all(row.distance_km is None for row in hour_table.rows if row.kind == "visit")
+
+
+def test_average_speed_ignores_legs_without_coordinates(rond_db_path: Path) -> None:
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZMOVEMENT (Z_PK, Z_ENT, Z_OPT, ZTYPE_, ZSTART_, ZEND_)
+            VALUES (3, 6, 1, 2, ?, ?);
+            """,
+            (
+                core_seconds(datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc)),
+                core_seconds(datetime(2026, 1, 29, 10, 20, tzinfo=timezone.utc)),
+            ),
+        )
+
+    walk = next(row for row in _build(rond_db_path, group_by="transport").rows if row.key == "步行")
+    leg_km = haversine_meters(32.0, 119.0, 32.01, 119.01) / 1000
+    assert walk.total_minutes == 40.0
+    assert walk.distance_minutes == 20.0
+    assert walk.average_speed_kmh == pytest.approx(leg_km * 3, abs=0.1)
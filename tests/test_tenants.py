@@ -0,0 +1,117 @@
+"""Tenant registry tests."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from rond_api.tenants import TenantNotFoundError, TenantRegistry, TenantSpec
+
+
+def _specs(rond_db_path: Path, tenant_ids: list[str]) -> list[TenantSpec]:
+    specs: list[TenantSpec] = []
+    for tenant_id in tenant_ids:
+        db_path = rond_db_path.with_name(f"{tenant_id}.sqlite")
+        shutil.copyfile(rond_db_path, db_path)
+        specs.append(TenantSpec(tenant_id=tenant_id, db_path=db_path, timezone_name="UTC"))
+    return specs
+
+
+def test_registry_evicts_least_recently_used_and_closes_connections(rond_db_path: Path) -> None:
+    registry = TenantRegistry(_specs(rond_db_path, ["a", "b", "c"]), max_open=2)
+
+    with registry.lease("a") as first:
+        first.watcher.has_changed()
+        assert first.watcher._connection is not None
+    with registry.lease("b"):
+        pass
+    with registry.lease("a"):
+        pass
+    with registry.lease("c"):
+        pass
+
+    assert registry.open_tenant_ids() == ["a", "c"]
+    with registry.lease("a") as again:
+        assert again is first
+    with pytest.raises(TenantNotFoundError):
+        with registry.lease("missing"):
+            pass
+
+    registry.close()
+    assert len(registry) == 0
+    assert first.watcher._connection is None
+
+
+def test_registry_keeps_leased_tenants_until_release(rond_db_path: Path) -> None:
+    registry = TenantRegistry(_specs(rond_db_path, ["a", "b"]), memory_budget_bytes=1)
+
+    with registry.lease("a") as tenant_a:
+        profiles = tenant_a.service.repository.location_profiles
+        assert profiles is not None
+        profiles.refresh()
+        assert tenant_a.estimated_bytes() > 0
+        with registry.lease("b"):
+            # 超出内存预算，但 a 仍被借用，不会被关闭。
+            assert registry.open_tenant_ids() == ["a", "b"]
+        assert registry.open_tenant_ids() == ["a"]
+        assert not tenant_a.evicted
+
+    assert tenant_a.evicted and len(registry) == 0
+
+
+def test_tenant_budget_trims_only_that_tenants_caches(rond_db_path: Path) -> None:
+    small, large = _specs(rond_db_path, ["small", "large"])
+    registry = TenantRegistry([small, replace(large, memory_budget_bytes=1)])
+
+    with registry.lease("small") as tenant_small:
+        profiles = tenant_small.service.repository.location_profiles
+        assert profiles is not None
+        profiles.refresh()
+    with registry.lease("large") as tenant_large:
+        assert tenant_large.memory_budget_bytes == 1
+        large_profiles = tenant_large.service.repository.location_profiles
+        assert large_profiles is not None
+        large_profiles.refresh()
+        assert tenant_large.estimated_bytes() > 1
+
+    # 超出预算的租户只丢弃自己的地点画像，仍保持打开；其他租户的缓存不受影响。
+    assert registry.open_tenant_ids() == ["small", "large"]
+    assert tenant_large.service.repository.location_profiles is None
+    assert tenant_large.estimated_bytes() == 0
+    assert tenant_small.service.repository.location_profiles is profiles
+    assert tenant_small.estimated_bytes() > 0
+    registry.close()
+
+
+def test_registry_evicts_idle_tenants(rond_db_path: Path) -> None:
+    now = [0.0]
+    registry = TenantRegistry(_specs(rond_db_path, ["a", "b"]), idle_seconds=30, clock=lambda: now[0])
+
+    with registry.lease("a"):
+        now[0] = 100.0
+        assert registry.evict_idle() == []
+    with registry.lease("b"):
+        pass
+    now[0] = 120.0
+    assert registry.evict_idle() == []
+    now[0] = 130.0
+    assert registry.evict_idle() == ["a", "b"]
+    assert len(registry) == 0
+
+
+def test_registry_loads_relative_paths_from_file(rond_db_path: Path, tmp_path: Path) -> None:
+    (tmp_path / "tenants.json").write_text(
+        json.dumps({"home": {"db_path": rond_db_path.name, "timezone": "Etc/GMT-9", "memory_budget_bytes": 4096}}),
+        encoding="utf-8",
+    )
+
+    with TenantRegistry.from_file(tmp_path / "tenants.json", max_open=1) as registry:
+        assert registry.tenant_ids() == ["home"]
+        with registry.lease("home") as tenant:
+            assert tenant.config.db_path == rond_db_path.resolve()
+            assert tenant.config.timezone_name == "Etc/GMT-9"
+            assert tenant.memory_budget_bytes == 4096
@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import io
 from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
+import pytest
+
+import rond_api.formatters.timeline_pretty as timeline_pretty
 from rond_api.domain.timeline_types import MovementEvent, TimelineResult, VisitEvent
 from rond_api.formatters.timeline_pretty import (
+    _display_width_unicode,
     _format_movement_group,
     _format_visit_event,
     _indent_followup,
+    display_width,
+    iter_timeline_pretty_lines,
     render_timeline_pretty,
+    write_timeline_pretty,
 )
 
 
@@ -138,3 +146,58 @@ def test_tree_mode_adds_branch_prefix_and_keeps_followup_alignment() -> None:
     assert "│" in lines
     movement_line = next(line for line in lines if line.startswith("├┈ "))
     assert not movement_line.startswith("├┈    ")
+
+
+@pytest.mark.parametrize("tree", [False, True])
+def test_streaming_renderer_buffers_at_most_one_block(monkeypatch, tree: bool) -> None:
+    tz = ZoneInfo("UTC")
+    start = datetime(2026, 2, 7, tzinfo=tz)
+    timeline = TimelineResult(
+        query_date=date(2026, 2, 7),
+        timezone="UTC",
+        events=[
+            VisitEvent(
+                visit_id=index,
+                location_name=f"示例地点{index}",
+                category_name="家",
+                location_type=0,
+                poi_category=None,
+                tags=[],
+                arrival_at=start + timedelta(minutes=30 * index),
+                departure_at=start + timedelta(minutes=30 * index + 20),
+                is_cross_day=False,
+            )
+            for index in range(40)
+        ],
+    )
+    formatted: list[int] = []
+    original_format = timeline_pretty._format_visit_event
+
+    def counting_format(event: VisitEvent, **kwargs: object) -> list[str]:
+        formatted.append(event.visit_id)
+        return original_format(event, **kwargs)
+
+    monkeypatch.setattr(timeline_pretty, "_format_visit_event", counting_format)
+
+    lines = iter_timeline_pretty_lines(timeline, tree=tree)
+    head = [next(lines) for _ in range(5)]
+    assert head[3].endswith("地点: 示例地点0")
+    # 树形模式需多格式化一块才能判断首块不是最后一块。
+    assert formatted == ([0, 1] if tree else [0])
+
+    buffer = io.StringIO()
+    write_timeline_pretty(timeline, buffer, tree=tree)
+    assert buffer.getvalue() == render_timeline_pretty(timeline, tree=tree) + "\n"
+    assert buffer.getvalue().splitlines()[-1].strip()
+    if tree:
+        assert sum(line.startswith("└─ ") for line in buffer.getvalue().splitlines()) == 1
+
+
+def test_display_width_counts_wide_and_combining_characters() -> None:
+    assert display_width("route -> 12km") == 13
+    assert display_width("示例 A") == 6
+    assert display_width("e\u0301") == 1
+
+    hits = _display_width_unicode.cache_info().hits
+    display_width("示例 A")
+    assert _display_width_unicode.cache_info().hits == hits + 1
@@ -3,15 +3,22 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pytest
+from conftest import core_seconds
 
+from rond_api.cache.resolution_cache import LocationResolutionCache
+from rond_api.db.sqlite_client import SQLiteReadClient
 from rond_api.domain.timeline_types import MovementEvent, TimelineResult, VisitEvent
 from rond_api.formatters.timeline_json import render_timeline_json
 from rond_api.formatters.timeline_pretty import _category_emoji, render_timeline_pretty
-from rond_api.services.timeline_service import TimelineService, parse_query_date
+from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.geo import haversine_meters
+from rond_api.services.timeline_service import TimelineService, parse_query_date, resolution_cache_path
 
 CORE_DATA_UNIX_EPOCH_OFFSET = 978307200
 
@@ -20,6 +27,7 @@ class FakeTimelineRepository:
     """测试用时间线仓储。"""
 
     def __init__(self) -> None:
+        self.nearby_calls = 0
         self._visit_rows = self._build_visit_rows()
         self._movement_rows = self._build_movement_rows()
         self._visit_tags = {101: {"示例标签A", "共享标签"}}
@@ -51,6 +59,9 @@ class FakeTimelineRepository:
     def fetch_location_tags(self, _location_ids: list[int]) -> dict[int, set[str]]:
         return self._location_tags
 
+    def fetch_location_fingerprint(self) -> str:
+        return "fixture"
+
     def fetch_nearby_locations(
         self,
         latitude: float,
@@ -58,8 +69,24 @@ class FakeTimelineRepository:
         limit: int = 25,
     ) -> list[dict[str, object]]:
         _ = limit
+        self.nearby_calls += 1
         return self._nearby_locations.get((round(latitude, 4), round(longitude, 4)), [])
 
+    def fetch_locations_in_boxes(
+        self,
+        boxes: list[tuple[float, float, float, float]],
+    ) -> list[dict[str, object]]:
+        self.nearby_calls += 1
+        return [
+            item
+            for items in self._nearby_locations.values()
+            for item in items
+            if any(
+                min_lat <= float(item["latitude"]) <= max_lat and min_lon <= float(item["longitude"]) <= max_lon
+                for min_lat, max_lat, min_lon, max_lon in boxes
+            )
+        ]
+
     def fetch_latest_open_raw_visit(self, _day_end_core: float) -> dict[str, object] | None:
         return None
 
@@ -239,3 +266,317 @@ def test_category_emoji_type_priority_then_keyword() -> None:
     )
     # no poi/no keyword keeps type-based emoji
     assert _category_emoji("未分类", "某某路", 1, None, emoji=True) == "🛣️"
+
+
+def test_event_zone_mode_renders_visits_in_recorded_zone() -> None:
+    repository = FakeTimelineRepository()
+    repository._visit_rows[1]["visit_timezone"] = "Etc/GMT-9"
+    service = TimelineService(repository)
+    timeline = service.build_timeline(
+        query_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        zone_mode="event",
+    )
+
+    visits = {event.visit_id: event for event in timeline.events if isinstance(event, VisitEvent)}
+    assert visits[101].arrival_at.utcoffset() == timedelta(hours=9)
+    assert visits[101].arrival_at.hour == 17
+    assert visits[101].timezone_name == "Etc/GMT-9"
+    assert visits[102].timezone_name == "UTC"
+    assert json.loads(render_timeline_json(timeline))["zone_mode"] == "event"
+
+
+def test_traveller_zone_mode_uses_local_day_membership() -> None:
+    repository = FakeTimelineRepository()
+    # 23:50~00:20 UTC 在 UTC-5 当地仍属前一天。
+    repository._visit_rows[0]["visit_timezone"] = "Etc/GMT+5"
+    service = TimelineService(repository)
+
+    fixed = service.build_timeline(
+        query_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+    )
+    traveller = service.build_timeline(
+        query_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        zone_mode="traveller",
+    )
+
+    fixed_ids = {event.visit_id for event in fixed.events if isinstance(event, VisitEvent)}
+    traveller_ids = {event.visit_id for event in traveller.events if isinstance(event, VisitEvent)}
+    assert fixed_ids == {101, 102}
+    assert traveller_ids == {101}
+
+
+def test_persistent_resolution_cache_skips_nearby_query_on_next_build(tmp_path: Path) -> None:
+    cache_path = tmp_path / "resolution.json"
+    first_repository = FakeTimelineRepository()
+    TimelineService(
+        first_repository,
+        resolution_cache=LocationResolutionCache(cache_path),
+    ).build_timeline(query_date=date(2026, 1, 29), tz=ZoneInfo("UTC"), timezone_name="UTC")
+    assert first_repository.nearby_calls == 1
+
+    second_repository = FakeTimelineRepository()
+    timeline = TimelineService(
+        second_repository,
+        resolution_cache=LocationResolutionCache(cache_path),
+    ).build_timeline(query_date=date(2026, 1, 29), tz=ZoneInfo("UTC"), timezone_name="UTC")
+
+    assert second_repository.nearby_calls == 0
+    target = next(event for event in timeline.events if isinstance(event, VisitEvent) and event.visit_id == 102)
+    assert target.location_name == "示例住宅B"
+    assert target.category_name == "家"
+
+
+def test_location_fingerprint_ignores_visits_but_tracks_home_flags(rond_db_path: Path) -> None:
+    repository = TimelineRepository(SQLiteReadClient(rond_db_path))
+    before = repository.fetch_location_fingerprint()
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute("UPDATE ZVISIT SET Z_OPT = Z_OPT + 1 WHERE Z_PK = (SELECT MIN(Z_PK) FROM ZVISIT)")
+    assert repository.fetch_location_fingerprint() == before
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute("UPDATE ZACTIVITY SET ZISHOME = 1 - ZISHOME, Z_OPT = Z_OPT + 1 WHERE Z_PK = 1")
+    assert repository.fetch_location_fingerprint() != before
+
+
+def test_resolution_cache_path_is_keyed_by_database(tmp_path: Path) -> None:
+    first = resolution_cache_path(tmp_path, tmp_path / "a" / "LifeEasy.sqlite")
+    second = resolution_cache_path(tmp_path, tmp_path / "b" / "LifeEasy.sqlite")
+
+    assert first != second
+    assert first.parent == second.parent == tmp_path
+    assert first == resolution_cache_path(tmp_path, tmp_path / "a" / ".." / "a" / "LifeEasy.sqlite")
+
+
+def _insert_unknown_visit_grid(db_path: Path) -> None:
+    """在夹具库中加入密集地点网格与一批未知到访。"""
+
+    day_start = datetime(2026, 2, 2, tzinfo=timezone.utc)
+    with sqlite3.connect(db_path) as connection:
+        connection.executemany(
+            """
+            INSERT INTO ZLOCATION (
+                Z_PK, Z_ENT, Z_OPT, ZTYPE_, ZUSERACTIVITY_, ZLATITUDE, ZLONGITUDE, ZNAME_, ZTIMEZONE
+            ) VALUES (?, 5, 1, 0, NULL, ?, ?, ?, 'UTC');
+            """,
+            [
+                (100 + index, 32.0 + (index // 6) * 0.0011, 119.0 + (index % 6) * 0.0009, f"示例网格{index}")
+                for index in range(36)
+            ],
+        )
+        # 部分网格地点有过“家”活动的到访，用于验证家优先规则。
+        connection.executemany(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZACTIVITY_, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_,
+                ZTIMEZONEIDENTIFIER
+            ) VALUES (?, 17, 1, 1, ?, ?, ?, 'UTC');
+            """,
+            [
+                (200 + index, 100 + index, core_seconds(day_start - timedelta(days=3)),
+                 core_seconds(day_start - timedelta(days=3, minutes=-10)))
+                for index in (7, 20)
+            ],
+        )
+        for index in range(12):
+            arrival = day_start + timedelta(hours=index)
+            connection.execute(
+                """
+                INSERT INTO ZRAWVISIT (Z_PK, Z_ENT, Z_OPT, ZLATITUDE, ZLONGITUDE, ZNAME, ZTIMEZONE)
+                VALUES (?, 9, 1, ?, ?, ?, 'UTC');
+                """,
+                (300 + index, 32.0 + index * 0.00061, 119.0 + index * 0.00047 + (index % 3) * 0.02, f"示例原始{index}"),
+            )
+            connection.execute(
+                """
+                INSERT INTO ZVISIT (
+                    Z_PK, Z_ENT, Z_OPT, ZACTIVITY_, ZLOCATION, ZRAW, ZARRIVALDATE_, ZDEPARTUREDATE_,
+                    ZTIMEZONEIDENTIFIER
+                ) VALUES (?, 17, 1, 2, NULL, ?, ?, ?, 'UTC');
+                """,
+                (400 + index, 300 + index, core_seconds(arrival), core_seconds(arrival + timedelta(minutes=50))),
+            )
+
+
+class _CountingRepository(TimelineRepository):
+    """统计附近地点查询次数的真实仓储。"""
+
+    def __init__(self, client: SQLiteReadClient) -> None:
+        super().__init__(client)
+        self.per_point_calls = 0
+        self.box_calls = 0
+
+    def fetch_nearby_locations(self, latitude: float, longitude: float, limit: int = 20) -> list[dict[str, object]]:
+        self.per_point_calls += 1
+        return super().fetch_nearby_locations(latitude, longitude, limit)
+
+    def fetch_locations_in_boxes(self, boxes: list[tuple[float, float, float, float]]) -> list[dict[str, object]]:
+        self.box_calls += 1
+        return super().fetch_locations_in_boxes(boxes)
+
+
+def test_batched_unknown_visit_resolution_matches_per_visit_lookup(
+    rond_db_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _insert_unknown_visit_grid(rond_db_path)
+
+    def resolve(repository: TimelineRepository) -> list[tuple[int, str, str]]:
+        timeline = TimelineService(repository).build_timeline(
+            query_date=date(2026, 2, 2),
+            tz=ZoneInfo("UTC"),
+            timezone_name="UTC",
+        )
+        return [
+            (event.visit_id, event.location_name, event.category_name)
+            for event in timeline.events
+            if isinstance(event, VisitEvent)
+        ]
+
+    batched_repository = _CountingRepository(SQLiteReadClient(rond_db_path))
+    batched = resolve(batched_repository)
+    assert batched_repository.box_calls == 1
+    assert batched_repository.per_point_calls == 0
+
+    monkeypatch.setattr(TimelineService, "_prefetch_nearby_locations", lambda *_args: None)
+    per_visit_repository = _CountingRepository(SQLiteReadClient(rond_db_path))
+    per_visit = resolve(per_visit_repository)
+    assert per_visit_repository.per_point_calls == 12
+
+    assert batched == per_visit
+    names = {name for _, name, _ in batched}
+    assert any(name.startswith("示例网格") for name in names)
+    assert any(name.startswith("示例原始") for name in names)
+    assert any(category == "家" for *_, category in batched)
+
+
+def test_weather_enrichment_uses_one_batched_query(rond_db_path: Path) -> None:
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.executemany(
+            """
+            INSERT INTO ZHOURLYWEATHER (
+                Z_PK, Z_ENT, Z_OPT, ZVISIT, ZDATE_, ZTEMPERATURE_, ZAPPARENTTEMPERATURE_, ZHUMIDITY_,
+                ZPRECIPITATIONAMOUNT_, ZCONDITION_, ZSYMBOLNAME_
+            ) VALUES (?, 2, 1, 2, ?, ?, ?, 0.5, ?, ?, ?);
+            """,
+            [
+                (1, core_seconds(datetime(2026, 1, 29, 9, tzinfo=timezone.utc)), 276.15, 274.15, 0.0, "cloudy", "cloud"),
+                (2, core_seconds(datetime(2026, 1, 29, 10, tzinfo=timezone.utc)), 278.65, 276.15, 0.4, "rain", "cloud.rain"),
+                (3, core_seconds(datetime(2026, 1, 29, 11, tzinfo=timezone.utc)), 280.15, 278.15, 0.8, "rain", "cloud.rain"),
+            ],
+        )
+
+    class CountingRepository(TimelineRepository):
+        weather_calls = 0
+
+        def fetch_visit_weather(self, visit_ids: list[int]) -> list[dict[str, object]]:
+            type(self).weather_calls += 1
+            return super().fetch_visit_weather(visit_ids)
+
+    repository = CountingRepository(SQLiteReadClient(rond_db_path))
+    timeline = TimelineService(repository).build_timeline(
+        query_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        weather=True,
+    )
+
+    assert CountingRepository.weather_calls == 1
+    visits = {event.visit_id: event for event in timeline.events if isinstance(event, VisitEvent)}
+    assert visits[1].weather is None
+    weather = visits[2].weather
+    assert weather is not None
+    assert (weather.hours, weather.temperature_min_c, weather.temperature_max_c) == (3, 3.0, 7.0)
+    assert (weather.condition, weather.symbol_name, weather.precipitation_mm) == ("rain", "cloud.rain", 1.2)
+
+    payload = json.loads(render_timeline_json(timeline))
+    mall = next(item for item in payload["events"] if item.get("visit_id") == 2)
+    assert mall["weather"]["temperature_max_c"] == 7.0
+    assert "weather" not in next(item for item in payload["events"] if item.get("visit_id") == 1)
+    assert "天气: 🌧️ 雨 3~7°C 降水 1.2mm" in render_timeline_pretty(timeline, emoji=True, complex_mode=False)
+
+
+def test_expand_stays_fetches_children_in_one_query(rond_db_path: Path) -> None:
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZLOCATION, ZPARENT, ZARRIVALDATE_, ZDEPARTUREDATE_, ZTIMEZONEIDENTIFIER
+            ) VALUES (3, 17, 1, 1, 2, ?, ?, 'UTC');
+            """,
+            (
+                core_seconds(datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc)),
+                core_seconds(datetime(2026, 1, 29, 10, 30, tzinfo=timezone.utc)),
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO ZSTAYSEGMENT (Z_PK, Z_ENT, Z_OPT, ZLOCATION, ZPARENTVISIT, ZADDEDAT_) VALUES (?, 15, 1, ?, 2, ?);",
+            [
+                (1, 2, core_seconds(datetime(2026, 1, 29, 9, 0, tzinfo=timezone.utc))),
+                (2, 1, core_seconds(datetime(2026, 1, 29, 11, 0, tzinfo=timezone.utc))),
+            ],
+        )
+
+    class CountingRepository(TimelineRepository):
+        children_calls = 0
+
+        def fetch_visit_children(self, parent_ids: list[int]) -> list[dict[str, object]]:
+            type(self).children_calls += 1
+            return super().fetch_visit_children(parent_ids)
+
+    repository = CountingRepository(SQLiteReadClient(rond_db_path))
+    service = TimelineService(repository)
+    plain = service.build_timeline(query_date=date(2026, 1, 29), tz=ZoneInfo("UTC"), timezone_name="UTC")
+    assert CountingRepository.children_calls == 0
+    assert all(not event.children for event in plain.events if isinstance(event, VisitEvent))
+
+    timeline = service.build_timeline(
+        query_date=date(2026, 1, 29),
+        tz=ZoneInfo("UTC"),
+        timezone_name="UTC",
+        expand_stays=True,
+    )
+
+    assert CountingRepository.children_calls == 1
+    visits = {event.visit_id: event for event in timeline.events if isinstance(event, VisitEvent)}
+    assert set(visits) == {1, 2}
+    assert visits[1].children == ()
+    children = visits[2].children
+    assert [(child.kind, child.source_id, child.location_name) for child in children] == [
+        ("segment", 1, "示例商场B"),
+        ("visit", 3, "示例住宅A"),
+        ("segment", 2, "示例住宅A"),
+    ]
+    assert [(f"{child.start_at:%H:%M}", f"{child.end_at:%H:%M}") for child in children] == [
+        ("09:00", "11:00"),
+        ("10:00", "10:30"),
+        ("11:00", "12:00"),
+    ]
+
+    payload = json.loads(render_timeline_json(timeline))
+    mall = next(item for item in payload["events"] if item.get("visit_id") == 2)
+    assert [child["kind"] for child in mall["children"]] == ["segment", "visit", "segment"]
+    assert "children" not in next(item for item in payload["events"] if item.get("visit_id") == 1)
+    for complex_mode in (True, False):
+        rendered = render_timeline_pretty(timeline, emoji=False, complex_mode=complex_mode)
+        assert "↳ 10:00 -> 10:30 示例住宅A" in rendered
+
+
+def test_movements_carry_leg_distance_and_speed(rond_db_path: Path) -> None:
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+    timeline = service.build_timeline(query_date=date(2026, 1, 29), tz=ZoneInfo("UTC"), timezone_name="UTC")
+
+    movements = {event.movement_id: event for event in timeline.events if isinstance(event, MovementEvent)}
+    leg_km = haversine_meters(32.0, 119.0, 32.01, 119.01) / 1000
+    assert movements[1].distance_km == pytest.approx(leg_km, abs=1e-3)
+    assert movements[1].average_speed_kmh == pytest.approx(leg_km * 1.5, abs=0.1)
+
+    payload = json.loads(render_timeline_json(timeline))
+    first_movement = next(item for item in payload["events"] if item["event_type"] == "movement")
+    assert first_movement["distance_km"] == movements[first_movement["movement_id"]].distance_km
+    assert first_movement["average_speed_kmh"] is not None
@@ -0,0 +1,97 @@
+"""Incremental today timeline tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+
+from conftest import core_seconds
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.domain.timeline_types import TimelineResult
+from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.timeline_service import TimelineService
+from rond_api.services.today_service import TodayTimelineBuilder
+
+UTC = timezone.utc
+
+
+def _settled(result: TimelineResult) -> list[object]:
+    """去掉停留中事件离开时间这类随当前时刻变化的字段。"""
+
+    return [event for event in result.events if not getattr(event, "is_ongoing", False)]
+
+
+def test_today_builder_fetches_only_changed_rows(rond_db_path: Path) -> None:
+    day_start = datetime.combine(datetime.now(UTC).date(), time.min, tzinfo=UTC)
+
+    def at(minutes: int) -> float:
+        return core_seconds(day_start + timedelta(minutes=minutes))
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.executemany(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_, ZTIMEZONEIDENTIFIER
+            ) VALUES (?, 17, 1, ?, ?, ?, 'UTC');
+            """,
+            [(11, 1, at(0), at(2)), (12, 2, at(4), at(6))],
+        )
+        connection.execute(
+            """
+            INSERT INTO ZMOVEMENT (Z_PK, Z_ENT, Z_OPT, ZTYPE_, ZTRANSPORT_, ZVISITFROM_, ZVISITTO_, ZSTART_, ZEND_)
+            VALUES (11, 6, 1, 5, 1, 11, 12, ?, ?);
+            """,
+            (at(2), at(4)),
+        )
+
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+    builder = TodayTimelineBuilder(service, tz=UTC, timezone_name="UTC")
+
+    def full() -> TimelineResult:
+        return service.build_timeline(query_date=day_start.date(), tz=UTC, timezone_name="UTC")
+
+    first = builder.refresh()
+    assert builder.last_refresh == "full"
+    assert _settled(first) == _settled(full())
+
+    builder.refresh()
+    assert builder.last_refresh == "incremental"
+    assert builder.last_fetched == (0, 0)
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            "UPDATE ZVISIT SET ZDEPARTUREDATE_ = ?, Z_OPT = Z_OPT + 1 WHERE Z_PK = 12;",
+            (at(7),),
+        )
+        connection.execute(
+            """
+            INSERT INTO ZVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZLOCATION, ZARRIVALDATE_, ZDEPARTUREDATE_, ZTIMEZONEIDENTIFIER
+            ) VALUES (13, 17, 1, 1, ?, ?, 'UTC');
+            """,
+            (at(9), at(10)),
+        )
+        connection.execute("DELETE FROM ZMOVEMENT WHERE Z_PK = 11;")
+
+    patched = builder.refresh()
+    assert builder.last_refresh == "incremental"
+    assert builder.last_fetched == (2, 0)
+    assert _settled(patched) == _settled(full())
+    assert [getattr(event, "visit_id", None) for event in patched.events] == [11, 12, 13]
+
+    with sqlite3.connect(rond_db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZRAWVISIT (
+                Z_PK, Z_ENT, Z_OPT, ZARRIVALDATE_, ZDEPARTUREDATE_, ZLATITUDE, ZLONGITUDE, ZNAME, ZTIMEZONE
+            ) VALUES (21, 8, 1, ?, 64092211200, 32.0, 119.0, '示例地点', 'UTC');
+            """,
+            (at(12),),
+        )
+
+    ongoing = builder.refresh()
+    assert builder.last_fetched == (0, 0)
+    assert ongoing.events[-1].is_ongoing
+    assert [event.visit_id for event in full().events if getattr(event, "is_ongoing", False)] == [-21]
@@ -0,0 +1,102 @@
+"""Trip timeline tests."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from conftest import core_seconds
+
+from rond_api.db.sqlite_client import SQLiteReadClient
+from rond_api.formatters.timeline_json import render_trip_json
+from rond_api.formatters.timeline_pretty import render_trip_pretty
+from rond_api.repositories.timeline_repository import TimelineRepository
+from rond_api.services.timeline_service import TimelineService
+from rond_api.services.trip_service import TripSectionCache, build_trip_timeline
+
+UTC = timezone.utc
+
+
+class _CountingRepository(TimelineRepository):
+    visit_calls = 0
+
+    def fetch_visits(self, range_start_core: float, range_end_core: float) -> list[dict[str, object]]:
+        type(self).visit_calls += 1
+        return super().fetch_visits(range_start_core, range_end_core)
+
+
+def _add_trip(db_path: Path, end_at: datetime | None) -> None:
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO ZTRIP (Z_PK, Z_ENT, Z_OPT, ZSTARTDATE_, ZENDDATE_, ZTIMEZONE_, ZTITLE_)
+            VALUES (1, 13, 1, ?, ?, 'UTC', '示例行程');
+            """,
+            (
+                core_seconds(datetime(2026, 1, 28, 18, tzinfo=UTC)),
+                core_seconds(end_at) if end_at is not None else None,
+            ),
+        )
+
+
+def test_trip_reads_window_once_and_splits_days(rond_db_path: Path) -> None:
+    _add_trip(rond_db_path, datetime(2026, 1, 29, 12, tzinfo=UTC))
+    _CountingRepository.visit_calls = 0
+    repository = _CountingRepository(SQLiteReadClient(rond_db_path))
+    trip_row = repository.fetch_trip(1)
+    assert trip_row is not None
+
+    trip = build_trip_timeline(TimelineService(repository), trip_row, tz=ZoneInfo("UTC"), timezone_name="UTC")
+
+    assert _CountingRepository.visit_calls == 1
+    assert trip.is_ended
+    assert [day.day.isoformat() for day in trip.days] == ["2026-01-28", "2026-01-29"]
+    first, second = trip.days
+    # 跨天到访出现在两天中，时长按天裁剪。
+    assert [event.event_type for event in first.events] == ["visit"]
+    assert (first.summary.dwell_minutes, first.summary.transport_minutes) == (240.0, 0.0)
+    assert (second.summary.dwell_minutes, second.summary.transport_minutes) == (660.0, 60.0)
+    assert second.summary.places == ("示例住宅A", "示例商场B")
+    assert (trip.summary.dwell_minutes, trip.summary.transport_minutes) == (900.0, 60.0)
+    assert (trip.summary.visit_count, trip.summary.movement_count) == (2, 2)
+
+    payload = json.loads(render_trip_json(trip))
+    assert payload["title"] == "示例行程"
+    assert [day["summary"]["visit_count"] for day in payload["days"]] == [1, 2]
+    rendered = render_trip_pretty(trip, emoji=False)
+    assert rendered.startswith("Trip 示例行程 (UTC)")
+    assert "小计: 停留 11h 0m | 交通 1h 0m | 2 个地点" in rendered
+
+
+def test_ended_trip_sections_are_cached_but_ongoing_trip_is_not(rond_db_path: Path) -> None:
+    _add_trip(rond_db_path, None)
+    _CountingRepository.visit_calls = 0
+    repository = _CountingRepository(SQLiteReadClient(rond_db_path))
+    service = TimelineService(repository)
+    cache = TripSectionCache()
+    trip_row = repository.fetch_trip(1)
+    assert trip_row is not None
+    now = datetime(2026, 1, 29, 12, tzinfo=UTC)
+
+    for _ in range(2):
+        ongoing = build_trip_timeline(service, trip_row, ZoneInfo("UTC"), "UTC", cache=cache, now=now)
+    assert not ongoing.is_ended
+    assert ongoing.end_at == now
+    assert _CountingRepository.visit_calls == 2
+    assert len(cache) == 0
+
+    ended_row = dict(trip_row, end_core=core_seconds(now), trip_version=2)
+    first = build_trip_timeline(service, ended_row, ZoneInfo("UTC"), "UTC", cache=cache, now=now)
+    second = build_trip_timeline(service, ended_row, ZoneInfo("UTC"), "UTC", cache=cache, now=now)
+    assert _CountingRepository.visit_calls == 3
+    assert second.days == first.days
+
+
+def test_trip_without_start_date_is_rejected(rond_db_path: Path) -> None:
+    service = TimelineService(TimelineRepository(SQLiteReadClient(rond_db_path)))
+    with pytest.raises(ValueError, match="no start date"):
+        build_trip_timeline(service, {"trip_id": 7, "start_core": None}, ZoneInfo("UTC"), "UTC")
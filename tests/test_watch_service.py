@@ -0,0 +1,90 @@
+"""Watch mode tests."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from conftest import core_seconds
+
+from rond_api.db.change_watcher import DatabaseChangeWatcher
+from rond_api.domain.timeline_types import TimelineResult, VisitEvent
+from rond_api.services.timeline_service import TimelineService
+from rond_api.services.watch_service import advance_ongoing, watch_timeline
+
+UTC = timezone.utc
+
+
+def test_change_watcher_detects_commits_from_other_connections(rond_db_path: Path) -> None:
+    with DatabaseChangeWatcher(rond_db_path) as watcher:
+        assert not watcher.has_changed()
+        assert not watcher.has_changed()
+        with sqlite3.connect(rond_db_path) as connection:
+            connection.execute("UPDATE ZVISIT SET ZREMARK_ = '示例备注' WHERE Z_PK = 2;")
+        assert watcher.has_changed()
+        assert not watcher.has_changed()
+
+
+def test_watch_rebuilds_only_after_database_changes(rond_db_path: Path, monkeypatch) -> None:
+    builds: list[date] = []
+    original_build = TimelineService.build_timeline
+
+    def counting_build(self: TimelineService, **kwargs: Any) -> TimelineResult:
+        builds.append(kwargs["query_date"])
+        return original_build(self, **kwargs)
+
+    monkeypatch.setattr(TimelineService, "build_timeline", counting_build)
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            with sqlite3.connect(rond_db_path) as connection:
+                connection.execute(
+                    "UPDATE ZVISIT SET ZDEPARTUREDATE_ = ? WHERE Z_PK = 2;",
+                    (core_seconds(datetime(2026, 1, 29, 13, tzinfo=UTC)),),
+                )
+
+    updates = list(
+        watch_timeline(
+            date_expr="2026-01-29",
+            db_path=str(rond_db_path),
+            interval_seconds=5,
+            sleep=fake_sleep,
+            max_updates=2,
+        )
+    )
+
+    assert sleeps == [5, 5]
+    assert len(builds) == 2
+    initial, changed = updates
+    assert initial.rebuilt and len(initial.changed) == len(initial.timeline.events)
+    assert changed.removed == []
+    assert [(event.event_type, getattr(event, "visit_id", None)) for event in changed.changed] == [("visit", 2)]
+
+
+def test_advance_ongoing_extends_open_stay_locally() -> None:
+    arrival = datetime(2026, 1, 29, 22, tzinfo=UTC)
+    ongoing = VisitEvent(
+        visit_id=-3,
+        location_name="示例地点",
+        category_name="未分类",
+        location_type=None,
+        poi_category=None,
+        tags=[],
+        arrival_at=arrival,
+        departure_at=datetime(2026, 1, 29, 23, tzinfo=UTC),
+        is_cross_day=False,
+        is_ongoing=True,
+    )
+    timeline = TimelineResult(query_date=date(2026, 1, 29), timezone="UTC", events=[ongoing])
+
+    advanced, changed = advance_ongoing(timeline, now=datetime(2026, 1, 30, 0, 30, tzinfo=UTC))
+
+    assert changed == advanced.events
+    assert advanced.events[0].departure_at == datetime(2026, 1, 30, 0, 30, tzinfo=UTC)
+    assert advanced.events[0].is_cross_day
+    assert timeline.events[0] is ongoing
+    assert advance_ongoing(advanced, now=datetime(2026, 1, 30, 0, 30, tzinfo=UTC)) == (advanced, [])